@@ -0,0 +1,62 @@
+"""
+Cold start from a binary artifact vs. parsing and building the JSON definition.
+
+Timings compare reading, parsing and building large block graphs (with
+conditions) against loading their artifacts. tests/test_artifact.py checks
+that loaded artifacts of random workflows run like their builds.
+
+Usage:
+    python -m benchmarks.artifact [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.graph import BLOCK_SIZE, blocks_definition
+from workflows.artifact import load_artifact, save_artifact
+from workflows.builder import WorkflowBuilder
+
+
+def time_cold_start(sizes: list[int], directory: str) -> None:
+    print(f"{'nodes':>8} {'MB':>6} {'build (ms)':>11} {'load (ms)':>10} {'speedup':>8}")
+    for size in sizes:
+        definition = blocks_definition(max(1, size // BLOCK_SIZE))
+        for raw in definition["nodes"]:
+            if raw["type"] == "if":
+                raw["parameters"]["condition"] = {"and": [{">": [{"var": "n"}, 3]}, {"var": "flag"}]}
+        json_path = os.path.join(directory, "blocks.json")
+        artifact_path = os.path.join(directory, "blocks.wfa")
+        with open(json_path, "w") as file:
+            json.dump(definition, file)
+
+        start = time.perf_counter()
+        with open(json_path) as file:
+            built = WorkflowBuilder(json.load(file), cache=None).build()
+        build_s = time.perf_counter() - start
+
+        save_artifact(built, artifact_path)
+        start = time.perf_counter()
+        load_artifact(artifact_path)
+        load_s = time.perf_counter() - start
+
+        megabytes = os.path.getsize(artifact_path) / 1e6
+        print(
+            f"{len(built.nodes):>8} {megabytes:>6.1f} {build_s * 1000:>11.1f} "
+            f"{load_s * 1000:>10.1f} {build_s / load_s:>7.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        time_cold_start(args.sizes, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Measure batch throughput of `Workflow.execute_many`.
+
+Runs a small branching workflow over many initial states, once as a plain
+sequence of `execute_async` calls and then through `execute_many` at several
+concurrency levels, and reports runs per second.
+
+Usage:
+    python -m benchmarks.batch [--runs N] [--concurrency 1 10 100 ...]
+"""
+
+import argparse
+import asyncio
+import time
+
+from workflows.base import Workflow
+from workflows.builder import WorkflowBuilder
+
+DEFINITION = {
+    "name": "Batch benchmark",
+    "nodes": [
+        {
+            "name": "check_adult",
+            "type": "if",
+            "parameters": {"condition": {">=": [{"var": "age"}, 18]}},
+        },
+        {
+            "name": "adult",
+            "type": "set",
+            "parameters": {"variable_name": "status", "value": "adult"},
+        },
+        {
+            "name": "minor",
+            "type": "set",
+            "parameters": {"variable_name": "status", "value": "minor"},
+        },
+        {
+            "name": "copy_name",
+            "type": "set",
+            "parameters": {"variable_name": "profile.name", "value": "name"},
+        },
+    ],
+    "connections": {
+        "check_adult": [
+            {"to": "adult", "label": "true"},
+            {"to": "minor", "label": "false"},
+        ],
+        "adult": [{"to": "copy_name", "label": "main"}],
+        "minor": [{"to": "copy_name", "label": "main"}],
+    },
+}
+
+
+def _states(runs: int):
+    for i in range(runs):
+        yield {"age": i % 40, "name": f"user-{i}"}
+
+
+async def _sequential(workflow: Workflow, runs: int) -> int:
+    completed = 0
+    for state in _states(runs):
+        await workflow.execute_async(state=state)
+        completed += 1
+    return completed
+
+
+async def _batch(workflow: Workflow, runs: int, concurrency: int) -> int:
+    completed = 0
+    async for result in workflow.execute_many(_states(runs), concurrency=concurrency):
+        assert result.ok, result.error
+        expected = "adult" if result.index % 40 >= 18 else "minor"
+        assert result.ctx.state["status"] == expected
+        completed += 1
+    return completed
+
+
+def _report(label: str, runs: int, elapsed: float) -> None:
+    print(f"{label:<28} {elapsed * 1000:>10.1f} {runs / elapsed:>12.0f}")
+
+
+def run(runs: int, concurrency_levels: list[int]) -> None:
+    workflow = WorkflowBuilder(DEFINITION).build()
+    print(f"{'mode':<28} {'wall (ms)':>10} {'runs/s':>12}")
+
+    start = time.perf_counter()
+    completed = asyncio.run(_sequential(workflow, runs))
+    _report("sequential execute_async", completed, time.perf_counter() - start)
+
+    for concurrency in concurrency_levels:
+        start = time.perf_counter()
+        completed = asyncio.run(_batch(workflow, runs, concurrency))
+        _report(f"execute_many (c={concurrency})", completed, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 100, 1000])
+    args = parser.parse_args()
+    run(args.runs, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure WorkflowBuilder.build with and without the workflow cache.
+
+Timings compare uncached builds with cache hits on a copy of the
+definition, which hash it, and on a caller-supplied key, which do not.
+Sharing between caches is covered by tests/test_cache.py.
+
+Usage:
+    python -m benchmarks.cache [--sizes 10 100 1000] [--number N]
+"""
+
+import argparse
+import copy
+import time
+
+from workflows.builder import WorkflowBuilder
+from workflows.cache import WorkflowCache
+
+
+def chain_definition(size: int) -> dict:
+    """A linear chain of `size` set nodes."""
+    nodes = [
+        {
+            "name": f"node_{i}",
+            "type": "set",
+            "parameters": {"variable_name": f"v{i}", "value": i},
+        }
+        for i in range(size)
+    ]
+    connections = {
+        f"node_{i}": [{"to": f"node_{i + 1}", "label": "main"}] for i in range(size - 1)
+    }
+    return {"name": f"chain-{size}", "nodes": nodes, "connections": connections}
+
+
+def _per_build(definitions: list[dict], cache: WorkflowCache | None, **kwargs) -> float:
+    start = time.perf_counter()
+    for definition in definitions:
+        WorkflowBuilder(definition, cache=cache, **kwargs).build()
+    return (time.perf_counter() - start) / len(definitions)
+
+
+def run(sizes: list[int], number: int) -> None:
+    print(
+        f"{'nodes':>7} {'uncached (us)':>14} {'hashed (us)':>12} "
+        f"{'key (us)':>9} {'speedup':>8}"
+    )
+    for size in sizes:
+        definition = chain_definition(size)
+        copies = [copy.deepcopy(definition) for _ in range(number)]
+        cache = WorkflowCache(maxsize=number + 1)
+        # Loading the same definition again yields an equal but distinct dict
+        WorkflowBuilder(copy.deepcopy(definition), cache=cache).build()
+        WorkflowBuilder(definition, cache=cache, key=definition["name"]).build()
+
+        uncached = _per_build([definition] * number, None)
+        hashed = _per_build(copies, cache)
+        keyed = _per_build(copies, cache, key=definition["name"])
+        print(
+            f"{size:>7} {uncached * 1e6:>14.1f} {hashed * 1e6:>12.1f} "
+            f"{keyed * 1e6:>9.2f} {uncached / keyed:>7.0f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--number", "-n", type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Workflows compiled to Python code vs. the interpreter.
+
+The timed workflow loops over a list with conditions and set nodes in the
+body. tests/test_codegen.py checks compiled runs of random workflows
+against the interpreter, the fallback and the disk cache.
+
+Usage:
+    python -m benchmarks.codegen [--items 20000]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from workflows.builder import WorkflowBuilder
+
+
+def node(name: str, type: str, **parameters) -> dict:
+    return {"name": name, "type": type, "parameters": parameters}
+
+
+def loop_definition() -> dict:
+    return {
+        "name": "codegen-loop",
+        "nodes": [
+            node("init", "set", variable_name="total", value=0),
+            node("loop", "for", collection="items", iterator_var="current"),
+            node("big", "if", condition={">": [{"var": "loop.item"}, 50]}),
+            node("mark_big", "set", variable_name="last_big", value="loop.item"),
+            node("small", "if", condition={"<": [{"var": "loop.item"}, 10]}),
+            node("mark_small", "set", variable_name="last_small", value="loop.item"),
+            node("seen", "set", variable_name="last", value="current"),
+            node("end", "end_loop"),
+            node("done", "set", variable_name="status", value=True),
+        ],
+        "connections": {
+            "init": [{"to": "loop", "label": "main"}],
+            "loop": [{"to": "big", "label": "body"}, {"to": "done", "label": "exit"}],
+            "big": [{"to": "mark_big", "label": "true"}, {"to": "small", "label": "false"}],
+            "mark_big": [{"to": "seen", "label": "main"}],
+            "small": [{"to": "mark_small", "label": "true"}, {"to": "seen", "label": "false"}],
+            "mark_small": [{"to": "seen", "label": "main"}],
+            "seen": [{"to": "end", "label": "main"}],
+            "end": [{"to": "loop", "label": "main"}],
+        },
+    }
+
+
+async def time_loop(items: int) -> None:
+    workflow = WorkflowBuilder(loop_definition(), cache=None).build()
+    program = workflow.compile()
+    values = [random.Random(i).randrange(100) for i in range(items)]
+
+    start = time.perf_counter()
+    await workflow.execute_async(state={"items": values})
+    interpreted = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await program.execute_async(state={"items": values})
+    compiled = time.perf_counter() - start
+
+    print(f"{'run':<12} {'ms':>9} {'us/item':>8}")
+    print(f"{'interpreted':<12} {interpreted * 1000:>9.1f} {interpreted / items * 1e6:>8.2f}")
+    print(f"{'compiled':<12} {compiled * 1000:>9.1f} {compiled / items * 1e6:>8.2f}")
+    print(f"Speedup: {interpreted / compiled:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=20_000)
+    args = parser.parse_args()
+
+    asyncio.run(time_loop(args.items))
+
+
+if __name__ == "__main__":
+    main()
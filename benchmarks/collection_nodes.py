@@ -0,0 +1,184 @@
+"""
+Compare collection nodes against a `for`/`end_loop` cycle over the same list.
+
+Every node is first checked for conformance: the NumPy path (when NumPy is
+installed) must give exactly the same result as the pure Python path on
+random numeric lists and on edge cases that force a fallback.
+
+Usage:
+    python -m benchmarks.collection_nodes [--size N] [--loop-size N]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from nodes.assignment import SetNode
+from nodes.collection import CollectionNode, FilterNode, MapNode, ReduceNode
+from nodes.connection import ConnectionLabel, NodeConnection
+from nodes.loop import EndLoopNode, ForLoopNode
+from utils.vector import np
+from workflows.base import Workflow
+from workflows.builder import WorkflowBuilder
+
+EXPRESSIONS = [
+    {"*": [{"var": ""}, 2]},
+    {"+": [{"var": ""}, 0.5, 1]},
+    {"-": [{"var": ""}]},
+    {"/": [{"var": ""}, 4]},
+    {"%": [{"var": ""}, 3]},
+    {"/": [100, {"var": ""}]},  # division by zero falls back
+    {"*": [{"var": ""}, {"var": ""}, {"var": ""}, {"var": ""}]},  # may leave the exact range
+    {">": [{"var": ""}, 10]},
+    {"and": [{">=": [{"var": ""}, 0]}, {"!=": [{"var": ""}, 3]}]},
+    {"!": {"%": [{"var": ""}, 2]}},
+    {"var": "x"},  # not vectorizable
+]
+
+EDGE_LISTS = [
+    [],
+    [0],
+    [0, 1, 2.0, 2.5, -3],
+    [True, 2, 3],
+    [1, None, 3],
+    [2**60, 1],
+    [float("nan"), 1.0],
+    [{"x": 1}, {"x": 2}],
+]
+
+
+def _random_lists(count: int) -> list[list]:
+    rng = random.Random(9)
+    lists = []
+    for _ in range(count):
+        size = rng.randint(1, 50)
+        if rng.random() < 0.5:
+            lists.append([rng.randint(-10**6, 10**6) for _ in range(size)])
+        else:
+            lists.append([rng.choice([rng.uniform(-100, 100), rng.randint(-5, 5)]) for _ in range(size)])
+    return lists
+
+
+def _outcome(node: CollectionNode, items: list):
+    try:
+        result = node.apply(items)
+    except Exception as exc:  # noqa: BLE001 - compare failure modes
+        return "error", type(exc)
+    # Compare types too, e.g. 2 and 2.0 must not be confused
+    return "ok", repr(result)
+
+
+def _nodes(expression) -> list[CollectionNode]:
+    nodes: list[CollectionNode] = [
+        MapNode("map", "", "items", "out", expression=expression),
+        FilterNode("filter", "", "items", "out", condition=expression),
+        ReduceNode("count", "", "items", "out", "count", expression=expression),
+        ReduceNode("group", "", "items", "out", "group_by", expression=expression, key={"%": [{"var": ""}, 2]}),
+    ]
+    for operation in ("sum", "min", "max"):
+        nodes.append(ReduceNode(operation, "", "items", "out", operation, expression=expression))
+        nodes.append(ReduceNode(operation, "", "items", "out", operation))
+    return nodes
+
+
+def check_conformance() -> int:
+    """Assert the vectorized path matches the pure Python path."""
+    checked = 0
+    for expression in EXPRESSIONS:
+        for node in _nodes(expression):
+            vector = node.vector
+            for items in EDGE_LISTS + _random_lists(30):
+                node.vector = None
+                expected = _outcome(node, items)
+                node.vector = vector
+                actual = _outcome(node, items)
+                assert actual == expected, (
+                    f"{node.type} {expression!r} on {items!r}: expected {expected!r}, got {actual!r}"
+                )
+                checked += 1
+    return checked
+
+
+def collection_workflow(size: int) -> Workflow:
+    nodes, connections = [], {}
+
+    def add(name: str, type: str, parameters: dict, *targets: str) -> None:
+        nodes.append({"name": name, "type": type, "parameters": parameters})
+        connections[name] = [{"to": to, "label": "main"} for to in targets]
+
+    add("init", "set", {"variable_name": "items", "value": list(range(size))}, "double")
+    add(
+        "double",
+        "map",
+        {"collection": "items", "expression": {"*": [{"var": ""}, 2]}, "output": "doubled"},
+        "odd",
+    )
+    add(
+        "odd",
+        "filter",
+        {"collection": "doubled", "condition": {"%": [{"var": ""}, 3]}, "output": "kept"},
+        "total",
+    )
+    add("total", "reduce", {"collection": "kept", "operation": "sum", "output": "total"})
+    definition = {"name": "collections", "nodes": nodes, "connections": connections}
+    return WorkflowBuilder(definition, cache=None).build()
+
+
+def loop_workflow(size: int) -> Workflow:
+    init = SetNode("init", "", "items", list(range(size)))
+    loop = ForLoopNode("loop", "", "items", iterator_var="item")
+    body = SetNode("body", "", "last", "item")
+    end = EndLoopNode("end", "")
+
+    init.link([NodeConnection(loop)])
+    loop.link([NodeConnection(body, ConnectionLabel.BODY)])
+    body.link([NodeConnection(end)])
+    end.link([NodeConnection(loop)])
+
+    nodes = [init, loop, body, end]
+    return Workflow(nodes, [conn for node in nodes for conn in node.connections])
+
+
+def _timed(workflow: Workflow):
+    async def timed():
+        # Timed inside the loop: asyncio.run() on Python 3.12.1 reprs the
+        # returned context when restoring signal handlers
+        start = time.perf_counter()
+        ctx = await workflow.execute_async()
+        return ctx, time.perf_counter() - start
+
+    return asyncio.run(timed())
+
+
+def run(size: int, loop_size: int) -> None:
+    print(f"Conformance: {check_conformance()} node/list pairs match (NumPy: {np is not None})")
+
+    ctx, collection_s = _timed(collection_workflow(size))
+    expected = sum(2 * i for i in range(size) if (2 * i) % 3)
+    assert ctx.state["total"] == expected
+
+    _, loop_s = _timed(loop_workflow(loop_size))
+
+    print(f"{'workflow':<36} {'items':>10} {'wall (ms)':>10} {'per item (us)':>14}")
+    print(
+        f"{'map + filter + reduce(sum)':<36} {size:>10} {collection_s * 1000:>10.1f} "
+        f"{collection_s / size * 1e6:>14.3f}"
+    )
+    print(
+        f"{'for/end_loop, one set per item':<36} {loop_size:>10} {loop_s * 1000:>10.1f} "
+        f"{loop_s / loop_size * 1e6:>14.3f}"
+    )
+    print(f"Per-item speedup: {(loop_s / loop_size) / (collection_s / size):.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--loop-size", type=int, default=20_000)
+    args = parser.parse_args()
+    run(args.size, args.loop_size)
+
+
+if __name__ == "__main__":
+    main()
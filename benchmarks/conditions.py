@@ -0,0 +1,72 @@
+"""
+Compare compiled JSON Logic conditions against the `json_logic` interpreter.
+
+Each rule is timed with both evaluators. Conformance with `jsonLogic` is
+checked by tests/test_logic.py.
+
+Usage:
+    python -m benchmarks.conditions [--number N]
+"""
+
+import argparse
+import timeit
+from collections import ChainMap
+
+from json_logic import jsonLogic
+
+from utils.logic import compile_logic
+
+DATA = {
+    "age": 25,
+    "name": "Alice",
+    "temperature": 22.5,
+    "humidity": 60,
+    "status": "ok",
+    "items": [1, 2, 3, 4, 5],
+    "user": {"profile": {"age": 42, "tags": ["a", "b"]}},
+    "empty": [],
+    "zero": 0,
+    "flag": False,
+}
+
+NODE_CONTEXT = {"loop": {"item": {"price": 12, "qty": 3}, "index": 2}}
+
+def run(number: int) -> None:
+    rules = {
+        "comparison": {">=": [{"var": "age"}, 18]},
+        "nested and/or": {
+            "and": [
+                {">=": [{"var": "temperature"}, 20]},
+                {"<=": [{"var": "temperature"}, 30]},
+                {"or": [{"==": [{"var": "humidity"}, 50]}, {"==": [{"var": "humidity"}, 60]}]},
+                {"!": {"==": [{"var": "status"}, "error"]}},
+            ]
+        },
+        "node_context var": {"*": [{"var": "loop.item.price"}, {"var": "loop.item.qty"}]},
+        "map/filter": {"filter": [{"var": "items"}, {"%": [{"var": ""}, 2]}]},
+    }
+    print(f"{'rule':<20} {'jsonLogic (us)':>15} {'compiled (us)':>15} {'speedup':>8}")
+    for label, rule in rules.items():
+        compiled = compile_logic(rule)
+        # Reproduce what each ConditionNode implementation does per visit
+        interpreted_s = timeit.timeit(
+            lambda: jsonLogic(rule, {**DATA, **NODE_CONTEXT}), number=number
+        )
+        compiled_s = timeit.timeit(
+            lambda: compiled(ChainMap(NODE_CONTEXT, DATA)), number=number
+        )
+        print(
+            f"{label:<20} {interpreted_s / number * 1e6:>15.2f} "
+            f"{compiled_s / number * 1e6:>15.2f} {interpreted_s / compiled_s:>7.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", "-n", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Cost and behavior of per-node and per-run deadlines.
+
+A workflow fans out to http nodes whose requests hang on a local server
+that never answers: each run must be cut off by the node's `deadline`
+parameter or by the run's `deadline`, in both scheduler modes, raising or
+returning partial results with the cut-off nodes marked, and the cancelled
+requests must close their connections. Timings then run a linear chain of
+set nodes without deadlines, with a run deadline and with a deadline on
+every node. Runs without deadlines must not be slower than runs with a run
+deadline (within `--tolerance`), i.e. unused deadlines cost nothing.
+
+Usage:
+    python -m benchmarks.deadlines [--nodes N] [--repeat N] [--tolerance 0.05]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.cache import chain_definition
+from workflows.base import Workflow
+from workflows.builder import WorkflowBuilder
+from workflows.exception import DeadlineExceededException
+from workflows.scheduler import TIMED_OUT_KEY, ExecutionMode
+
+
+class Hang:
+    """Reads requests and never answers, until the client closes the connection."""
+
+    def __init__(self):
+        self.open = 0
+        self.port = 0
+        self._server: asyncio.Server | None = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.open += 1
+        try:
+            while await reader.read(1 << 16):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.open -= 1
+            writer.close()
+
+
+def node(name: str, type: str, **parameters) -> dict:
+    return {"name": name, "type": type, "parameters": parameters}
+
+
+def hanging_definition(port: int) -> dict:
+    """A quick branch, a hung lookup with a deadline and a hung backup without one."""
+    url = f"http://127.0.0.1:{port}"
+    return {
+        "name": "deadlines",
+        "nodes": [
+            node("start", "set", variable_name="started", value=True),
+            node("quick", "set", variable_name="quick", value=1),
+            node("lookup", "http", url=f"{url}/lookup", timeout=None, deadline=0.1),
+            node("use_lookup", "set", variable_name="found", value="lookup.body"),
+            node("backup", "http", url=f"{url}/backup", timeout=None),
+        ],
+        "connections": {
+            "start": [
+                {"to": "quick", "label": "main"},
+                {"to": "lookup", "label": "main"},
+                {"to": "backup", "label": "main"},
+            ],
+            "lookup": [{"to": "use_lookup", "label": "main"}],
+        },
+    }
+
+
+async def _elapsed(run) -> tuple[float, object]:
+    start = time.perf_counter()
+    try:
+        result = await run
+    except DeadlineExceededException as error:
+        result = error
+    return time.perf_counter() - start, result
+
+
+async def check_cancellation() -> None:
+    server = Hang()
+    await server.start()
+    try:
+        workflow = WorkflowBuilder(hanging_definition(server.port), cache=None).build()
+        for mode in ExecutionMode:
+            elapsed, error = await _elapsed(workflow.execute_async(mode=mode, deadline=5))
+            assert isinstance(error, DeadlineExceededException) and error.nodes == ["lookup"], error
+            assert elapsed < 1, elapsed
+
+            elapsed, ctx = await _elapsed(
+                workflow.execute_async(mode=mode, deadline=0.3, partial=True)
+            )
+            assert 0.3 <= elapsed < 1, elapsed
+            assert ctx.state == {"started": True, "quick": 1}, ctx.state
+            assert ctx.node_context == {
+                "lookup": {TIMED_OUT_KEY: True},
+                "backup": {TIMED_OUT_KEY: True},
+            }, ctx.node_context
+
+            elapsed, error = await _elapsed(workflow.execute_async(mode=mode, deadline=0.05))
+            assert sorted(error.nodes) == ["backup", "lookup"], error
+            assert elapsed < 0.5, elapsed
+
+        # Cancelled requests closed their connections instead of pooling them
+        await asyncio.sleep(0.05)
+        assert server.open == 0, server.open
+        print("Hung nodes cut off in both modes, partial results marked, connections closed")
+    finally:
+        await server.close()
+
+
+def _best_run(workflow: Workflow, repeat: int, **kwargs) -> float:
+    async def timed() -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await workflow.execute_async(**kwargs)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    return asyncio.run(timed())
+
+
+def time_chain(nodes: int, repeat: int, tolerance: float) -> None:
+    definition = chain_definition(nodes)
+    plain = WorkflowBuilder(definition, cache=None).build()
+    for raw in definition["nodes"]:
+        raw["parameters"]["deadline"] = 60
+    with_deadlines = WorkflowBuilder(definition, cache=None).build()
+
+    timings = {
+        "none": _best_run(plain, repeat),
+        "run deadline": _best_run(plain, repeat, deadline=60),
+        "every node": _best_run(with_deadlines, repeat),
+    }
+    baseline = timings["none"]
+    print(f"{'deadlines':<14} {'wall (ms)':>10} {'per node (us)':>14} {'overhead':>9}")
+    for label, elapsed in timings.items():
+        print(
+            f"{label:<14} {elapsed * 1000:>10.2f} {elapsed / nodes * 1e6:>14.3f} "
+            f"{(elapsed / baseline - 1) * 100:>8.1f}%"
+        )
+
+    assert baseline <= timings["run deadline"] * (1 + tolerance), (
+        "runs without deadlines are slower than runs with a run deadline"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+
+    asyncio.run(check_cancellation())
+    time_chain(args.nodes, args.repeat, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare `ExecutionContext.fork`/`merge` against deep-copying the state.
+
+A fork writes a handful of keys into a state of growing size, then merges
+back. Deep copies grow with the state; fork + merge stays constant. Merge
+semantics and conflict policies are checked first.
+
+Usage:
+    python -m benchmarks.fork [--sizes 1000 10000 100000] [--writes 10]
+"""
+
+import argparse
+import copy
+import time
+
+from workflows.context import ExecutionContext
+from workflows.exception import MergeConflictException
+
+
+def check_semantics() -> None:
+    """Assert fork isolation and the merge conflict policies."""
+    parent = ExecutionContext(state={"a": 1, "user": {"name": "x", "tags": ["t"]}, "gone": 0})
+    child = parent.fork()
+    child.set("a", 2)
+    child.set("user.name", "y")
+    child.set("user.profile.age", 3)
+    del child.state["gone"]
+    child.update_node_context("n", "k", 1)
+
+    assert child.get("user.name") == "y" and child.get("user.tags") == ["t"]
+    assert parent.state == {"a": 1, "user": {"name": "x", "tags": ["t"]}, "gone": 0}
+    assert parent.node_context == {}
+
+    parent.merge(child)
+    assert parent.state == {"a": 2, "user": {"name": "y", "tags": ["t"], "profile": {"age": 3}}}
+    assert parent.node_context == {"n": {"k": 1}}
+
+    # Sibling forks writing the same key
+    def forks():
+        ctx = ExecutionContext(state={"a": 0, "b": {"c": 0}, "free": 0})
+        first, second = ctx.fork(), ctx.fork()
+        first.set("a", 1)
+        first.set("b.c", 1)
+        second.set("a", 2)
+        second.set("b.c", 2)
+        second.set("free", 2)
+        ctx.merge(first)
+        return ctx, second
+
+    ctx, second = forks()
+    ctx.merge(second, "child_wins")
+    assert ctx.state == {"a": 2, "b": {"c": 2}, "free": 2}
+
+    ctx, second = forks()
+    ctx.merge(second, "parent_wins")
+    assert ctx.state == {"a": 1, "b": {"c": 1}, "free": 2}
+
+    ctx, second = forks()
+    try:
+        ctx.merge(second, "error")
+    except MergeConflictException as exc:
+        assert sorted(exc.conflicts) == ["state.a", "state.b.c"]
+    else:
+        raise AssertionError("expected a merge conflict")
+    assert ctx.state == {"a": 1, "b": {"c": 1}, "free": 0}
+
+    # A nested dict read from the state and stored elsewhere merges as a plain dict
+    ctx = ExecutionContext(state={"user": {"name": "x"}})
+    child = ctx.fork()
+    child.set("copy", child.get("user"))
+    ctx.merge(child)
+    assert type(ctx.state["copy"]) is dict and ctx.state["copy"] == {"name": "x"}
+
+
+def make_state(size: int) -> dict:
+    return {f"key_{i}": {"value": i, "tags": [i, i + 1]} for i in range(size)}
+
+
+def run(sizes: list[int], writes: int) -> None:
+    check_semantics()
+    print("Semantics: fork isolation and merge policies OK")
+
+    print(f"{'keys':>8} {'deepcopy (ms)':>14} {'fork+merge (us)':>16} {'speedup':>9}")
+    for size in sizes:
+        ctx = ExecutionContext(state=make_state(size))
+
+        start = time.perf_counter()
+        copied = ExecutionContext(state=copy.deepcopy(ctx.state))
+        for i in range(writes):
+            copied.set(f"key_{i}.value", -i)
+        deepcopy_s = time.perf_counter() - start
+
+        repeat = 100
+        start = time.perf_counter()
+        for _ in range(repeat):
+            child = ctx.fork()
+            for i in range(writes):
+                child.set(f"key_{i}.value", -i)
+            ctx.merge(child)
+        fork_s = (time.perf_counter() - start) / repeat
+
+        assert ctx.state == copied.state
+        print(
+            f"{size:>8} {deepcopy_s * 1000:>14.1f} {fork_s * 1e6:>16.1f} "
+            f"{deepcopy_s / fork_s:>8.0f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--writes", type=int, default=10)
+    args = parser.parse_args()
+    run(args.sizes, args.writes)
+
+
+if __name__ == "__main__":
+    main()
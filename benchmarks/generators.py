@@ -0,0 +1,113 @@
+"""
+Synthetic `RawWorkflow` definitions for benchmarks.
+
+Every generator returns a plain JSON-compatible definition that goes through
+`WorkflowBuilder.build`, so building is measured along with execution.
+"""
+
+from workflows.base import RawWorkflow
+
+
+class _Definition:
+    def __init__(self, name: str):
+        self.name = name
+        self.nodes: list[dict] = []
+        self.connections: dict[str, list[dict]] = {}
+
+    def add(self, name: str, type: str, parameters: dict, *targets: tuple[str, str]) -> None:
+        self.nodes.append(
+            {"name": name, "type": type, "description": "", "position": [0, 0], "parameters": parameters}
+        )
+        if targets:
+            self.connections[name] = [{"to": to, "label": label} for to, label in targets]
+
+    def set(self, name: str, variable: str, value, *targets: str) -> None:
+        self.add(
+            name,
+            "set",
+            {"variable_name": variable, "value": value},
+            *((target, "main") for target in targets),
+        )
+
+    def build(self) -> RawWorkflow:
+        return {"name": self.name, "nodes": self.nodes, "connections": self.connections}
+
+
+def wide_fanout(width: int) -> RawWorkflow:
+    """One root routing to `width` independent set nodes."""
+    definition = _Definition(f"wide-{width}")
+    leaves = [f"leaf_{i}" for i in range(width)]
+    definition.set("root", "started", True, *leaves)
+    for i, leaf in enumerate(leaves):
+        definition.set(leaf, f"v{i}", i)
+    return definition.build()
+
+
+def deep_chain(depth: int) -> RawWorkflow:
+    """A linear chain of `depth` set nodes, each copying the previous value."""
+    definition = _Definition(f"deep-{depth}")
+    definition.set("node_0", "v0", 0, "node_1")
+    for i in range(1, depth):
+        targets = [f"node_{i + 1}"] if i + 1 < depth else []
+        definition.set(f"node_{i}", f"v{i}", f"v{i - 1}", *targets)
+    return definition.build()
+
+
+def diamonds(width: int, stages: int) -> RawWorkflow:
+    """`stages` diamonds in a row: a split into `width` branches, then a join."""
+    definition = _Definition(f"diamonds-{width}x{stages}")
+    definition.set("split_0", "stage", 0, *(f"branch_0_{j}" for j in range(width)))
+    for stage in range(stages):
+        join = f"join_{stage}"
+        for j in range(width):
+            definition.set(f"branch_{stage}_{j}", f"b{j}", stage, join)
+        if stage + 1 < stages:
+            nxt = [f"branch_{stage + 1}_{j}" for j in range(width)]
+            definition.set(join, "stage", stage + 1, *nxt)
+        else:
+            definition.set(join, "stage", stage + 1)
+    return definition.build()
+
+
+def nested_loops(outer: int, inner: int) -> RawWorkflow:
+    """A `for` over `outer` items whose body is a `for` over `inner` items."""
+    definition = _Definition(f"loops-{outer}x{inner}")
+    definition.set("init_outer", "rows", list(range(outer)), "init_inner")
+    definition.set("init_inner", "cols", list(range(inner)), "outer")
+    definition.add(
+        "outer",
+        "for",
+        {"collection": "rows", "iterator_var": "row"},
+        ("inner", "body"),
+        ("done", "exit"),
+    )
+    definition.add(
+        "inner",
+        "for",
+        {"collection": "cols", "iterator_var": "col"},
+        ("cell", "body"),
+        ("end_outer", "exit"),
+    )
+    definition.set("cell", "last", "col", "end_inner")
+    definition.add("end_inner", "end_loop", {}, ("inner", "main"))
+    definition.add("end_outer", "end_loop", {}, ("outer", "main"))
+    definition.set("done", "status", "done")
+    return definition.build()
+
+
+def heavy_conditions(count: int, terms: int) -> RawWorkflow:
+    """`count` if nodes in a row, each testing `terms` comparisons, with joined branches."""
+    definition = _Definition(f"conditions-{count}x{terms}")
+    definition.set("init", "x", terms // 2, "if_0")
+    for i in range(count):
+        condition = {
+            "and": [
+                {"or": [{">=": [{"var": "x"}, j]}, {"==": [{"var": "y"}, j]}]}
+                for j in range(terms)
+            ]
+        }
+        definition.add(f"if_{i}", "if", {"condition": condition}, (f"yes_{i}", "true"), (f"no_{i}", "false"))
+        nxt = [f"if_{i + 1}"] if i + 1 < count else []
+        definition.set(f"yes_{i}", f"c{i}", True, *nxt)
+        definition.set(f"no_{i}", f"c{i}", False, *nxt)
+    return definition.build()
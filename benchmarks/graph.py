@@ -0,0 +1,84 @@
+"""
+Show that building and querying a GraphIndex scales linearly.
+
+The generated graph repeats a block of a condition, two branches joining
+again, and a `for` loop over a two-node body, so the index has joins, back
+edges and loop bodies to classify.
+
+Usage:
+    python -m benchmarks.graph [--sizes 10000 50000 100000]
+"""
+
+import argparse
+import time
+
+from workflows.builder import WorkflowBuilder
+from workflows.graph import GraphIndex
+
+BLOCK_SIZE = 7
+
+
+def blocks_definition(blocks: int) -> dict:
+    nodes, connections = [], {}
+
+    def add(name: str, type: str, parameters: dict, *targets: tuple[str, str]) -> None:
+        nodes.append({"name": name, "type": type, "parameters": parameters})
+        connections[name] = [{"to": to, "label": label} for to, label in targets]
+
+    for i in range(blocks):
+        nxt = f"if_{i + 1}"
+        add(f"if_{i}", "if", {"condition": {"var": "flag"}}, (f"a_{i}", "true"), (f"b_{i}", "false"))
+        add(f"a_{i}", "set", {"variable_name": "x", "value": 1}, (f"loop_{i}", "main"))
+        add(f"b_{i}", "set", {"variable_name": "x", "value": 2}, (f"loop_{i}", "main"))
+        exit_target = [(nxt, "exit")] if i + 1 < blocks else []
+        add(f"loop_{i}", "for", {"collection": "items"}, (f"body_{i}", "body"), *exit_target)
+        add(f"body_{i}", "set", {"variable_name": "y", "value": f"loop_{i}.item"}, (f"tail_{i}", "main"))
+        add(f"tail_{i}", "set", {"variable_name": "z", "value": 3}, (f"end_{i}", "main"))
+        add(f"end_{i}", "end_loop", {}, (f"loop_{i}", "main"))
+
+    return {"name": f"blocks-{blocks}", "nodes": nodes, "connections": connections}
+
+
+def run(sizes: list[int]) -> None:
+    print(
+        f"{'nodes':>8} {'build (ms)':>11} {'index (ms)':>11} {'us/node':>8} "
+        f"{'queries (ms)':>13} {'loops':>6}"
+    )
+    for size in sizes:
+        definition = blocks_definition(max(1, size // BLOCK_SIZE))
+        workflow = WorkflowBuilder(definition, cache=None).build()
+
+        start = time.perf_counter()
+        for _ in range(3):
+            index = GraphIndex(workflow.nodes)
+        index_s = (time.perf_counter() - start) / 3
+
+        start = time.perf_counter()
+        WorkflowBuilder(definition, cache=None).build()
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        edges = sum(len(index.successors(i)) for i in range(len(index)))
+        true_edges = sum(len(index.successors(i, "true")) for i in range(len(index)))
+        reachable = sum(index.reachable_from(index.start))
+        query_s = time.perf_counter() - start
+
+        assert edges == len(workflow.connections)
+        assert true_edges == reachable // BLOCK_SIZE == len(index.loops)
+        assert all(loop.is_for_loop and len(loop.body) == 4 for loop in index.loops.values())
+
+        print(
+            f"{len(index):>8} {build_s * 1000:>11.1f} {index_s * 1000:>11.1f} "
+            f"{index_s / len(index) * 1e6:>8.2f} {query_s * 1000:>13.1f} {len(index.loops):>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
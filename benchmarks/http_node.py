@@ -0,0 +1,141 @@
+"""
+Fan out http nodes against a local stand-in server over pooled connections.
+
+An in-process asyncio HTTP server answers with a small delay. A parallel for
+loop sends one request per item through http nodes, over at most
+`--per-host` connections. Timings compare a sequential loop, the parallel
+fan-out with connection reuse and the same fan-out opening a connection per
+request. Response handling is covered by tests/test_http_node.py.
+
+Usage:
+    python -m benchmarks.http_node [--items N] [--per-host N] [--delay SECONDS]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from utils.http_client import ConnectionPool, default_pool
+from workflows.builder import WorkflowBuilder
+
+
+class StandIn:
+    """Minimal keep-alive HTTP/1.1 server answering `/items/<id>` with its id."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections = 0
+        self.requests = 0
+        self.port = 0
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        self._server.close()
+        for writer in self._writers:
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while request_line := await reader.readline():
+                _, path, _ = request_line.decode().split(" ", 2)
+                while await reader.readline() != b"\r\n":
+                    pass
+                self.requests += 1
+                await self._respond(writer, path)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, path: str) -> None:
+        await asyncio.sleep(self.delay)
+        data = json.dumps({"id": path.rsplit("/", 1)[1]}).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            b"Content-Length: %d\r\n\r\n%s" % (len(data), data)
+        )
+
+
+def node(name: str, type: str, **parameters) -> dict:
+    return {"name": name, "type": type, "parameters": parameters}
+
+
+def fan_out_definition(items: int, parallel: bool, per_host: int) -> dict:
+    return {
+        "name": "fan-out",
+        "nodes": [
+            node("items", "set", variable_name="items", value=list(range(items))),
+            node(
+                "loop",
+                "for",
+                collection="items",
+                parallel=parallel,
+                max_concurrency=items,
+                result="fetch.body.id",
+            ),
+            node("fetch", "http", url="{config.base}/items/{loop.item}", timeout=10),
+            node("end", "end_loop"),
+        ],
+        "connections": {
+            "items": [{"to": "loop", "label": "main"}],
+            "loop": [{"to": "fetch", "label": "body"}],
+            "fetch": [{"to": "end", "label": "main"}],
+            "end": [{"to": "loop", "label": "main"}],
+        },
+    }
+
+
+def run(items: int, per_host: int, delay: float) -> None:
+    default_pool.max_per_host = per_host
+
+    async def main() -> None:
+        server = StandIn(delay)
+        await server.start()
+        base = f"http://127.0.0.1:{server.port}"
+        try:
+            results = {}
+            for label, parallel, pool in (
+                ("sequential loop", False, default_pool),
+                ("parallel, pooled", True, default_pool),
+                ("parallel, no reuse", True, ConnectionPool(per_host, idle_timeout=0)),
+            ):
+                workflow = WorkflowBuilder(
+                    fan_out_definition(items, parallel, per_host), cache=None
+                ).build()
+                workflow.index.nodes[workflow.index.names["fetch"]].pool = pool
+                connections = server.connections
+                start = time.perf_counter()
+                await workflow.execute_async(config={"base": base})
+                elapsed = time.perf_counter() - start
+                results[label] = (elapsed, server.connections - connections)
+        finally:
+            await server.close()
+
+        print(f"{'mode':<20} {'wall (ms)':>10} {'connections':>12}")
+        for label, (elapsed, connections) in results.items():
+            print(f"{label:<20} {elapsed * 1000:>10.1f} {connections:>12}")
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--per-host", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.005)
+    args = parser.parse_args()
+    run(args.items, args.per_host, args.delay)
+
+
+if __name__ == "__main__":
+    main()
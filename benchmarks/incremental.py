@@ -0,0 +1,96 @@
+"""
+Incremental re-execution vs. full runs when a few initial keys change.
+
+The timed workflow has independent branches reading one key each: changing
+a key re-executes one branch and replays the others. Re-executions are
+checked against full runs of random workflows by tests/test_incremental.py.
+
+Usage:
+    python -m benchmarks.incremental [--branches 50] [--terms 50]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from workflows.builder import WorkflowBuilder
+
+
+class _Definition:
+    def __init__(self):
+        self.nodes: list[dict] = []
+        self.connections: dict[str, list[dict]] = {}
+
+    def add(self, name: str, type: str, **parameters) -> str:
+        self.nodes.append({"name": name, "type": type, "parameters": parameters})
+        return name
+
+    def connect(self, source: str, target: str, label: str = "main") -> None:
+        self.connections.setdefault(source, []).append({"to": target, "label": label})
+
+    def build(self, name: str) -> dict:
+        return {"name": name, "nodes": self.nodes, "connections": self.connections}
+
+
+def branches_definition(branches: int, terms: int) -> dict:
+    """`branches` independent if/set pairs, each reading its own key."""
+    definition = _Definition()
+    root = definition.add("root", "set", variable_name="started", value=True)
+    for i in range(branches):
+        condition = {
+            "and": [
+                {"or": [{">=": [{"var": f"b{i}"}, j % 5]}, {"==": [{"var": "started"}, j]}]}
+                for j in range(terms)
+            ]
+        }
+        check = definition.add(f"check_{i}", "if", condition=condition)
+        yes = definition.add(f"yes_{i}", "set", variable_name=f"r{i}", value=f"b{i}")
+        no = definition.add(f"no_{i}", "set", variable_name=f"r{i}", value=-1)
+        definition.connect(root, check)
+        definition.connect(check, yes, "true")
+        definition.connect(check, no, "false")
+    return definition.build("branches")
+
+
+async def time_branches(branches: int, terms: int, repeat: int) -> None:
+    workflow = WorkflowBuilder(branches_definition(branches, terms), cache=None).build()
+    state = {f"b{i}": i % 7 for i in range(branches)}
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        await workflow.execute_async(state=dict(state))
+    full = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    run = await workflow.record(state)
+    recorded = time.perf_counter() - start
+
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        key = f"b{rng.randrange(branches)}"
+        value = rng.randrange(7)
+        state[key] = value
+        run = await workflow.reexecute(run, {key: value})
+    incremental = (time.perf_counter() - start) / repeat
+
+    print(f"{'run':<22} {'ms':>8}  steps (executed/reused)")
+    print(f"{'full execute_async':<22} {full * 1000:>8.2f}")
+    print(f"{'recorded':<22} {recorded * 1000:>8.2f}  {len(run.steps)}/0")
+    print(f"{'reexecute, 1 key':<22} {incremental * 1000:>8.2f}  {run.executed}/{run.reused}")
+    print(f"Speedup vs. a full run: {full / incremental:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--branches", type=int, default=50)
+    parser.add_argument("--terms", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    asyncio.run(time_branches(args.branches, args.terms, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare sequential and parallel `for` loops over an I/O-bound body.
+
+The loop body is a single node that sleeps for `--delay` seconds, standing in
+for a network call. Correctness of parallel loops is covered by
+tests/test_loops.py.
+
+Usage:
+    python -m benchmarks.loops [--items N] [--delay SECONDS] [--concurrency 1 10 50]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.scheduler import SleepNode
+from nodes.assignment import SetNode
+from nodes.connection import ConnectionLabel, NodeConnection
+from nodes.loop import EndLoopNode, ForLoopNode
+from workflows.base import Workflow
+
+
+def loop_workflow(items: int, delay: float, max_concurrency: int | None) -> Workflow:
+    init = SetNode("init", "", "items", list(range(items)))
+    loop = ForLoopNode(
+        "loop",
+        "",
+        "items",
+        parallel=max_concurrency is not None,
+        max_concurrency=max_concurrency,
+        result="loop.index",
+    )
+    body = SleepNode("body", delay)
+    end = EndLoopNode("end", "")
+
+    init.link([NodeConnection(loop)])
+    loop.link([NodeConnection(body, ConnectionLabel.BODY)])
+    body.link([NodeConnection(end)])
+    end.link([NodeConnection(loop)])
+
+    nodes = [init, loop, body, end]
+    return Workflow(nodes, [conn for node in nodes for conn in node.connections])
+
+
+def run(items: int, delay: float, concurrency_levels: list[int]) -> None:
+    print(f"{'mode':<24} {'wall (ms)':>10} {'speedup':>8}")
+    baseline = None
+    for max_concurrency in [None, *concurrency_levels]:
+        workflow = loop_workflow(items, delay, max_concurrency)
+        start = time.perf_counter()
+        asyncio.run(workflow.execute_async())
+        elapsed = time.perf_counter() - start
+
+        if max_concurrency is None:
+            baseline = elapsed
+            label = "sequential"
+        else:
+            label = f"parallel (c={max_concurrency})"
+        print(f"{label:<24} {elapsed * 1000:>10.1f} {baseline / elapsed:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.005)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+    run(args.items, args.delay, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Memoized pure nodes vs. evaluating them on every execution.
+
+A for loop runs a heavy condition on each item of a list holding few
+distinct values; declared `pure`, the condition is evaluated once per
+distinct value and served from the workflow's MemoCache afterwards. A batch
+of runs over repeated states does the same for a reduce node across runs.
+Cache semantics (LRU, TTL, keys, inferred read-sets) are checked first, and
+every timed run is compared with the unmemoized result.
+
+Usage:
+    python -m benchmarks.memo [--items 20000] [--distinct 50] [--terms 40]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from nodes.exceptions import NodeValidationException
+from utils.logic import logic_vars
+from workflows.builder import WorkflowBuilder
+from workflows.memo import MISSING, MemoCache, input_key
+
+
+def node(name: str, type: str, **parameters) -> dict:
+    return {"name": name, "type": type, "parameters": parameters}
+
+
+def heavy_condition(terms: int) -> dict:
+    return {
+        "and": [
+            {"or": [{">=": [{"var": "loop.item"}, j % 7]}, {"==": [{"var": "mode"}, j]}]}
+            for j in range(terms)
+        ]
+    }
+
+
+def loop_definition(items: list, condition: dict, pure: bool) -> dict:
+    return {
+        "name": "memo-loop",
+        "nodes": [
+            node("items", "set", variable_name="items", value=items),
+            node("loop", "for", collection="items", parallel=True, result="matched"),
+            node("check", "if", condition=condition, pure=pure),
+            node("yes", "set", variable_name="matched", value=True),
+            node("no", "set", variable_name="matched", value=False),
+            node("end", "end_loop"),
+        ],
+        "connections": {
+            "items": [{"to": "loop", "label": "main"}],
+            "loop": [{"to": "check", "label": "body"}],
+            "check": [{"to": "yes", "label": "true"}, {"to": "no", "label": "false"}],
+            "yes": [{"to": "end", "label": "main"}],
+            "no": [{"to": "end", "label": "main"}],
+            "end": [{"to": "loop", "label": "main"}],
+        },
+    }
+
+
+def reduce_definition(pure: bool) -> dict:
+    return {
+        "name": "memo-reduce",
+        "nodes": [
+            node(
+                "score",
+                "reduce",
+                collection="values",
+                operation="reduce",
+                expression={
+                    "+": [
+                        {"var": "accumulator"},
+                        {"*": [{"var": "current"}, {"var": "current"}]},
+                        {"%": [{"var": "current"}, 3]},
+                    ]
+                },
+                initial=0,
+                output="score",
+                pure=pure,
+            ),
+        ],
+        "connections": {},
+    }
+
+
+def check_semantics() -> None:
+    now = [0.0]
+    cache = MemoCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.put("n", 1, "a")
+    cache.put("n", 2, "b")
+    assert cache.get("n", 1) == "a"
+    cache.put("n", 3, "c")  # evicts 2, the least recently used
+    assert cache.get("n", 2) is MISSING and cache.get("n", 3) == "c"
+    now[0] = 10.0
+    assert cache.get("n", 1) is MISSING
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["expirations"]) == (2, 2, 1, 1)
+    assert stats["nodes"]["n"]["hits"] == 2
+
+    assert len({input_key((1,)), input_key((1.0,)), input_key((True,)), input_key(("1",))}) == 4
+    assert input_key(({"a": 1, "b": [1]},)) == input_key(({"b": [1], "a": 1},))
+    assert logic_vars(heavy_condition(3)) == {"loop.item", "mode"}
+    assert logic_vars({"var": ""}) is None
+
+    try:
+        WorkflowBuilder(
+            {"name": "x", "nodes": [node("c", "if", condition={"var": ""}, pure=True)], "connections": {}},
+            cache=None,
+        ).build()
+    except NodeValidationException:
+        pass
+    else:
+        raise AssertionError("expected a validation error for an unknown read-set")
+
+    # Results differ when an input the condition reads differs
+    threshold = {">": [{"var": "loop.item"}, {"var": "threshold"}]}
+    workflow = WorkflowBuilder(loop_definition([1, 5, 1, 5], threshold, pure=True), cache=None).build()
+    high = asyncio.run(workflow.execute_async(state={"threshold": 3}))
+    low = asyncio.run(workflow.execute_async(state={"threshold": 0}))
+    assert high.node_context["loop"]["results"] == [False, True, False, True]
+    assert low.node_context["loop"]["results"] == [True, True, True, True]
+    assert workflow.memo.stats()["nodes"]["check"] == {"hits": 4, "misses": 4, "hit_rate": 0.5}
+
+    # A memoized group_by result is copied, writes to the state do not reach the cache
+    grouped = WorkflowBuilder(
+        {
+            "name": "group",
+            "nodes": [
+                node("group", "reduce", collection="xs", operation="group_by",
+                     key={"%": [{"var": ""}, 2]}, output="groups", pure=True),
+            ],
+            "connections": {},
+        },
+        cache=None,
+    ).build()
+    first = asyncio.run(grouped.execute_async(state={"xs": [1, 2, 3]}))
+    first.state["groups"][1].append(99)
+    second = asyncio.run(grouped.execute_async(state={"xs": [1, 2, 3]}))
+    assert second.state["groups"] == {1: [1, 3], 0: [2]}, second.state
+    assert grouped.memo.hits == 1
+
+
+def time_loop(items: list, terms: int, pure: bool) -> tuple[float, list, dict]:
+    definition = loop_definition(items, heavy_condition(terms), pure)
+    workflow = WorkflowBuilder(definition, cache=None).build()
+
+    async def run():
+        start = time.perf_counter()
+        ctx = await workflow.execute_async(state={"mode": -1})
+        return time.perf_counter() - start, ctx
+
+    elapsed, ctx = asyncio.run(run())
+    return elapsed, ctx.node_context["loop"]["results"], workflow.memo.stats()
+
+
+def time_batch(states: list[dict], pure: bool) -> tuple[float, list, dict]:
+    workflow = WorkflowBuilder(reduce_definition(pure), cache=None).build()
+
+    async def run():
+        start = time.perf_counter()
+        results = [result async for result in workflow.execute_many(states, concurrency=50)]
+        return time.perf_counter() - start, results
+
+    elapsed, results = asyncio.run(run())
+    scores = [result.ctx.state["score"] for result in sorted(results, key=lambda r: r.index)]
+    return elapsed, scores, workflow.memo.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=20_000)
+    parser.add_argument("--distinct", type=int, default=50)
+    parser.add_argument("--terms", type=int, default=40)
+    parser.add_argument("--runs", type=int, default=2_000)
+    args = parser.parse_args()
+
+    check_semantics()
+    print("Semantics: LRU, TTL, keys, read-sets and result copies OK")
+
+    rng = random.Random(0)
+    items = [rng.randrange(args.distinct) for _ in range(args.items)]
+    vectors = [[rng.randrange(1000) for _ in range(200)] for _ in range(args.distinct)]
+    states = [{"values": rng.choice(vectors)} for _ in range(args.runs)]
+
+    print(f"{'case':<34} {'plain (ms)':>11} {'pure (ms)':>10} {'speedup':>8} {'hit rate':>9}")
+    for label, timer in (
+        (f"loop condition, {args.items} items", lambda pure: time_loop(items, args.terms, pure)),
+        (f"reduce over {args.runs} batch runs", lambda pure: time_batch(states, pure)),
+    ):
+        plain, expected, _ = timer(False)
+        memoized, results, stats = timer(True)
+        assert results == expected, f"{label}: memoized results differ"
+        print(
+            f"{label:<34} {plain * 1000:>11.1f} {memoized * 1000:>10.1f} "
+            f"{plain / memoized:>7.1f}x {stats['hit_rate']:>8.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
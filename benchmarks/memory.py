@@ -0,0 +1,88 @@
+"""
+Measure the memory footprint of built workflows and execution contexts.
+
+Builds generated graphs of every node type and reports the bytes allocated per
+node (nodes, connections and graph index, as traced by tracemalloc) and the
+size of an ExecutionContext.
+
+Usage:
+    python -m benchmarks.memory [--nodes N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.generators import deep_chain, heavy_conditions, nested_loops
+from workflows.base import RawWorkflow
+from workflows.builder import WorkflowBuilder
+from workflows.context import ExecutionContext
+
+
+def loop_chain(count: int) -> RawWorkflow:
+    """`count` for loops in a row, each with an empty body."""
+    definition = nested_loops(1, 1)
+    nodes = [node for node in definition["nodes"] if node["type"] == "set"][:1]
+    connections = {"init_outer": [{"to": "loop_0", "label": "main"}]}
+    for i in range(count):
+        nodes.append(
+            {
+                "name": f"loop_{i}",
+                "type": "for",
+                "parameters": {"collection": "rows", "iterator_var": "row"},
+            }
+        )
+        nodes.append({"name": f"end_{i}", "type": "end_loop", "parameters": {}})
+        connections[f"loop_{i}"] = [{"to": f"end_{i}", "label": "body"}]
+        if i + 1 < count:
+            connections[f"loop_{i}"].append({"to": f"loop_{i + 1}", "label": "exit"})
+        connections[f"end_{i}"] = [{"to": f"loop_{i}", "label": "main"}]
+    return {"name": "loops", "nodes": nodes, "connections": connections}
+
+
+def built_bytes(definition: RawWorkflow) -> tuple[int, int]:
+    """Bytes held by the built workflow, and its node count."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    workflow = WorkflowBuilder(definition, cache=None).build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, len(workflow.nodes)
+
+
+def context_bytes(count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    contexts = [ExecutionContext(state={}) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del contexts
+    return (after - before) / count
+
+
+def run(nodes: int) -> None:
+    graphs = {
+        "set chain": deep_chain(nodes),
+        "if chain": heavy_conditions(nodes // 3, 1),
+        "for loops": loop_chain(nodes // 2),
+    }
+    print(f"{'graph':<12} {'nodes':>8} {'MiB':>8} {'bytes/node':>11}")
+    for label, definition in graphs.items():
+        size, count = built_bytes(definition)
+        print(f"{label:<12} {count:>8} {size / 2**20:>8.1f} {size / count:>11.0f}")
+
+    print(f"ExecutionContext: {context_bytes(10_000):.0f} bytes each")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.nodes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Cost and accuracy of the runtime metrics registry.
+
+Checks first run a loop with conditions in both scheduler modes and from
+several threads, overlapping runs of a parallel loop and a failing node,
+and compare the registry's counts, branch ratios, loop iterations and runs
+in flight with what the runs did; the Prometheus dump must be well
+formed. Workflows built, run and dropped in a loop must keep the number of
+series bounded and their counts in the snapshot. Timings then run a linear chain of set nodes with and without
+metrics: the added cost per node must stay under `--budget` microseconds.
+
+Usage:
+    python -m benchmarks.metrics [--nodes N] [--repeat N] [--budget 1.0]
+"""
+
+import argparse
+import asyncio
+import gc
+import re
+import threading
+import time
+
+from benchmarks.cache import chain_definition
+from benchmarks.codegen import loop_definition
+from workflows.base import Workflow
+from workflows.builder import WorkflowBuilder
+from workflows.metrics import MetricsRegistry
+from workflows.scheduler import ExecutionMode
+from workflows.tracing import Tracer
+
+ITEMS = [5, 60, 3, 20, 99]
+SAMPLE = re.compile(r'^[a-z_]+\{(?:[a-z]+="(?:[^"\\]|\\.)*",?)*\} [0-9.e+-]+$')
+
+
+class InFlight(Tracer):
+    """Reads the registry's runs in flight from inside a run."""
+
+    def __init__(self, registry: MetricsRegistry, name: str):
+        self.registry = registry
+        self.name = name
+        self.seen: set[int] = set()
+
+    def on_node_start(self, ctx, node, level, timestamp):
+        runs = self.registry.snapshot()["workflows"][self.name]["runs"]
+        self.seen.add(runs["in_flight"])
+
+
+def parallel_definition() -> dict:
+    return {
+        "name": "metrics-parallel",
+        "nodes": [
+            {"name": "start", "type": "set", "parameters": {"variable_name": "started", "value": True}},
+            {"name": "loop", "type": "for", "parameters": {"collection": "items", "parallel": True}},
+            {"name": "double", "type": "set", "parameters": {"variable_name": "x", "value": "loop.item"}},
+            {"name": "end", "type": "end_loop", "parameters": {}},
+            {"name": "done", "type": "set", "parameters": {"variable_name": "done", "value": True}},
+        ],
+        "connections": {
+            "start": [{"to": "loop", "label": "main"}],
+            "loop": [{"to": "double", "label": "body"}, {"to": "done", "label": "exit"}],
+            "double": [{"to": "end", "label": "main"}],
+            "end": [{"to": "loop", "label": "main"}],
+        },
+    }
+
+
+def check_counts() -> None:
+    registry = MetricsRegistry()
+    workflow = WorkflowBuilder(loop_definition(), cache=None).build()
+    for mode in ExecutionMode:
+        asyncio.run(workflow.execute_async(state={"items": ITEMS}, mode=mode, metrics=registry))
+
+    # Parallel loops yield to the event loop, so these runs overlap
+    fan_out = WorkflowBuilder(parallel_definition(), cache=None).build()
+    tracer = InFlight(registry, fan_out.name)
+
+    async def concurrent() -> None:
+        await asyncio.gather(
+            *(
+                fan_out.execute_async(state={"items": ITEMS}, metrics=registry, tracer=tracer)
+                for _ in range(3)
+            )
+        )
+
+    asyncio.run(concurrent())
+    parallel = registry.snapshot()["workflows"][fan_out.name]
+    assert max(tracer.seen) == 3 and parallel["runs"]["in_flight"] == 0, tracer.seen
+    assert parallel["nodes"]["loop"]["iterations"] == 3 * len(ITEMS)
+    threads = [
+        threading.Thread(
+            target=lambda: asyncio.run(
+                workflow.execute_async(state={"items": ITEMS}, metrics=registry)
+            )
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    runs = 2 + 4
+    snapshot = registry.snapshot()
+    entry = snapshot["workflows"][workflow.name]
+    nodes = entry["nodes"]
+    assert entry["runs"]["started"] == entry["runs"]["finished"] == runs, entry["runs"]
+    assert entry["runs"]["in_flight"] == 0
+    assert nodes["loop"]["count"] == runs * (len(ITEMS) + 1)
+    assert nodes["loop"]["iterations"] == runs * len(ITEMS)
+    big = sum(item > 50 for item in ITEMS)
+    small = sum(item < 10 for item in ITEMS)
+    assert nodes["big"]["branches"] == {"true": runs * big, "false": runs * (len(ITEMS) - big)}
+    assert nodes["small"]["branches"]["true"] == runs * small
+    assert nodes["seen"]["duration"]["count"] == runs * len(ITEMS)
+    assert snapshot["types"]["if"]["count"] == runs * (2 * len(ITEMS) - big)
+
+    failing = WorkflowBuilder(
+        {
+            "name": "failing",
+            "nodes": [{"name": "sum", "type": "reduce", "parameters": {
+                "collection": "items", "output": "total", "operation": "sum"}}],
+            "connections": {},
+        },
+        cache=None,
+    ).build()
+    try:
+        asyncio.run(failing.execute_async(state={"items": [1, "x"]}, metrics=registry))
+    except TypeError:
+        pass
+    failed = registry.snapshot()["workflows"]["failing"]
+    assert failed["runs"]["failed"] == 1 and failed["nodes"]["sum"]["errors"] == 1, failed
+
+    text = registry.to_prometheus()
+    for line in text.splitlines():
+        assert line.startswith("# ") or SAMPLE.match(line), line
+    assert f'workflow_runs_total{{workflow="{workflow.name}"}} {runs}' in text
+    print("Counts, branches, iterations and runs in flight match in 2 modes, 4 threads and overlapping runs")
+
+
+def check_collected(builds: int = 200) -> None:
+    registry = MetricsRegistry()
+    definition = chain_definition(5)
+    for _ in range(builds):
+        workflow = WorkflowBuilder(definition, cache=None).build()
+        asyncio.run(workflow.execute_async(metrics=registry))
+        del workflow
+        gc.collect()
+        assert len(registry._series) <= 2, len(registry._series)
+
+    entry = registry.snapshot()["workflows"][definition["name"]]
+    assert len(registry._series) == 0 and len(registry._retired) == 1
+    assert entry["runs"]["started"] == entry["runs"]["finished"] == builds, entry["runs"]
+    assert all(stats["count"] == builds for stats in entry["nodes"].values())
+    print(f"{builds} workflows built and dropped keep one retired series with all their counts")
+
+
+def _best_run(workflow: Workflow, repeat: int, **kwargs) -> float:
+    async def timed() -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await workflow.execute_async(**kwargs)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    return asyncio.run(timed())
+
+
+def time_chain(nodes: int, repeat: int, budget: float) -> None:
+    workflow = WorkflowBuilder(chain_definition(nodes), cache=None).build()
+    timings = {
+        "none": _best_run(workflow, repeat, metrics=None),
+        "metrics": _best_run(workflow, repeat, metrics=MetricsRegistry()),
+    }
+    baseline = timings["none"]
+    print(f"{'metrics':<8} {'wall (ms)':>10} {'per node (us)':>14} {'added (us)':>11}")
+    for label, elapsed in timings.items():
+        print(
+            f"{label:<8} {elapsed * 1000:>10.2f} {elapsed / nodes * 1e6:>14.3f} "
+            f"{(elapsed - baseline) / nodes * 1e6:>11.3f}"
+        )
+
+    added = (timings["metrics"] - baseline) / nodes * 1e6
+    assert added < budget, f"metrics add {added:.3f}us per node, over the {budget}us budget"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--budget", type=float, default=1.0)
+    args = parser.parse_args()
+
+    check_counts()
+    check_collected()
+    time_chain(args.nodes, args.repeat, args.budget)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Optimized vs. unoptimized builds of the same workflow definition.
+
+The timed workflow starts with literal settings, branches on them, then runs
+chains of set and collection nodes: folding, pruning and fusion each remove
+scheduler steps, counted with a tracer. tests/test_optimizer.py checks that
+optimized builds of random workflows end like unoptimized ones.
+
+Usage:
+    python -m benchmarks.optimizer [--chains 20] [--runs 500]
+"""
+
+import argparse
+import asyncio
+import copy
+import time
+
+from benchmarks.incremental import _Definition
+from workflows.builder import WorkflowBuilder
+from workflows.tracing import Tracer
+
+
+class StepCounter(Tracer):
+    """Counts scheduler steps, i.e. node executions seen by the scheduler."""
+
+    def __init__(self):
+        self.steps = 0
+
+    def on_node_start(self, ctx, node, level, timestamp) -> None:
+        self.steps += 1
+
+
+def pipeline_definition(chains: int) -> dict:
+    """Literal settings, branches on them, then `chains` parallel set/map/reduce chains."""
+    definition = _Definition()
+    previous = None
+    # Strings would be paths: literal settings are numbers, booleans and objects
+    for key, value in (("region", {"code": "eu"}), ("tier", 2), ("debug", False), ("threshold", 10)):
+        node = definition.add(f"init_{key}", "set", variable_name=key, value=value)
+        if previous:
+            definition.connect(previous, node)
+        previous = node
+
+    check = definition.add("is_eu", "if", condition={"==": [{"var": "region.code"}, "eu"]})
+    eu = definition.add("eu_rate", "set", variable_name="rate", value=0.2)
+    other = definition.add("other_rate", "set", variable_name="rate", value=0.1)
+    debug = definition.add("debug_on", "if", condition={"var": "debug"})
+    log = definition.add("log", "set", variable_name="log", value="values")
+    definition.connect(previous, check)
+    definition.connect(check, eu, "true")
+    definition.connect(check, other, "false")
+    definition.connect(eu, debug)
+    definition.connect(other, debug)
+    fan_out = definition.add("fan_out", "set", variable_name="started", value=True)
+    definition.connect(debug, log, "true")
+    definition.connect(debug, fan_out, "false")
+
+    for i in range(chains):
+        scaled = definition.add(
+            f"scale_{i}", "map", collection="values", output=f"scaled_{i}",
+            expression={"*": [{"var": ""}, i + 1]},
+        )
+        kept = definition.add(
+            f"keep_{i}", "filter", collection=f"scaled_{i}", output=f"kept_{i}",
+            condition={">": [{"var": ""}, {"var": "threshold"}]},
+        )
+        total = definition.add(
+            f"total_{i}", "reduce", collection=f"kept_{i}", operation="sum", output=f"total_{i}"
+        )
+        copied = definition.add(f"copy_{i}", "set", variable_name=f"result_{i}", value=f"total_{i}")
+        definition.connect(fan_out, scaled)
+        definition.connect(scaled, kept)
+        definition.connect(kept, total)
+        definition.connect(total, copied)
+    return definition.build("pipeline")
+
+
+async def time_pipeline(chains: int, runs: int) -> None:
+    definition = pipeline_definition(chains)
+    states = [{"values": list(range(i % 10, i % 10 + 20))} for i in range(runs)]
+
+    print(f"{'build':<10} {'nodes':>6} {'steps/run':>10} {'ms/run':>8}")
+    for label, optimize in (("plain", False), ("optimized", True)):
+        workflow = WorkflowBuilder(definition, cache=None, optimize=optimize).build()
+        counter = StepCounter()
+        await workflow.execute_async(state=copy.deepcopy(states[0]), tracer=counter)
+
+        start = time.perf_counter()
+        for state in states:
+            await workflow.execute_async(state=copy.deepcopy(state))
+        elapsed = (time.perf_counter() - start) / runs
+        print(f"{label:<10} {len(workflow.nodes):>6} {counter.steps:>10} {elapsed * 1000:>8.3f}")
+
+        if optimize:
+            report = workflow.optimization
+            print(
+                f"Folded {len(report.folded)} set nodes, pruned {len(report.pruned)} conditions "
+                f"({len(report.removed)} nodes removed), fused {len(report.fused)} chains"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--chains", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=500)
+    args = parser.parse_args()
+
+    asyncio.run(time_pipeline(args.chains, args.runs))
+
+
+if __name__ == "__main__":
+    main()
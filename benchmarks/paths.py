@@ -0,0 +1,116 @@
+"""
+Compare compiled FieldPath accessors with per-call path parsing.
+
+`legacy_get` reproduces the string handling ExecutionContext.get used before
+paths were compiled; it is used both as the timing baseline and to check
+that compiled paths return the same values.
+
+Usage:
+    python -m benchmarks.paths [--number N]
+"""
+
+import argparse
+import timeit
+from typing import Any
+
+from workflows.context import ExecutionContext
+from workflows.path import FieldPath
+
+
+def _legacy_nested(data: Any, keys: list[str], default: Any = None) -> Any:
+    try:
+        for key in keys:
+            try:
+                data = data[key]
+            except TypeError:
+                data = data[int(key)]
+        return data
+    except (KeyError, TypeError, ValueError, IndexError):
+        return default
+
+
+def legacy_get(ctx: ExecutionContext, path: Any, default: Any = None) -> Any:
+    if not isinstance(path, str):
+        return path
+    if not path:
+        return default
+    parts = path.split(".")
+    source, remaining = parts[0], parts[1:]
+    if source == "state":
+        return _legacy_nested(ctx.state, remaining, default) if remaining else ctx.state
+    if source == "config":
+        return _legacy_nested(ctx.config, remaining, default) if remaining else ctx.config
+    if source in ctx.node_context:
+        node_data = ctx.node_context[source]
+        return _legacy_nested(node_data, remaining, default) if remaining else node_data
+    result = _legacy_nested(ctx.state, parts, None)
+    return default if result is None else result
+
+
+def _context() -> ExecutionContext:
+    return ExecutionContext(
+        state={
+            "user": {"profile": {"age": 42, "tags": ["a", "b"]}},
+            "items": [{"price": 3}, {"price": 5}],
+            "flag": None,
+            "0": "zero",
+        },
+        config={"timeout": 30, "limits": [1, 2]},
+        node_context={"loop": {"item": {"price": 12}, "index": 1}},
+    )
+
+
+PATHS = [
+    "user.profile.age",
+    "state.user.profile.tags.1",
+    "items.1.price",
+    "items.x",
+    "items.5",
+    "config.timeout",
+    "config.limits.0",
+    "config",
+    "state",
+    "loop.item.price",
+    "loop",
+    "flag",
+    "0",
+    "missing.path",
+    "",
+    ".",
+]
+
+
+def check_equivalence() -> int:
+    ctx = _context()
+    for path in PATHS:
+        expected = legacy_get(ctx, path, "default")
+        assert ctx.get(path, "default") == expected, path
+        assert FieldPath(path).get(ctx, "default") == expected, path
+    return len(PATHS)
+
+
+def run(number: int) -> None:
+    print(f"Equivalence: {check_equivalence()} paths match the legacy lookup")
+
+    ctx = _context()
+    print(f"{'path':<28} {'legacy (ns)':>12} {'cached (ns)':>12} {'compiled (ns)':>14}")
+    for path in ("user.profile.age", "loop.item.price", "items.1.price", "config.timeout"):
+        compiled = FieldPath(path)
+        legacy_s = timeit.timeit(lambda: legacy_get(ctx, path), number=number)
+        cached_s = timeit.timeit(lambda: ctx.get(path), number=number)
+        compiled_s = timeit.timeit(lambda: ctx.get(compiled), number=number)
+        print(
+            f"{path:<28} {legacy_s / number * 1e9:>12.0f} "
+            f"{cached_s / number * 1e9:>12.0f} {compiled_s / number * 1e9:>14.0f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", "-n", type=int, default=200_000)
+    args = parser.parse_args()
+    run(args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Measure how ProcessPoolRunner throughput scales with the number of workers.
+
+The workflow is CPU-bound: a `for` loop over a collection whose body
+evaluates a condition and assigns a value for every item.
+
+Usage:
+    python -m benchmarks.pool [--runs N] [--items N] [--workers 1 2 4 ...]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from workflows.builder import WorkflowBuilder
+from workflows.pool import ProcessPoolRunner
+
+DEFINITION = {
+    "name": "CPU-bound loop",
+    "nodes": [
+        {
+            "name": "init",
+            "type": "set",
+            "parameters": {"variable_name": "last_hit", "value": -1},
+        },
+        {"name": "loop", "type": "for", "parameters": {"collection": "items"}},
+        {
+            "name": "check",
+            "type": "if",
+            "parameters": {
+                "condition": {
+                    "and": [
+                        {">": [{"var": "loop.item"}, {"var": "threshold"}]},
+                        {"==": [{"%": [{"var": "loop.item"}, 3]}, 0]},
+                    ]
+                }
+            },
+        },
+        {
+            "name": "hit",
+            "type": "set",
+            "parameters": {"variable_name": "last_hit", "value": "loop.item"},
+        },
+        {"name": "end", "type": "end_loop", "parameters": {}},
+    ],
+    "connections": {
+        "init": [{"to": "loop", "label": "main"}],
+        "loop": [{"to": "check", "label": "body"}],
+        "check": [
+            {"to": "hit", "label": "true"},
+            {"to": "end", "label": "false"},
+        ],
+        "hit": [{"to": "end", "label": "main"}],
+        "end": [{"to": "loop", "label": "main"}],
+    },
+}
+
+
+def _states(runs: int, items: int):
+    for i in range(runs):
+        yield {"items": list(range(items)), "threshold": i % (items // 2)}
+
+
+async def _single_loop(runs: int, items: int) -> None:
+    workflow = WorkflowBuilder(DEFINITION).build()
+    async for result in workflow.execute_many(_states(runs, items), concurrency=16):
+        assert result.ok, result.error
+        assert result.ctx.state["last_hit"] == items - 1 - (items - 1) % 3
+
+
+def run(runs: int, items: int, worker_counts: list[int], chunk_size: int) -> None:
+    print(f"{'executor':<22} {'wall (s)':>9} {'runs/s':>10} {'speedup':>8}")
+
+    start = time.perf_counter()
+    asyncio.run(_single_loop(runs, items))
+    baseline = time.perf_counter() - start
+    print(f"{'single event loop':<22} {baseline:>9.2f} {runs / baseline:>10.0f} {1:>7.1f}x")
+
+    for workers in worker_counts:
+        with ProcessPoolRunner(DEFINITION, workers=workers, chunk_size=chunk_size) as runner:
+            start = time.perf_counter()
+            completed = 0
+            for result in runner.map(_states(runs, items), ordered=False):
+                assert result.ok, result.error
+                assert result.ctx.state["last_hit"] == items - 1 - (items - 1) % 3
+                completed += 1
+            elapsed = time.perf_counter() - start
+        assert completed == runs
+        print(
+            f"{f'{workers} worker(s)':<22} {elapsed:>9.2f} "
+            f"{runs / elapsed:>10.0f} {baseline / elapsed:>7.1f}x"
+        )
+
+
+def main():
+    cores = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=2_000)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+    run(args.runs, args.items, args.workers, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
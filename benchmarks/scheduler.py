@@ -0,0 +1,96 @@
+"""
+Compare the dataflow scheduler with the legacy level scheduler.
+
+Graphs:
+    wide: one root fanning out to N branches of two nodes; a few branches are
+          slow at their first node, a few at their second, and every branch
+          joins into one sink.
+    deep: a single chain of N nodes.
+
+Usage:
+    python -m benchmarks.scheduler [--width N] [--depth N] [--delay SECONDS]
+"""
+
+import argparse
+import asyncio
+import time
+
+from nodes.base import BaseNode
+from nodes.connection import NodeConnection
+from workflows.base import Workflow
+from workflows.context import ExecutionContext
+from workflows.scheduler import ExecutionMode
+
+
+class SleepNode(BaseNode):
+    """Benchmark-only node simulating I/O and counting its executions."""
+
+    type: str = "sleep"
+
+    def __init__(self, name: str, delay: float = 0.0):
+        super().__init__(name, "", {}, [])
+        self.delay = delay
+
+    async def execute_async(self, ctx: ExecutionContext) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        ctx.state[self.name] = ctx.state.get(self.name, 0) + 1
+
+    def to_dict(self) -> dict:
+        return super().to_dict()
+
+
+def _connect(edges: list[tuple[BaseNode, BaseNode]]) -> list[NodeConnection]:
+    connections: dict[BaseNode, list[NodeConnection]] = {}
+    for source, target in edges:
+        connections.setdefault(source, []).append(NodeConnection(target))
+    for source, conns in connections.items():
+        source.link(conns)
+    return [conn for conns in connections.values() for conn in conns]
+
+
+def wide_workflow(width: int, delay: float) -> Workflow:
+    root, sink = SleepNode("root"), SleepNode("sink")
+    nodes, edges = [root, sink], []
+    for i in range(width):
+        first = SleepNode(f"b{i}_first", delay * 10 if i % 10 == 0 else delay)
+        second = SleepNode(f"b{i}_second", delay * 10 if i % 10 == 5 else delay)
+        nodes += [first, second]
+        edges += [(root, first), (first, second), (second, sink)]
+    return Workflow(nodes, _connect(edges))
+
+
+def deep_workflow(depth: int) -> Workflow:
+    nodes = [SleepNode(f"n{i}") for i in range(depth)]
+    return Workflow(nodes, _connect(list(zip(nodes, nodes[1:]))))
+
+
+async def _time(workflow: Workflow, mode: ExecutionMode) -> tuple[float, int]:
+    start = time.perf_counter()
+    ctx = await workflow.execute_async(mode=mode)
+    return time.perf_counter() - start, sum(ctx.state.values())
+
+
+def run(width: int, depth: int, delay: float) -> None:
+    graphs = {
+        f"wide ({width} branches)": wide_workflow(width, delay),
+        f"deep ({depth} nodes)": deep_workflow(depth),
+    }
+    print(f"{'graph':<24} {'mode':<10} {'wall (ms)':>10} {'node runs':>10}")
+    for label, workflow in graphs.items():
+        for mode in (ExecutionMode.LEVEL, ExecutionMode.DATAFLOW):
+            elapsed, runs = asyncio.run(_time(workflow, mode))
+            print(f"{label:<24} {mode:<10} {elapsed * 1000:>10.1f} {runs:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=200)
+    parser.add_argument("--depth", type=int, default=5_000)
+    parser.add_argument("--delay", type=float, default=0.005)
+    args = parser.parse_args()
+    run(args.width, args.depth, args.delay)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measure the throughput of `WorkflowServer` against a local client.
+
+Starts the server in-process on an ephemeral port, registers a workflow,
+then sends execute requests over keep-alive connections at several client
+concurrency levels and reports requests per second, batching and latency
+percentiles.
+For reference, the cost of one `main.py` process per run is measured too.
+The endpoints themselves are covered by tests/test_server.py.
+
+Usage:
+    python -m benchmarks.server [--requests N] [--clients 1 10 100]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.batch import DEFINITION
+from workflows.server import WorkflowRegistry, WorkflowServer
+
+class Client:
+    """Minimal keep-alive HTTP/1.1 client with JSON bodies."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self._streams = None
+
+    async def request(self, method: str, path: str, body=None) -> tuple[int, dict]:
+        if self._streams is None:
+            self._streams = await asyncio.open_connection("127.0.0.1", self.port)
+        reader, writer = self._streams
+
+        data = json.dumps(body).encode() if body is not None else b""
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        length, keep_alive = 0, True
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection":
+                keep_alive = value.strip() == "keep-alive"
+        payload = json.loads(await reader.readexactly(length))
+        if not keep_alive:
+            self.close()
+        return status, payload
+
+    def close(self) -> None:
+        if self._streams is not None:
+            self._streams[1].close()
+            self._streams = None
+
+
+async def measure(port: int, requests: int, clients: int) -> float:
+    per_client = requests // clients
+
+    async def run_client(client_id: int) -> None:
+        client = Client(port)
+        for i in range(per_client):
+            state = {"age": (client_id + i) % 40, "name": f"user-{i}"}
+            status, _ = await client.request("POST", "/workflows/batch/execute", {"state": state})
+            assert status == 200
+        client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(i) for i in range(clients)))
+    return per_client * clients / (time.perf_counter() - start)
+
+
+def process_per_run() -> float:
+    """Seconds for one `main.py` invocation running the same workflow."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "workflow.json")
+        with open(path, "w") as f:
+            json.dump(DEFINITION, f)
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "main.py", path, "-v", "age", "30", "-v", "name", "Ada"],
+            check=True,
+            capture_output=True,
+        )
+        return time.perf_counter() - start
+
+
+def run(requests: int, clients: list[int]) -> None:
+    async def serve() -> None:
+        server = WorkflowServer(WorkflowRegistry())
+        listener = await server.start("127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        try:
+            client = Client(port)
+            await client.request("PUT", "/workflows/batch", DEFINITION)
+            client.close()
+            print(f"{'clients':>8} {'req/s':>9} {'batch size':>11} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+            for count in clients:
+                server.batches = server.batched_runs = 0
+                server.per_workflow.clear()
+                throughput = await measure(port, requests, count)
+                stats = server.stats()
+                latency = stats["workflows"]["batch"]["latency_ms"]
+                print(
+                    f"{count:>8} {throughput:>9.0f} {stats['mean_batch_size']:>11.1f} "
+                    f"{latency['p50']:>9.3f} {latency['p99']:>9.3f}"
+                )
+        finally:
+            await server.close()
+
+    asyncio.run(serve())
+    print(f"One main.py process per run: {process_per_run() * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+    run(args.requests, args.clients)
+
+
+if __name__ == "__main__":
+    main()
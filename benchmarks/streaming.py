@@ -0,0 +1,99 @@
+"""
+Measure peak memory of `for` loops over lazily produced collections.
+
+Each row is a fresh `--row-size` byte string produced by a generator, an
+async generator or a materialized list. With lazy iteration the peak
+reported by tracemalloc stays flat as the number of rows grows; the list
+grows linearly. tests/test_streaming.py asserts the flat case.
+
+Usage:
+    python -m benchmarks.streaming [--rows 10000 50000] [--row-size 1024]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from nodes.assignment import SetNode
+from nodes.connection import ConnectionLabel, NodeConnection
+from nodes.loop import EndLoopNode, ForLoopNode
+from workflows.base import Workflow
+
+def rows(count: int, size: int):
+    for i in range(count):
+        yield str(i).rjust(size, "x")
+
+
+async def async_rows(count: int, size: int):
+    for i in range(count):
+        await asyncio.sleep(0)
+        yield str(i).rjust(size, "x")
+
+
+def loop_workflow(parallel: bool) -> Workflow:
+    init = SetNode("init", "", "started", True)
+    loop = ForLoopNode(
+        "loop",
+        "",
+        "rows",
+        iterator_var="row",
+        parallel=parallel,
+        max_concurrency=10,
+        collect_results=False,
+    )
+    body = SetNode("body", "", "last", "row")
+    end = EndLoopNode("end", "")
+
+    init.link([NodeConnection(loop)])
+    loop.link([NodeConnection(body, ConnectionLabel.BODY)])
+    body.link([NodeConnection(end)])
+    end.link([NodeConnection(loop)])
+
+    nodes = [init, loop, body, end]
+    return Workflow(nodes, [conn for node in nodes for conn in node.connections])
+
+
+SOURCES = {
+    "generator": lambda count, size: rows(count, size),
+    "async generator": lambda count, size: async_rows(count, size),
+    "list": lambda count, size: list(rows(count, size)),
+}
+
+
+def measure(source: str, count: int, size: int, parallel: bool = False) -> tuple[int, float]:
+    """Peak traced memory (bytes) and wall time of one loop run."""
+    workflow = loop_workflow(parallel)
+
+    async def run():
+        tracemalloc.start()
+        start = time.perf_counter()
+        await workflow.execute_async(state={"rows": SOURCES[source](count, size)})
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak, elapsed
+
+    return asyncio.run(run())
+
+
+def run(counts: list[int], size: int) -> None:
+    print(f"{'source':<26} {'rows':>8} {'peak (KiB)':>11} {'wall (ms)':>10}")
+    cases = [(source, False) for source in SOURCES] + [("generator", True)]
+    for source, parallel in cases:
+        label = f"{source} (parallel)" if parallel else source
+        for count in counts:
+            peak, elapsed = measure(source, count, size, parallel)
+            print(f"{label:<26} {count:>8} {peak / 1024:>11.1f} {elapsed * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 50_000])
+    parser.add_argument("--row-size", type=int, default=1024)
+    args = parser.parse_args()
+    run(args.rows, args.row_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Run the synthetic workflow suite and check it against a saved baseline.
+
+Every case from `benchmarks.generators` is built with `WorkflowBuilder.build`
+and executed with `Workflow.execute_async`, recording the best build and run
+time of `--runs` attempts, runs per second and peak traced memory. `--save`
+writes the results as JSON; `--baseline` compares against such a file and
+exits with status 1 when a case is slower (or uses more memory) than the
+baseline by more than the threshold. The baseline of the repository is
+`benchmarks/baseline.json`.
+
+Usage:
+    python -m benchmarks.suite [--runs N] [--save PATH] [--baseline PATH]
+                               [--threshold 0.25] [--memory-threshold 0.10]
+                               [--cases NAME ...]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from benchmarks import generators
+from workflows.base import RawWorkflow, Workflow
+from workflows.builder import WorkflowBuilder
+
+CASES: dict[str, Callable[[], RawWorkflow]] = {
+    "wide_fanout": lambda: generators.wide_fanout(2_000),
+    "deep_chain": lambda: generators.deep_chain(2_000),
+    "diamonds": lambda: generators.diamonds(50, 40),
+    "nested_loops": lambda: generators.nested_loops(50, 100),
+    "heavy_conditions": lambda: generators.heavy_conditions(200, 50),
+}
+
+# Metrics checked against the baseline; lower is better for all of them
+TIME_METRICS = ("build_ms", "run_ms")
+MEMORY_METRICS = ("peak_kib",)
+
+# Absolute changes below these never count as regressions: small cases
+# fluctuate by more than any relative threshold
+NOISE_FLOOR = {"build_ms": 0.5, "run_ms": 0.5, "peak_kib": 16.0}
+
+
+def _time_runs(workflow: Workflow, runs: int) -> float:
+    """Best wall time of `runs` executions, in seconds."""
+
+    async def timed() -> float:
+        best = float("inf")
+        for _ in range(runs):
+            start = time.perf_counter()
+            await workflow.execute_async()
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    # Timed inside the coroutine: asyncio.run's own teardown is not measured
+    return asyncio.run(timed())
+
+
+def _peak_memory(workflow: Workflow) -> int:
+    """Peak bytes allocated by one execution."""
+
+    async def traced() -> int:
+        tracemalloc.start()
+        try:
+            await workflow.execute_async()
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return asyncio.run(traced())
+
+
+def run_case(make: Callable[[], RawWorkflow], runs: int) -> dict[str, float]:
+    definition = make()
+
+    build_s = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        workflow = WorkflowBuilder(definition, cache=None).build()
+        build_s = min(build_s, time.perf_counter() - start)
+
+    run_s = _time_runs(workflow, runs)
+    return {
+        "nodes": len(definition["nodes"]),
+        "build_ms": round(build_s * 1000, 3),
+        "run_ms": round(run_s * 1000, 3),
+        "runs_per_s": round(1 / run_s, 2),
+        "peak_kib": round(_peak_memory(workflow) / 1024, 1),
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float,
+    memory_threshold: float,
+) -> list[str]:
+    """Regressions of `results` against `baseline`, as printable lines."""
+    regressions = []
+    for case, metrics in results.items():
+        previous = baseline.get(case)
+        if previous is None:
+            continue
+        limits = [(metric, threshold) for metric in TIME_METRICS]
+        limits += [(metric, memory_threshold) for metric in MEMORY_METRICS]
+        for metric, limit in limits:
+            before, after = previous.get(metric), metrics[metric]
+            if before and after > before * (1 + limit) + NOISE_FLOOR[metric]:
+                regressions.append(
+                    f"{case}.{metric}: {before} -> {after} "
+                    f"(+{(after / before - 1) * 100:.1f}%, limit {limit * 100:.0f}%)"
+                )
+    return regressions
+
+
+def run(args: argparse.Namespace) -> int:
+    results = {}
+    print(f"{'case':<18} {'nodes':>6} {'build (ms)':>11} {'run (ms)':>10} {'runs/s':>9} {'peak (KiB)':>11}")
+    for name in args.cases:
+        metrics = results[name] = run_case(CASES[name], args.runs)
+        print(
+            f"{name:<18} {metrics['nodes']:>6} {metrics['build_ms']:>11.2f} "
+            f"{metrics['run_ms']:>10.2f} {metrics['runs_per_s']:>9.1f} {metrics['peak_kib']:>11.1f}"
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {"python": platform.python_version(), "runs": args.runs, "cases": results},
+                f,
+                indent=2,
+            )
+        print(f"Baseline written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["cases"]
+        regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+        if regressions:
+            print("Regressions against the baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a baseline file")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against a baseline file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown of build and run time (default: 0.25)",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=0.10,
+        help="Allowed relative growth of peak memory (default: 0.10)",
+    )
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    sys.exit(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Measure the per-node cost of tracing hooks.
+
+Runs a linear chain of set nodes with no tracer, a no-op Tracer and a
+ChromeTraceRecorder. The untraced run must not be slower than the run with
+no-op hooks (within `--tolerance`), i.e. the hooks cost nothing when unused.
+
+Usage:
+    python -m benchmarks.tracing [--nodes N] [--repeat N] [--tolerance 0.05]
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.cache import chain_definition
+from workflows.base import Workflow
+from workflows.builder import WorkflowBuilder
+from workflows.tracing import ChromeTraceRecorder, Tracer
+
+
+def _best_run(workflow: Workflow, make_tracer, repeat: int) -> float:
+    async def timed() -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            tracer = make_tracer()
+            start = time.perf_counter()
+            await workflow.execute_async(tracer=tracer)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    return asyncio.run(timed())
+
+
+def run(nodes: int, repeat: int, tolerance: float) -> None:
+    workflow = WorkflowBuilder(chain_definition(nodes), cache=None).build()
+
+    recorder = ChromeTraceRecorder()
+    asyncio.run(workflow.execute_async(tracer=recorder))
+    assert len(recorder.events) == nodes + 1  # one span per node, one run_end
+
+    tracers = {
+        "none": lambda: None,
+        "no-op Tracer": Tracer,
+        "ChromeTraceRecorder": ChromeTraceRecorder,
+    }
+    timings = {label: _best_run(workflow, make, repeat) for label, make in tracers.items()}
+
+    baseline = timings["none"]
+    print(f"{'tracer':<22} {'wall (ms)':>10} {'per node (us)':>14} {'overhead':>9}")
+    for label, elapsed in timings.items():
+        print(
+            f"{label:<22} {elapsed * 1000:>10.2f} {elapsed / nodes * 1e6:>14.3f} "
+            f"{(elapsed / baseline - 1) * 100:>8.1f}%"
+        )
+
+    assert baseline <= timings["no-op Tracer"] * (1 + tolerance), (
+        "untraced runs are slower than runs with no-op hooks"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    args = parser.parse_args()
+    run(args.nodes, args.repeat, args.tolerance)
+
+
+if __name__ == "__main__":
+    main()
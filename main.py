@@ -1,9 +1,163 @@
 import argparse
 import asyncio
+import copy
 import json
+import sys
+import time
+from collections.abc import Iterator
+from typing import TextIO
 
+from workflows.artifact import load_artifact, save_artifact, source_hash
+from workflows.base import RunResult, Workflow
 from workflows.builder import WorkflowBuilder
 from workflows.context import ExecutionContext
+from workflows.exception import ArtifactException
+from workflows.metrics import default_registry
+from workflows.scheduler import ExecutionMode
+from workflows.server import WorkflowRegistry, WorkflowServer
+from workflows.tracing import ChromeTraceRecorder
+
+# Bytes buffered before results are written to the output file
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
+def read_states(lines: TextIO, base_state: dict) -> Iterator[dict]:
+    """Parse one initial state per non-blank JSONL line, on top of the --var state."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            state = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"Invalid JSON on input line {number}: {error}") from None
+        if not isinstance(state, dict):
+            raise ValueError(f"Input line {number} is not a JSON object")
+        yield {**copy.deepcopy(base_state), **state} if base_state else state
+
+
+def result_record(result: RunResult) -> dict:
+    if result.ok:
+        return {"index": result.index, "state": result.ctx.state}
+    return {
+        "index": result.index,
+        "error": f"{type(result.error).__name__}: {result.error}",
+        "state": result.ctx.state,
+    }
+
+
+async def run_batch(
+    workflow: Workflow,
+    states: Iterator[dict],
+    output: TextIO,
+    config: dict,
+    concurrency: int,
+    ordered: bool,
+    progress_interval: float,
+    **kwargs,
+) -> tuple[int, int]:
+    """
+    Stream states through the workflow, writing one JSONL result per run.
+
+    With `ordered`, output follows input order (see `Workflow.execute_many`).
+
+    Returns:
+        The number of runs and of failed runs.
+    """
+    done = failed = 0
+    start = last_report = time.perf_counter()
+
+    async for result in workflow.execute_many(
+        states,
+        concurrency=concurrency,
+        config=config,
+        copy_states=False,
+        ordered=ordered,
+        **kwargs,
+    ):
+        done += 1
+        failed += not result.ok
+        output.write(json.dumps(result_record(result), default=str) + "\n")
+
+        now = time.perf_counter()
+        if now - last_report >= progress_interval:
+            last_report = now
+            print(
+                f"{done} runs, {failed} failed, {done / (now - start):.0f} runs/s",
+                file=sys.stderr,
+            )
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"Done: {done} runs, {failed} failed in {elapsed:.2f}s "
+        f"({done / elapsed if elapsed else 0:.0f} runs/s)",
+        file=sys.stderr,
+    )
+    return done, failed
+
+
+def load_workflow(source: bytes, args: argparse.Namespace) -> Workflow:
+    """
+    Build the workflow, or load it from --artifact while that is up to date.
+
+    The artifact is keyed by the hash of the workflow file (and --optimize):
+    a stale, missing or unreadable artifact is rebuilt and written again.
+    """
+    digest = source_hash(source) + (":optimized" if args.optimize else "")
+    if args.artifact:
+        try:
+            workflow = load_artifact(args.artifact, digest)
+        except ArtifactException as error:
+            print(f"Rebuilding: {error}", file=sys.stderr)
+            workflow = None
+        if workflow is not None:
+            return workflow
+
+    workflow = WorkflowBuilder(json.loads(source), optimize=args.optimize).build()
+    for path in (args.artifact, args.emit_artifact):
+        if path:
+            save_artifact(workflow, path, digest)
+    return workflow
+
+
+async def write_metrics(path: str, interval: float) -> None:
+    """Rewrite the Prometheus metrics file every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        default_registry.write_prometheus(path)
+
+
+async def serve(raw_workflow: dict, args: argparse.Namespace) -> None:
+    registry = WorkflowRegistry()
+    workflow = registry.register(raw_workflow)
+    server = WorkflowServer(
+        registry,
+        max_in_flight=args.max_in_flight,
+        batch_window=args.batch_window,
+        mode=args.mode,
+        max_concurrency=args.max_concurrency,
+        deadline=args.deadline,
+        partial=args.partial,
+    )
+
+    if args.socket:
+        await server.start_unix(args.socket)
+        address = args.socket
+    else:
+        host, _, port = args.serve.rpartition(":")
+        await server.start(host or "127.0.0.1", int(port))
+        address = f"http://{host or '127.0.0.1'}:{port}"
+
+    print(f"Serving workflow {workflow.name!r} on {address}", file=sys.stderr)
+    writer = None
+    if args.metrics:
+        writer = asyncio.ensure_future(write_metrics(args.metrics, args.metrics_interval))
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+        if writer is not None:
+            writer.cancel()
+            default_registry.write_prometheus(args.metrics)
 
 
 def main():
@@ -23,13 +177,131 @@ def main():
         type=str,
         help="Path to config JSON file",
     )
+    parser.add_argument(
+        "--mode",
+        choices=[mode.value for mode in ExecutionMode],
+        default=ExecutionMode.DATAFLOW.value,
+        help="Scheduler: dataflow (default) or the legacy level-by-level mode",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Maximum number of nodes running at once (dataflow mode)",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Cancel each run, and the nodes still running, after SECONDS",
+    )
+    parser.add_argument(
+        "--partial",
+        action="store_true",
+        help="On a deadline, keep the partial result and mark cut-off nodes 'timed_out'",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Fold literal assignments, prune constant conditions and fuse linear chains",
+    )
+    parser.add_argument(
+        "--emit-artifact",
+        metavar="PATH",
+        help="Build the workflow, write it as a binary artifact to PATH and exit",
+    )
+    parser.add_argument(
+        "--artifact",
+        metavar="PATH",
+        help="Load the built workflow from PATH, rebuilding it there when stale",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Write a Chrome trace of the run to PATH (open in chrome://tracing or Perfetto)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write node and run metrics to PATH in Prometheus text format",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=15.0,
+        metavar="SECONDS",
+        help="Seconds between rewrites of the --metrics file when serving (default: 15)",
+    )
+    parser.add_argument(
+        "--input",
+        "-i",
+        metavar="PATH",
+        help="Run once per line of a JSONL file of initial states ('-' for stdin)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        metavar="PATH",
+        default="-",
+        help="Where --input writes one JSONL result per run (default: stdout)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="Maximum number of runs in flight with --input (default: 100)",
+    )
+    parser.add_argument(
+        "--ordered",
+        action="store_true",
+        help="Write --input results in input order instead of as they complete",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=5.0,
+        metavar="SECONDS",
+        help="Seconds between progress reports on stderr with --input (default: 5)",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="[HOST:]PORT",
+        help="Serve the workflow (and any registered later) over HTTP instead of running it",
+    )
+    parser.add_argument("--socket", metavar="PATH", help="Like --serve, on a Unix socket")
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=1000,
+        help="Executions admitted at once when serving; more get 503 (default: 1000)",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="Time to collect concurrent requests into one batch when serving (default: 0)",
+    )
     args = parser.parse_args()
+    if args.input and args.profile:
+        parser.error("--profile cannot be combined with --input")
+    if (args.serve or args.socket) and (args.optimize or args.artifact or args.emit_artifact):
+        # The server builds every workflow it registers from its definition
+        parser.error("--optimize and the artifact options cannot be combined with --serve")
+
+    with open(args.workflow_file, "rb") as f:
+        source = f.read()
 
-    with open(args.workflow_file) as f:
-        raw_workflow = json.load(f)
+    if args.serve or args.socket:
+        try:
+            asyncio.run(serve(json.loads(source), args))
+        except KeyboardInterrupt:
+            pass
+        return
 
-    builder = WorkflowBuilder(raw_workflow)
-    workflow = builder.build()
+    workflow = load_workflow(source, args)
+    if args.emit_artifact:
+        print(f"Artifact of workflow {workflow.name!r} written to {args.emit_artifact}")
+        return
 
     state = {}
     if args.var:
@@ -45,6 +317,41 @@ def main():
         with open(args.config) as f:
             config = json.load(f)
 
+    if args.input:
+        input_file = sys.stdin if args.input == "-" else open(args.input)
+        output = (
+            sys.stdout
+            if args.output == "-"
+            else open(args.output, "w", buffering=OUTPUT_BUFFER_SIZE)
+        )
+        try:
+            _, failed = asyncio.run(
+                run_batch(
+                    workflow,
+                    read_states(input_file, state),
+                    output,
+                    config,
+                    args.concurrency,
+                    args.ordered,
+                    args.progress_interval,
+                    mode=args.mode,
+                    max_concurrency=args.max_concurrency,
+                    deadline=args.deadline,
+                    partial=args.partial,
+                )
+            )
+        except ValueError as error:
+            sys.exit(f"error: {error}")
+        finally:
+            output.flush()
+            if output is not sys.stdout:
+                output.close()
+            if input_file is not sys.stdin:
+                input_file.close()
+            if args.metrics:
+                default_registry.write_prometheus(args.metrics)
+        sys.exit(1 if failed else 0)
+
     ctx = ExecutionContext(state=state, config=config)
 
     print(f"Executing workflow: {workflow.name}")
@@ -52,12 +359,38 @@ def main():
     print(f"Config: {ctx.config}")
     print("-" * 40)
 
-    asyncio.run(workflow.execute_async(ctx))
+    recorder = ChromeTraceRecorder() if args.profile else None
+    asyncio.run(
+        workflow.execute_async(
+            ctx,
+            mode=args.mode,
+            max_concurrency=args.max_concurrency,
+            tracer=recorder,
+            deadline=args.deadline,
+            partial=args.partial,
+        )
+    )
 
     print("-" * 40)
     print(f"Final state: {ctx.state}")
     print(f"Node context: {ctx.node_context}")
 
+    if recorder:
+        recorder.write(args.profile)
+        print("-" * 40)
+        print(f"Trace written to {args.profile}")
+        print(f"{'node':<30} {'visits':>7} {'total (ms)':>11} {'max (ms)':>9}")
+        for name, stats in recorder.summary().items():
+            print(
+                f"{name:<30} {stats['count']:>7} "
+                f"{stats['total_ms']:>11.3f} {stats['max_ms']:>9.3f}"
+            )
+
+    if args.metrics:
+        default_registry.write_prometheus(args.metrics)
+        print("-" * 40)
+        print(f"Metrics written to {args.metrics}")
+
 
 if __name__ == "__main__":
     main()
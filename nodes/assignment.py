@@ -2,6 +2,7 @@ from typing import TYPE_CHECKING
 
 from nodes.base import BaseNode
 from nodes.connection import NodeConnection
+from workflows.path import FieldPath, static_path
 
 if TYPE_CHECKING:
     from workflows.context import ExecutionContext
@@ -12,6 +13,8 @@ class SetNode(BaseNode):
     description: str
     type: str = "set"
 
+    __slots__ = ("variable_name", "value", "variable_path", "value_path")
+
     def __init__(
         self,
         name,
@@ -20,16 +23,24 @@ class SetNode(BaseNode):
         value: str,
         connections: list[NodeConnection] | None = None,
         parameters: dict | None = None,
+        variable_path: FieldPath | None = None,
+        value_path: FieldPath | None = None,
     ):
         super().__init__(name, description, parameters or {}, connections or [])
 
         self.variable_name = variable
         self.value = value
+        # Compiled accessors; a non-string value is a literal and has no path
+        self.variable_path = variable_path or static_path(variable)
+        self.value_path = value_path or static_path(value)
 
     async def execute_async(self, ctx: "ExecutionContext") -> None:
         # Try to extract from context, fallback to literal value
-        extracted_value = ctx.get(self.value, self.value)
-        ctx.set(self.variable_name, extracted_value)
+        if self.value_path is None:
+            extracted_value = self.value
+        else:
+            extracted_value = ctx.get(self.value_path, self.value)
+        ctx.set(self.variable_path or self.variable_name, extracted_value)
 
     def to_dict(self) -> dict:
         return {
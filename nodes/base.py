@@ -20,23 +20,32 @@ class BaseNode:
     description: str
     type: str
     parameters: dict
-    connections: list[NodeConnection] = []
+    connections: list[NodeConnection]
+
+    # Subclasses declare their own attributes in __slots__ as well, so nodes
+    # of large graphs carry no per-instance __dict__
+    __slots__ = ("name", "description", "parameters", "connections")
 
     def __init__(
         self,
         name: str,
         description: str,
-        parameters: dict = {},
-        connections: list[NodeConnection] = [],
+        parameters: dict | None = None,
+        connections: list[NodeConnection] | None = None,
     ):
         self.name = name
         self.description = description
-        self.parameters = parameters
-        self.connections = connections
+        self.parameters = parameters if parameters is not None else {}
+        self.connections = connections if connections is not None else []
 
     def is_valid(self, parameters: dict) -> bool:
         return True
 
+    @property
+    def deadline(self) -> float | None:
+        """Seconds a step of this node may take, from its optional `deadline` parameter."""
+        return self.parameters.get("deadline")
+
     @abstractmethod
     async def execute_async(self, ctx: "ExecutionContext") -> None:
         pass
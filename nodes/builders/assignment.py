@@ -1,16 +1,21 @@
 from collections.abc import Generator
 from nodes.assignment import SetNode
 from nodes.builders.base import NodeBuilder
+from workflows.path import static_path
 
 
 class SetNodeBuilder(NodeBuilder[SetNode]):
     def create(self) -> SetNode:
+        variable = self.parameters.get("variable_name", "")
+        value = self.parameters.get("value", "")
         return SetNode(
             name=self.name,
             description=self.description,
-            variable=self.parameters.get("variable_name", ""),
-            value=self.parameters.get("value", ""),
+            variable=variable,
+            value=value,
             parameters=self.parameters,
+            variable_path=static_path(variable),
+            value_path=static_path(value),
         )
 
     def get_errors(self) -> Generator[str, None, None]:
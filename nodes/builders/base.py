@@ -33,8 +33,16 @@ class NodeBuilder(Generic[T]):
     def get_errors(self) -> Generator[str, None, None]:
         pass
 
+    def get_common_errors(self) -> Generator[str, None, None]:
+        """Errors in the parameters every node type accepts."""
+        deadline = self.parameters.get("deadline")
+        if deadline is not None and (
+            isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or deadline <= 0
+        ):
+            yield "'deadline' parameter must be a positive number of seconds"
+
     def get_error(self) -> str | None:
-        return next(self.get_errors(), None)
+        return next(self.get_common_errors(), None) or next(self.get_errors(), None)
 
     def is_valid(self) -> bool:
-        return not any(self.get_errors())
+        return not any(self.get_common_errors()) and not any(self.get_errors())
@@ -0,0 +1,97 @@
+from collections.abc import Generator, Iterable
+
+from nodes.builders.base import NodeBuilder
+from nodes.builders.pure import PureNodeBuilder
+from nodes.collection import AggregateOperation, FilterNode, MapNode, ReduceNode
+from utils.logic import compile_logic
+from utils.vector import vectorize
+from workflows.path import static_path
+
+
+class CollectionNodeBuilder(PureNodeBuilder, NodeBuilder):
+    expression_parameter = "expression"
+
+    def common_arguments(self) -> dict:
+        collection = self.parameters.get("collection", "")
+        output = self.parameters.get("output", "")
+        expression = self.parameters.get(self.expression_parameter)
+        arguments = {
+            "name": self.name,
+            "description": self.description,
+            "collection": collection,
+            "output": output,
+            "parameters": self.parameters,
+            "collection_path": static_path(collection),
+            "output_path": static_path(output),
+            "reads": self.read_paths(),
+        }
+        if expression is not None:
+            arguments["evaluator"] = compile_logic(expression, falsy_data_as_empty=False)
+            arguments["vector"] = vectorize(expression)
+        return arguments
+
+    def default_reads(self) -> Iterable[str] | None:
+        # Expressions only see the items
+        return [self.parameters.get("collection", "")]
+
+    def get_errors(self) -> Generator[str, None, None]:
+        for parameter in ("collection", "output"):
+            if parameter not in self.parameters:
+                yield f"Missing '{parameter}' parameter"
+            elif not isinstance(self.parameters[parameter], str):
+                yield f"'{parameter}' parameter must be a path string"
+        yield from self.get_pure_errors()
+
+
+class MapNodeBuilder(CollectionNodeBuilder):
+    def create(self) -> MapNode:
+        return MapNode(
+            expression=self.parameters.get("expression"),
+            **self.common_arguments(),
+        )
+
+    def get_errors(self) -> Generator[str, None, None]:
+        yield from super().get_errors()
+        if "expression" not in self.parameters:
+            yield "Missing 'expression' parameter"
+
+
+class FilterNodeBuilder(CollectionNodeBuilder):
+    expression_parameter = "condition"
+
+    def create(self) -> FilterNode:
+        return FilterNode(
+            condition=self.parameters.get("condition"),
+            **self.common_arguments(),
+        )
+
+    def get_errors(self) -> Generator[str, None, None]:
+        yield from super().get_errors()
+        if "condition" not in self.parameters:
+            yield "Missing 'condition' parameter"
+
+
+class ReduceNodeBuilder(CollectionNodeBuilder):
+    def create(self) -> ReduceNode:
+        key = self.parameters.get("key")
+        return ReduceNode(
+            operation=self.parameters.get("operation"),
+            expression=self.parameters.get("expression"),
+            key=key,
+            initial=self.parameters.get("initial"),
+            key_evaluator=compile_logic(key, falsy_data_as_empty=False) if key is not None else None,
+            **self.common_arguments(),
+        )
+
+    def get_errors(self) -> Generator[str, None, None]:
+        yield from super().get_errors()
+        operation = self.parameters.get("operation")
+        if operation is None:
+            yield "Missing 'operation' parameter"
+        elif operation not in tuple(AggregateOperation):
+            operations = ", ".join(AggregateOperation)
+            yield f"'operation' parameter must be one of: {operations}"
+        elif operation == AggregateOperation.REDUCE and "expression" not in self.parameters:
+            yield "Missing 'expression' parameter"
+        elif operation == AggregateOperation.GROUP_BY and "key" not in self.parameters:
+            yield "Missing 'key' parameter"
@@ -1,19 +1,36 @@
-from collections.abc import Generator
+from collections.abc import Generator, Iterable
 from nodes.builders.base import NodeBuilder
+from nodes.builders.pure import PureNodeBuilder
 from nodes.condition import ConditionNode
+from utils.logic import compile_logic, logic_vars
 
 
-class ConditionNodeBuilder(NodeBuilder[ConditionNode]):
+class ConditionNodeBuilder(PureNodeBuilder, NodeBuilder[ConditionNode]):
     def create(self) -> ConditionNode:
+        condition = self.parameters.get("condition", {})
         return ConditionNode(
             name=self.name,
             description=self.description,
-            condition=self.parameters.get("condition", {}),
+            condition=condition,
             parameters=self.parameters,
+            evaluator=compile_logic(condition),
+            reads=self.read_paths(),
         )
 
+    def default_reads(self) -> Iterable[str] | None:
+        names = logic_vars(self.parameters.get("condition", {}))
+        if names is None:
+            return None
+        # Conditions see node_context over state, which is how ctx.get resolves
+        # a path, except that "state"/"config" here are plain state keys
+        return [
+            f"state.{name}" if name.split(".", 1)[0] in ("state", "config") else name
+            for name in names
+        ]
+
     def get_errors(self) -> Generator[str, None, None]:
         if "condition" not in self.parameters:
             yield "Missing 'condition' parameter"
+        yield from self.get_pure_errors()
 
         return
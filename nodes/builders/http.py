@@ -0,0 +1,53 @@
+from collections.abc import Generator
+
+from nodes.builders.base import NodeBuilder
+from nodes.http import DEFAULT_TIMEOUT, HttpNode, compile_url
+from workflows.path import static_path
+
+HTTP_METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+
+
+class HttpNodeBuilder(NodeBuilder[HttpNode]):
+    def create(self) -> HttpNode:
+        url = self.parameters.get("url", "")
+        body = self.parameters.get("body")
+        return HttpNode(
+            name=self.name,
+            description=self.description,
+            url=url,
+            method=self.parameters.get("method", "GET"),
+            headers=self.parameters.get("headers"),
+            body=body,
+            timeout=self.parameters.get("timeout", DEFAULT_TIMEOUT),
+            output=self.parameters.get("output"),
+            parameters=self.parameters,
+            url_template=compile_url(url),
+            body_path=static_path(body),
+        )
+
+    def get_errors(self) -> Generator[str, None, None]:
+        url = self.parameters.get("url")
+        if url is None:
+            yield "Missing 'url' parameter"
+        elif not isinstance(url, str) or not url:
+            yield "'url' parameter must be a non-empty string"
+
+        method = self.parameters.get("method", "GET")
+        if not isinstance(method, str) or method.upper() not in HTTP_METHODS:
+            yield f"'method' parameter must be one of {', '.join(HTTP_METHODS)}"
+
+        headers = self.parameters.get("headers", {})
+        if not isinstance(headers, dict) or not all(
+            isinstance(name, str) and isinstance(value, str) for name, value in headers.items()
+        ):
+            yield "'headers' parameter must map header names to strings"
+
+        timeout = self.parameters.get("timeout", DEFAULT_TIMEOUT)
+        if timeout is not None and (
+            isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+        ):
+            yield "'timeout' parameter must be a positive number of seconds"
+
+        output = self.parameters.get("output")
+        if output is not None and not isinstance(output, str):
+            yield "'output' parameter must be a path string"
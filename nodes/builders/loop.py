@@ -1,22 +1,46 @@
 from collections.abc import Generator
 from nodes.builders.base import NodeBuilder
 from nodes.loop import ForLoopNode, EndLoopNode
+from workflows.overlay import MergePolicy
+from workflows.path import static_path
 
 
 class ForLoopNodeBuilder(NodeBuilder[ForLoopNode]):
     def create(self) -> ForLoopNode:
+        collection = self.parameters.get("collection", "")
+        iterator_var = self.parameters.get("iterator_var", "")
+        index_var = self.parameters.get("index_var")
         return ForLoopNode(
             name=self.name,
             description=self.description,
-            collection=self.parameters.get("collection", ""),
-            iterator_var=self.parameters.get("iterator_var", ""),
-            index_var=self.parameters.get("index_var"),
+            collection=collection,
+            iterator_var=iterator_var,
+            index_var=index_var,
             parameters=self.parameters,
+            collection_path=static_path(collection),
+            iterator_path=static_path(iterator_var),
+            index_path=static_path(index_var),
+            parallel=self.parameters.get("parallel", False),
+            max_concurrency=self.parameters.get("max_concurrency"),
+            result=self.parameters.get("result"),
+            merge=self.parameters.get("merge", MergePolicy.CHILD_WINS),
+            collect_results=self.parameters.get("collect_results", True),
         )
 
     def get_errors(self) -> Generator[str, None, None]:
         if "collection" not in self.parameters:
             yield "Missing 'collection' parameter"
+        if not isinstance(self.parameters.get("parallel", False), bool):
+            yield "'parallel' parameter must be a boolean"
+        if not isinstance(self.parameters.get("collect_results", True), bool):
+            yield "'collect_results' parameter must be a boolean"
+        max_concurrency = self.parameters.get("max_concurrency")
+        if max_concurrency is not None and (
+            not isinstance(max_concurrency, int) or max_concurrency < 1
+        ):
+            yield "'max_concurrency' parameter must be a positive integer"
+        if self.parameters.get("merge", MergePolicy.CHILD_WINS) not in tuple(MergePolicy):
+            yield f"'merge' parameter must be one of: {', '.join(MergePolicy)}"
         # iterator_var is optional - nodes can access via node_context (e.g., "loop_node.item")
 
 
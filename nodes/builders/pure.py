@@ -0,0 +1,41 @@
+from abc import abstractmethod
+from collections.abc import Generator, Iterable
+
+from workflows.path import FieldPath
+
+
+class PureNodeBuilder:
+    """
+    Mixin parsing the `pure` and `reads` parameters of memoizable nodes.
+
+    `reads` lists the context paths the node's result depends on; when it
+    is left out, builders infer it from the node's parameters.
+    """
+
+    parameters: dict
+
+    @abstractmethod
+    def default_reads(self) -> Iterable[str] | None:
+        """Paths read by the node, or None when they cannot be inferred."""
+
+    def read_paths(self) -> tuple[FieldPath, ...] | None:
+        if not self.parameters.get("pure", False):
+            return None
+        reads = self.parameters.get("reads")
+        if reads is None:
+            reads = self.default_reads()
+        return tuple(FieldPath(path) for path in sorted(set(reads)))
+
+    def get_pure_errors(self) -> Generator[str, None, None]:
+        pure = self.parameters.get("pure", False)
+        if not isinstance(pure, bool):
+            yield "'pure' parameter must be a boolean"
+
+        reads = self.parameters.get("reads")
+        if reads is not None:
+            if not isinstance(reads, list) or not all(
+                isinstance(path, str) and path for path in reads
+            ):
+                yield "'reads' parameter must be a list of path strings"
+        elif pure is True and self.default_reads() is None:
+            yield "Cannot infer the paths read by the node, declare them in 'reads'"
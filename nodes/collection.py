@@ -0,0 +1,327 @@
+import math
+from abc import abstractmethod
+from enum import StrEnum
+from functools import reduce
+from itertools import compress
+from typing import TYPE_CHECKING, Any
+
+from nodes.base import BaseNode
+from nodes.connection import NodeConnection
+from nodes.pure import PureNode
+from utils.logic import Evaluator, compile_logic
+from utils.vector import (
+    VectorExpression,
+    as_array,
+    normalize_number,
+    normalize_numbers,
+    vectorize,
+)
+from workflows.memo import MISSING
+from workflows.path import FieldPath, static_path
+
+if TYPE_CHECKING:
+    from workflows.context import ExecutionContext
+
+
+class AggregateOperation(StrEnum):
+    """Operations supported by ReduceNode."""
+
+    SUM = "sum"
+    COUNT = "count"
+    MIN = "min"
+    MAX = "max"
+    GROUP_BY = "group_by"
+    REDUCE = "reduce"  # JSON Logic reducer over {"accumulator", "current"}
+
+
+def _copy_result(result: Any) -> Any:
+    """Copy a memoized result so later writes to the state cannot alter the cache."""
+    if type(result) is list:
+        return list(result)
+    if type(result) is dict:
+        # group_by results: lists of items by key
+        return {key: list(value) if type(value) is list else value for key, value in result.items()}
+    return result
+
+
+class CollectionNode(PureNode, BaseNode):
+    """
+    Base for nodes that transform a whole collection in a single execution.
+
+    The collection is read from `collection`, the result written to `output`.
+    Expressions are JSON Logic evaluated with each item as the data object
+    (`{"var": ""}` is the item itself). Numeric lists are processed as NumPy
+    arrays when NumPy is installed and the expression can be vectorized;
+    otherwise the compiled expression is applied item by item. Both paths
+    produce the same results.
+
+    With `pure`, results are memoized on the values at `reads`, by default
+    the collection. Cached lists and dicts are copied one level deep.
+    """
+
+    name: str
+    description: str
+
+    __slots__ = (
+        "collection",
+        "output",
+        "expression",
+        "collection_path",
+        "output_path",
+        "evaluator",
+        "vector",
+        "reads",
+        "memo",
+    )
+
+    def __init__(
+        self,
+        name,
+        description,
+        collection: str,
+        output: str,
+        expression: Any = None,
+        connections: list[NodeConnection] | None = None,
+        parameters: dict | None = None,
+        collection_path: FieldPath | None = None,
+        output_path: FieldPath | None = None,
+        evaluator: Evaluator | None = None,  # compiled expression
+        vector: VectorExpression | None = None,  # vectorized expression
+        reads: tuple[FieldPath, ...] | None = None,  # set for pure nodes
+    ):
+        super().__init__(name, description, parameters or {}, connections or [])
+
+        self.collection = collection
+        self.output = output
+        self.expression = expression
+        self.collection_path = collection_path or static_path(collection)
+        self.output_path = output_path or static_path(output)
+        self.reads = reads
+        self.memo = None
+        if expression is None:
+            self.evaluator = self.vector = None
+        else:
+            self.evaluator = evaluator or compile_logic(expression, falsy_data_as_empty=False)
+            self.vector = vector or vectorize(expression)
+
+    async def execute_async(self, ctx: "ExecutionContext") -> None:
+        memo = self.memo
+        if memo is None:
+            ctx.set(self.output_path or self.output, self.apply(self._items(ctx)))
+            return
+
+        inputs = self.memo_inputs(ctx)
+        result = memo.get(self.name, inputs)
+        if result is MISSING:
+            result = self.apply(self._items(ctx))
+            memo.put(self.name, inputs, _copy_result(result))
+        else:
+            result = _copy_result(result)
+        ctx.set(self.output_path or self.output, result)
+
+    def _items(self, ctx: "ExecutionContext") -> list:
+        items = ctx.get(self.collection_path or self.collection, None)
+        if isinstance(items, tuple):
+            return list(items)
+        if not isinstance(items, list):
+            return []
+        return items
+
+    @abstractmethod
+    def apply(self, items: list) -> Any:
+        """Compute the node's result for a collection."""
+
+    def _evaluate(self, items: list) -> Any:
+        """Expression value of every item, as an array when vectorized or a list."""
+        if self.vector is not None and (array := as_array(items)) is not None:
+            result = self.vector(array)
+            if result is not None:
+                return result
+        evaluate = self.evaluator
+        return [evaluate(item) for item in items]
+
+    def to_dict(self) -> dict:
+        result = {
+            **super().to_dict(),
+            "collection": self.collection,
+            "output": self.output,
+        }
+        if self.reads is not None:
+            result["reads"] = [path.path for path in self.reads]
+        return result
+
+
+class MapNode(CollectionNode):
+    """Apply `expression` to every item: `output = [expression(item), ...]`."""
+
+    type: str = "map"
+
+    __slots__ = ()
+
+    def apply(self, items: list) -> list:
+        values = self._evaluate(items)
+        if isinstance(values, list):
+            return values
+        # JSON Logic arithmetic returns integral results as ints
+        if values.dtype.kind == "f" and self.vector.is_arithmetic:
+            return normalize_numbers(values.tolist())
+        return values.tolist()
+
+    def to_dict(self) -> dict:
+        return {**super().to_dict(), "expression": self.expression}
+
+
+class FilterNode(CollectionNode):
+    """Keep the items for which `condition` is truthy, in order."""
+
+    type: str = "filter"
+
+    __slots__ = ("condition",)
+
+    def __init__(self, name, description, collection: str, output: str, condition: Any, **kwargs):
+        super().__init__(name, description, collection, output, expression=condition, **kwargs)
+        self.condition = condition
+
+    def apply(self, items: list) -> list:
+        mask = self._evaluate(items)
+        if not isinstance(mask, list):
+            mask = mask.astype(bool).tolist()
+        return list(compress(items, mask))
+
+    def to_dict(self) -> dict:
+        return {**super().to_dict(), "condition": self.condition}
+
+
+class ReduceNode(CollectionNode):
+    """
+    Aggregate a collection into a single value.
+
+    `sum`, `min` and `max` aggregate the items, or `expression(item)` when an
+    expression is given; `count` counts the items, or those for which
+    `expression` is truthy. `group_by` maps `key(item)` to the list of items
+    (or expression values) with that key. `reduce` folds the items with a
+    JSON Logic `expression` over `{"accumulator", "current"}`, starting from
+    `initial`. Numeric results follow JSON Logic: integral floats become ints.
+    """
+
+    type: str = "reduce"
+
+    __slots__ = ("operation", "key", "initial", "key_evaluator")
+
+    def __init__(
+        self,
+        name,
+        description,
+        collection: str,
+        output: str,
+        operation: AggregateOperation | str,
+        expression: Any = None,
+        key: Any = None,
+        initial: Any = None,
+        key_evaluator: Evaluator | None = None,
+        **kwargs,
+    ):
+        super().__init__(name, description, collection, output, expression=expression, **kwargs)
+
+        self.operation = AggregateOperation(operation)
+        if self.operation is AggregateOperation.REDUCE:
+            # The reducer reads {"accumulator", "current"}, never a bare item
+            self.vector = None
+
+        self.key = key
+        self.initial = initial
+        if key is not None:
+            self.key_evaluator = key_evaluator or compile_logic(key, falsy_data_as_empty=False)
+        else:
+            self.key_evaluator = None
+
+    def apply(self, items: list) -> Any:
+        operation = self.operation
+        if operation is AggregateOperation.REDUCE:
+            evaluate = self.evaluator
+            return reduce(
+                lambda accumulator, current: evaluate(
+                    {"accumulator": accumulator, "current": current}
+                ),
+                items,
+                self.initial,
+            )
+        if operation is AggregateOperation.GROUP_BY:
+            return self._group_by(items)
+        if operation is AggregateOperation.COUNT:
+            if self.expression is None:
+                return len(items)
+            values = self._evaluate(items)
+            if isinstance(values, list):
+                return sum(map(bool, values))
+            return int(values.astype(bool).sum())
+
+        if not items:
+            return 0 if operation is AggregateOperation.SUM else None
+        values = self._values(items)
+        if isinstance(values, list):
+            return self._aggregate_list(values)
+        return self._aggregate_array(values)
+
+    def _values(self, items: list) -> Any:
+        if self.expression is None:
+            array = as_array(items)
+            return items if array is None else array
+        values = self._evaluate(items)
+        if not isinstance(values, list) and self.vector.is_predicate:
+            # Booleans aggregate as Python bools, e.g. max([False, True]) is True
+            return values.tolist()
+        return values
+
+    def _aggregate_list(self, values: list) -> Any:
+        operation = self.operation
+        if operation is AggregateOperation.MIN:
+            return normalize_number(min(values))
+        if operation is AggregateOperation.MAX:
+            return normalize_number(max(values))
+
+        total = sum(values)
+        if isinstance(total, float):
+            # Correctly rounded, so the result does not depend on the sum order
+            total = math.fsum(values)
+        return normalize_number(total)
+
+    def _aggregate_array(self, values: Any) -> Any:
+        operation = self.operation
+        if operation is AggregateOperation.MIN:
+            return normalize_number(values.min().item())
+        if operation is AggregateOperation.MAX:
+            return normalize_number(values.max().item())
+
+        if values.dtype.kind == "f":
+            total = math.fsum(values.tolist())
+            if not math.isfinite(total) or abs(total) >= 2**53:
+                # Float rounding could differ from the exact integer sum of
+                # normalized values, sum them as Python numbers instead
+                return self._aggregate_list(normalize_numbers(values.tolist()))
+            return normalize_number(total)
+        if len(values) * float(abs(values).max()) < 2**63:
+            return int(values.sum())
+        return sum(values.tolist())
+
+    def _group_by(self, items: list) -> dict:
+        keys = self.key_evaluator
+        values = items if self.expression is None else self._evaluate(items)
+        if not isinstance(values, list):
+            if values.dtype.kind == "f" and self.vector.is_arithmetic:
+                values = normalize_numbers(values.tolist())
+            else:
+                values = values.tolist()
+
+        groups: dict[Any, list] = {}
+        for item, value in zip(items, values):
+            groups.setdefault(keys(item), []).append(value)
+        return groups
+
+    def to_dict(self) -> dict:
+        result = {**super().to_dict(), "operation": str(self.operation)}
+        for name in ("expression", "key", "initial"):
+            value = getattr(self, name)
+            if value is not None:
+                result[name] = value
+        return result
@@ -1,19 +1,33 @@
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
 from json_logic import jsonLogic
 
 from nodes.base import BaseNode
 from nodes.connection import ConnectionLabel, NodeConnection
+from nodes.pure import PureNode
+from utils.logic import Evaluator
+from workflows.memo import MISSING
+from workflows.path import FieldPath
 
 if TYPE_CHECKING:
     from workflows.context import ExecutionContext
 
 
-class ConditionNode(BaseNode):
+class ConditionNode(PureNode, BaseNode):
+    """
+    Route to the `true` or `false` connection depending on a JSON Logic condition.
+
+    With `pure`, the decision is memoized on the values at `reads`, by
+    default the variables of the condition.
+    """
+
     name: str
     description: str
     type: str = "if"
 
+    __slots__ = ("condition", "evaluator", "true_node", "false_node", "reads", "memo")
+
     def __init__(
         self,
         name,
@@ -21,10 +35,16 @@ class ConditionNode(BaseNode):
         condition: dict,  # json logic condition
         connections: list[NodeConnection] | None = None,
         parameters: dict | None = None,
+        evaluator: Evaluator | None = None,  # compiled condition
+        reads: tuple[FieldPath, ...] | None = None,  # set for pure conditions
     ):
         super().__init__(name, description, parameters or {}, connections or [])
 
         self.condition = condition
+        # Fall back to interpreting the condition when it was not compiled
+        self.evaluator = evaluator or partial(jsonLogic, condition)
+        self.reads = reads
+        self.memo = None
         self.link(connections or [])
 
     def link(self, connections):
@@ -43,14 +63,28 @@ class ConditionNode(BaseNode):
         # ConditionNode only determines next nodes, doesn't execute logic
         pass
 
+    def matches(self, ctx: "ExecutionContext") -> Any:
+        """Evaluate the condition; truthy when the run continues to `true`."""
+        memo = self.memo
+        if memo is None:
+            # Evaluate against a chained view of node_context and state
+            return self.evaluator(ctx.data_view())
+
+        inputs = self.memo_inputs(ctx)
+        matched = memo.get(self.name, inputs)
+        if matched is MISSING:
+            matched = bool(self.evaluator(ctx.data_view()))
+            memo.put(self.name, inputs, matched)
+        return matched
+
     async def next_nodes(self, ctx: "ExecutionContext") -> list["BaseNode"]:
-        # Combine state and node_context for condition evaluation
-        data = {**ctx.state, **ctx.node_context}
-        result = jsonLogic(self.condition, data)
-        if result:
+        if self.matches(ctx):
             return [self.true_node] if self.true_node else []
 
         return [self.false_node] if self.false_node else []
 
     def to_dict(self) -> dict:
-        return {**super().to_dict(), "condition": self.condition}
+        result = {**super().to_dict(), "condition": self.condition}
+        if self.reads is not None:
+            result["reads"] = [path.path for path in self.reads]
+        return result
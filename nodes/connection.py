@@ -22,7 +22,9 @@ class RawConnection(TypedDict):
 
 class NodeConnection:
     to: "BaseNode"
-    label: str = "main"
+    label: str
+
+    __slots__ = ("to", "label")
 
     def __init__(self, to: "BaseNode", label="main"):
         self.to = to
@@ -19,6 +19,22 @@ class NodeFactory:
             from nodes.builders.loop import EndLoopNodeBuilder
 
             return EndLoopNodeBuilder
+        elif node_type == "map":
+            from nodes.builders.collection import MapNodeBuilder
+
+            return MapNodeBuilder
+        elif node_type == "filter":
+            from nodes.builders.collection import FilterNodeBuilder
+
+            return FilterNodeBuilder
+        elif node_type == "reduce":
+            from nodes.builders.collection import ReduceNodeBuilder
+
+            return ReduceNodeBuilder
+        elif node_type == "http":
+            from nodes.builders.http import HttpNodeBuilder
+
+            return HttpNodeBuilder
         else:
             raise ValueError(f"Unknown node type: {node_type}")
 
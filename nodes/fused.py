@@ -0,0 +1,41 @@
+from typing import TYPE_CHECKING
+
+from nodes.base import BaseNode
+from nodes.connection import NodeConnection
+
+if TYPE_CHECKING:
+    from workflows.context import ExecutionContext
+
+
+class FusedNode(BaseNode):
+    """
+    A linear chain of nodes executed as a single scheduler step.
+
+    Built by the workflow optimizer, never from a definition. Every node but
+    the last routes unconditionally to the next one, which has no other
+    predecessor, so running them back to back is what the scheduler would
+    do. The chain routes like its last node.
+    """
+
+    type: str = "fused"
+
+    __slots__ = ("nodes",)
+
+    def __init__(self, nodes: list[BaseNode]):
+        last = nodes[-1]
+        super().__init__("+".join(node.name for node in nodes), "", {}, last.connections)
+        self.nodes = tuple(nodes)
+
+    def link(self, connections: list[NodeConnection]):
+        super().link(connections)
+        self.nodes[-1].link(connections)
+
+    async def execute_async(self, ctx: "ExecutionContext") -> None:
+        for node in self.nodes:
+            await node.execute_async(ctx)
+
+    async def next_nodes(self, ctx: "ExecutionContext") -> list[BaseNode]:
+        return await self.nodes[-1].next_nodes(ctx)
+
+    def to_dict(self) -> dict:
+        return {**super().to_dict(), "nodes": [node.to_dict() for node in self.nodes]}
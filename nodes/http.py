@@ -0,0 +1,157 @@
+import json
+import re
+import time
+from typing import TYPE_CHECKING, Any
+from urllib.parse import quote
+
+from nodes.base import BaseNode
+from nodes.connection import NodeConnection
+from utils.http_client import ConnectionPool, default_pool
+from workflows.overlay import materialize
+from workflows.path import FieldPath, static_path
+
+if TYPE_CHECKING:
+    from workflows.context import ExecutionContext
+
+DEFAULT_TIMEOUT = 30.0
+
+# "{path}" placeholders in a URL, filled from the context
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+
+UrlTemplate = tuple[str | FieldPath, ...]
+
+
+def compile_url(url: str) -> UrlTemplate:
+    """Split a URL into literal parts and compiled placeholder paths."""
+    parts: list[str | FieldPath] = []
+    for index, part in enumerate(_PLACEHOLDER.split(url)):
+        if index % 2:
+            parts.append(FieldPath(part.strip()))
+        elif part:
+            parts.append(part)
+    return tuple(parts)
+
+
+class HttpNode(BaseNode):
+    """
+    Send an HTTP request and store the response in node_context.
+
+    The URL may hold `{path}` placeholders, filled with values from the
+    context (e.g. `http://api/items/{loop.item}`) and URL-quoted. A string
+    body is read as a path with a literal fallback, like SetNode values;
+    non-string bodies are sent as JSON. Requests go through a shared
+    keep-alive ConnectionPool, which caps concurrent connections per host.
+
+    The response is stored as `{"status", "ok", "headers", "body",
+    "elapsed_ms"}` in the node's context; JSON bodies are decoded. Timeouts
+    and connection errors fail the node; HTTP error statuses do not.
+    """
+
+    name: str
+    description: str
+    type: str = "http"
+
+    __slots__ = (
+        "url",
+        "method",
+        "headers",
+        "body",
+        "timeout",
+        "output",
+        "url_template",
+        "body_path",
+        "output_path",
+        "pool",
+    )
+
+    STATUS_KEY = "status"
+    OK_KEY = "ok"
+    HEADERS_KEY = "headers"
+    BODY_KEY = "body"
+    ELAPSED_KEY = "elapsed_ms"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        url: str,
+        method: str = "GET",
+        headers: dict[str, str] | None = None,
+        body: Any = None,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        output: str | None = None,
+        connections: list[NodeConnection] | None = None,
+        parameters: dict | None = None,
+        url_template: UrlTemplate | None = None,
+        body_path: FieldPath | None = None,
+        pool: ConnectionPool | None = None,
+    ):
+        super().__init__(name, description, parameters or {}, connections or [])
+
+        self.url = url
+        self.method = method.upper()
+        self.headers = headers or {}
+        self.body = body
+        self.timeout = timeout
+        self.output = output  # Optional: also store the response body in state
+        self.url_template = url_template or compile_url(url)
+        self.body_path = body_path or static_path(body)
+        self.output_path = static_path(output)
+        self.pool = pool or default_pool
+
+    def render_url(self, ctx: "ExecutionContext") -> str:
+        return "".join(
+            part
+            if isinstance(part, str)
+            else quote(str(part.get(ctx, "")), safe=":/@")
+            for part in self.url_template
+        )
+
+    def _encode_body(self, ctx: "ExecutionContext", headers: dict[str, str]) -> bytes | None:
+        if self.body is None:
+            return None
+        value = self.body if self.body_path is None else ctx.get(self.body_path, self.body)
+        if isinstance(value, bytes):
+            return value
+        content_type = None
+        if isinstance(value, str):
+            data, content_type = value.encode(), "text/plain; charset=utf-8"
+        else:
+            data, content_type = json.dumps(materialize(value)).encode(), "application/json"
+        if not any(name.lower() == "content-type" for name in headers):
+            headers["Content-Type"] = content_type
+        return data
+
+    async def execute_async(self, ctx: "ExecutionContext") -> None:
+        headers = dict(self.headers)
+        body = self._encode_body(ctx, headers)
+
+        start = time.perf_counter()
+        response = await self.pool.request(
+            self.method, self.render_url(ctx), headers, body, self.timeout
+        )
+        content = response.decoded()
+
+        ctx.set_node_context(
+            self.name,
+            {
+                self.STATUS_KEY: response.status,
+                self.OK_KEY: response.ok,
+                self.HEADERS_KEY: response.headers,
+                self.BODY_KEY: content,
+                self.ELAPSED_KEY: (time.perf_counter() - start) * 1000,
+            },
+        )
+        if self.output:
+            ctx.set(self.output_path, content)
+
+    def to_dict(self) -> dict:
+        return {
+            **super().to_dict(),
+            "url": self.url,
+            "method": self.method,
+            "headers": self.headers,
+            "body": self.body,
+            "timeout": self.timeout,
+            "output": self.output,
+        }
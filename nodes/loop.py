@@ -1,22 +1,85 @@
-from typing import TYPE_CHECKING
+import asyncio
+from collections.abc import Iterable, Mapping, Sequence
+from itertools import islice
+from typing import TYPE_CHECKING, Any
 
 from nodes.base import BaseNode
 from nodes.connection import ConnectionLabel, NodeConnection
+from workflows.exception import MergeConflictException
+from workflows.graph import GraphIndex
+from workflows.overlay import MergePolicy, materialize
+from workflows.path import FieldPath, static_path
+from workflows.scheduler import DataflowScheduler
 
 if TYPE_CHECKING:
     from workflows.context import ExecutionContext
 
+# Returned by `_pull` once an iterator is exhausted
+_EXHAUSTED = object()
+
+# Default number of items in flight for a parallel loop over an iterator,
+# whose length is unknown up front
+DEFAULT_STREAM_CONCURRENCY = 100
+
+
+def _open_cursor(collection: Any) -> dict[str, Any]:
+    """
+    Loop cursor over a collection, without copying it.
+
+    Sequences are read in place by index. Other iterables, generators and
+    async iterators are consumed lazily through an iterator. Strings, bytes
+    and mappings are not iterated, as before.
+    """
+    if isinstance(collection, (str, bytes, Mapping)):
+        return {ForLoopNode.LOOP_COLLECTION_KEY: ()}
+    if isinstance(collection, Sequence):
+        return {ForLoopNode.LOOP_COLLECTION_KEY: collection}
+    if hasattr(collection, "__aiter__"):
+        return {ForLoopNode.LOOP_ITERATOR_KEY: aiter(collection)}
+    if isinstance(collection, Iterable):
+        return {ForLoopNode.LOOP_ITERATOR_KEY: iter(collection)}
+    return {ForLoopNode.LOOP_COLLECTION_KEY: ()}
+
+
+async def _pull(iterator: Any) -> Any:
+    """Next item of a sync or async iterator, or `_EXHAUSTED`."""
+    if hasattr(iterator, "__anext__"):
+        return await anext(iterator, _EXHAUSTED)
+    return next(iterator, _EXHAUSTED)
+
 
 class ForLoopNode(BaseNode):
     name: str
     description: str
     type: str = "for"
 
+    __slots__ = (
+        "collection",
+        "iterator_var",
+        "index_var",
+        "collection_path",
+        "iterator_path",
+        "index_path",
+        "body_node",
+        "exit_node",
+        "parallel",
+        "max_concurrency",
+        "result",
+        "result_path",
+        "collect_results",
+        "merge",
+        "_body_index",
+    )
+
     # Keys for node_context storage
     LOOP_INDEX_KEY = "__index"
-    LOOP_COLLECTION_KEY = "__collection"
+    LOOP_COLLECTION_KEY = "__collection"  # Sequence looped over, by reference
+    LOOP_ITERATOR_KEY = "__iterator"  # Iterator of a non-sequence collection
+    LOOP_DONE_KEY = "__done"
     ITEM_KEY = "item"
     INDEX_KEY = "index"
+    RESULTS_KEY = "results"
+    COUNT_KEY = "count"
 
     def __init__(
         self,
@@ -27,15 +90,38 @@ class ForLoopNode(BaseNode):
         index_var: str | None = None,
         connections: list[NodeConnection] | None = None,
         parameters: dict | None = None,
+        collection_path: FieldPath | None = None,
+        iterator_path: FieldPath | None = None,
+        index_path: FieldPath | None = None,
+        parallel: bool = False,
+        max_concurrency: int | None = None,
+        result: str | None = None,
+        merge: MergePolicy | str = MergePolicy.CHILD_WINS,
+        collect_results: bool = True,
     ):
         super().__init__(name, description, parameters or {}, connections or [])
 
         self.collection = collection
         self.iterator_var = iterator_var  # Optional: also store in state for backward compat
         self.index_var = index_var  # Optional: also store in state for backward compat
+        # Compiled accessors for the paths above
+        self.collection_path = collection_path or static_path(collection) or collection
+        self.iterator_path = iterator_path or static_path(iterator_var)
+        self.index_path = index_path or static_path(index_var)
         self.body_node: BaseNode | None = None
         self.exit_node: BaseNode | None = None
 
+        # Parallel mode: run the body for many items at once, each in its own context
+        self.parallel = parallel
+        self.max_concurrency = max_concurrency
+        self.result = result  # Optional: path collected from each item's context
+        self.result_path = static_path(result)
+        # False for loops run only for their merged writes: keeps memory flat
+        self.collect_results = collect_results
+        # How item writes are merged back, in item order, as items finish
+        self.merge = MergePolicy(merge)
+        self._body_index: GraphIndex | None = None
+
         self.link(connections or [])
 
     def link(self, connections: list[NodeConnection]):
@@ -49,57 +135,261 @@ class ForLoopNode(BaseNode):
             (conn.to for conn in self.connections if conn.label == ConnectionLabel.EXIT),
             None,
         )
+        self._body_index = None
 
     async def execute_async(self, ctx: "ExecutionContext") -> None:
+        if self.parallel:
+            await self._execute_parallel(ctx)
+            return
+
         node_ctx = ctx.get_node_context(self.name)
 
         # Initialize loop state on first call
         if self.LOOP_INDEX_KEY not in node_ctx:
-            # Get collection from context path
-            collection = ctx.get(self.collection, None)
-
-            # If not found, try as literal
-            if collection is None:
-                collection = []
-
-            if not isinstance(collection, (list, tuple)):
-                collection = []
-
-            ctx.set_node_context(
-                self.name,
-                {
-                    self.LOOP_INDEX_KEY: 0,
-                    self.LOOP_COLLECTION_KEY: list(collection),
-                },
-            )
+            ctx.set_node_context(self.name, {self.LOOP_INDEX_KEY: 0})
             node_ctx = ctx.get_node_context(self.name)
-
-        # Set current item and index in node_context
         index = node_ctx[self.LOOP_INDEX_KEY]
-        collection = node_ctx[self.LOOP_COLLECTION_KEY]
 
-        if index < len(collection):
-            ctx.update_node_context(self.name, self.ITEM_KEY, collection[index])
-            ctx.update_node_context(self.name, self.INDEX_KEY, index)
+        if (
+            self.LOOP_COLLECTION_KEY not in node_ctx
+            and self.LOOP_ITERATOR_KEY not in node_ctx
+        ):
+            # First iteration, or resuming from a cursor that only kept the index
+            node_ctx.update(await self._resume_cursor(ctx, index))
+
+        # Fetch the current item: only the cursor lives in node_context
+        collection = node_ctx.get(self.LOOP_COLLECTION_KEY)
+        if collection is not None:
+            item = collection[index] if index < len(collection) else _EXHAUSTED
+        else:
+            item = await _pull(node_ctx[self.LOOP_ITERATOR_KEY])
+
+        if item is _EXHAUSTED:
+            node_ctx[self.LOOP_DONE_KEY] = True
+            return
+
+        ctx.update_node_context(self.name, self.ITEM_KEY, item)
+        ctx.update_node_context(self.name, self.INDEX_KEY, index)
+
+        # Backward compatibility: also set in state if iterator_var/index_var specified
+        if self.iterator_var:
+            ctx.set(self.iterator_path, item)
+        if self.index_var:
+            ctx.set(self.index_path, index)
+
+    async def _resume_cursor(self, ctx: "ExecutionContext", index: int) -> dict[str, Any]:
+        """Open a cursor on the collection, skipping the first `index` items."""
+        cursor = _open_cursor(ctx.get(self.collection_path, None))
+        iterator = cursor.get(self.LOOP_ITERATOR_KEY)
+        if iterator is not None and index:
+            if hasattr(iterator, "__anext__"):
+                for _ in range(index):
+                    await anext(iterator, None)
+            else:
+                next(islice(iterator, index, index), None)
+        return cursor
+
+    async def _execute_parallel(self, ctx: "ExecutionContext") -> None:
+        source = ctx.get(self.collection_path, None)
+        cursor = _open_cursor(source)
+        collection = cursor.get(self.LOOP_COLLECTION_KEY)
+        if collection is not None:
+            iterator = iter(collection)
+            concurrency = min(self.max_concurrency or len(collection), len(collection))
+        else:
+            iterator = cursor[self.LOOP_ITERATOR_KEY]
+            concurrency = self.max_concurrency or DEFAULT_STREAM_CONCURRENCY
+
+        body = self._body_graph()
+        scope = self._merge_scope()
+        results: list[Any] = []
+        count = 0
+        # Finished items waiting for every earlier item to be merged first
+        finished: dict[int, "ExecutionContext"] = {}
+        merged = 0
+        # Items pulled but not merged yet: bounds the contexts held at once
+        window = 2 * concurrency
+        pulling = asyncio.Lock()
+        progress = asyncio.Condition()
+
+        async def worker() -> None:
+            nonlocal count, merged
+            # Workers share one iterator, so items are pulled only as workers free up
+            while True:
+                async with pulling:
+                    # The lowest unmerged item is always running, so this wakes up
+                    async with progress:
+                        await progress.wait_for(lambda: count - merged < window)
+                    item = await _pull(iterator)
+                    if item is _EXHAUSTED:
+                        return
+                    index = count
+                    count += 1
+                    if self.collect_results:
+                        results.append(None)
+
+                item_ctx = self._item_context(ctx, item, index)
+                if body is not None:
+                    await DataflowScheduler(body).run(item_ctx)
+                if self.collect_results:
+                    results[index] = self._item_result(ctx, item_ctx)
+                finished[index] = item_ctx
+                del item_ctx
+
+                if index == merged:
+                    while merged in finished:
+                        self._merge_item(ctx, finished.pop(merged), scope)
+                        merged += 1
+                    async with progress:
+                        progress.notify_all()
 
-            # Backward compatibility: also set in state if iterator_var/index_var specified
-            if self.iterator_var:
-                ctx.set(self.iterator_var, collection[index])
-            if self.index_var:
-                ctx.set(self.index_var, index)
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            raise
+
+        # Exit through next_nodes: no loop cursor is stored in parallel mode
+        node_ctx: dict[str, Any] = {self.COUNT_KEY: count}
+        if self.collect_results:
+            node_ctx[self.RESULTS_KEY] = results
+        ctx.set_node_context(self.name, node_ctx)
+
+    def _merge_scope(self) -> frozenset[str]:
+        """
+        The loop's own item scope: its node context and iterator/index
+        variables, written by every item and never counted as a conflict.
+        """
+        return frozenset({self.name}) | {
+            f"state.{'.'.join(path.set_keys)}"
+            for path in (self.iterator_path, self.index_path)
+            if path is not None
+        }
+
+    def _merge_item(
+        self, ctx: "ExecutionContext", item_ctx: "ExecutionContext", scope: frozenset[str]
+    ) -> None:
+        """
+        Apply one finished item's writes to `ctx` with the `merge` policy.
+
+        Items are merged in item order as soon as every earlier item is, so
+        an item forked after an earlier one was merged sees its writes. A
+        conflict is a key the item wrote before an earlier item merged it.
+        """
+        if self.merge is not MergePolicy.ERROR:
+            ctx.merge(item_ctx, self.merge)
+            return
+
+        conflicts = [
+            conflict
+            for conflict in (
+                *item_ctx.state.conflicts("state."),
+                *item_ctx.node_context.conflicts(),
+            )
+            if conflict not in scope
+        ]
+        if conflicts:
+            raise MergeConflictException(conflicts)
+        ctx.merge(item_ctx, MergePolicy.CHILD_WINS)
+
+    def _body_graph(self) -> GraphIndex | None:
+        """
+        Index the loop body: the natural loop of this node, without the node
+        and its closing end_loop (see GraphIndex.loops).
+
+        Nodes reachable from the body that do not lead back to the loop, e.g.
+        those after its exit, are not part of it; `validate_body` rejects a
+        body connecting to them when the workflow is built. An unclosed
+        loop's body is everything reachable from it.
+        """
+        if self._body_index is None and self.body_node is not None:
+            self._body_index = GraphIndex(
+                self._body_nodes(), start_nodes=[self.body_node], closed=False
+            )
+        return self._body_index
+
+    def _body_nodes(self) -> list[BaseNode]:
+        reached: dict[BaseNode, None] = {self: None}
+        pending = [self.body_node]
+        while pending:
+            node = pending.pop()
+            if node in reached:
+                continue
+            reached[node] = None
+            pending.extend(conn.to for conn in node.connections)
+
+        scope = GraphIndex(reached, start_nodes=[self], closed=False)
+        loop = scope.loops.get(scope.ids[self])
+        if loop is None:
+            return [node for node in reached if node is not self]
+        return [
+            scope.nodes[node_id]
+            for node_id in sorted(loop.body)
+            if node_id != loop.header and not self._closes_loop(scope.nodes[node_id])
+        ]
+
+    def validate_body(self) -> None:
+        """
+        Check that a parallel loop's body stays inside the loop.
+
+        Raises:
+            ValueError: If a body node connects to a node outside the loop
+                body, which sequential mode would run in the middle of the loop.
+        """
+        if not self.parallel or self.body_node is None:
+            return
+        nodes = self._body_nodes()
+        members = set(nodes)
+        for node in nodes:
+            for conn in node.connections:
+                if conn.to not in members and conn.to is not self and not (
+                    self._closes_loop(conn.to)
+                ):
+                    raise ValueError(
+                        f"Parallel loop {self.name!r}: body node {node.name!r} "
+                        f"connects to {conn.to.name!r}, outside the loop body"
+                    )
+
+    def _closes_loop(self, node: BaseNode) -> bool:
+        return isinstance(node, EndLoopNode) and any(
+            conn.to is self for conn in node.connections
+        )
+
+    def _item_context(
+        self, ctx: "ExecutionContext", item: Any, index: int
+    ) -> "ExecutionContext":
+        # Each item gets a copy-on-write fork of the context with its own loop
+        # scope, so forking costs the same however large the state is
+        item_ctx = ctx.fork()
+        item_ctx.set_node_context(self.name, {self.ITEM_KEY: item, self.INDEX_KEY: index})
+        if self.iterator_var:
+            item_ctx.set(self.iterator_path, item)
+        if self.index_var:
+            item_ctx.set(self.index_path, index)
+        return item_ctx
+
+    def _item_result(self, ctx: "ExecutionContext", item_ctx: "ExecutionContext") -> Any:
+        if self.result_path is not None:
+            return materialize(item_ctx.get(self.result_path))
+
+        # Default: the top-level state keys the item's body changed
+        return {
+            key: value
+            for key, value in item_ctx.state.changes().items()
+            if key not in ctx.state or ctx.state[key] != value
+        }
 
     async def next_nodes(self, ctx: "ExecutionContext") -> list[BaseNode]:
         node_ctx = ctx.get_node_context(self.name)
 
         if not node_ctx or self.LOOP_INDEX_KEY not in node_ctx:
-            # No loop state, exit
+            # No loop state (or a finished parallel loop), exit
             return [self.exit_node] if self.exit_node else []
 
-        index = node_ctx[self.LOOP_INDEX_KEY]
-        collection = node_ctx[self.LOOP_COLLECTION_KEY]
-
-        if index < len(collection):
-            # More items to iterate
+        if not node_ctx.get(self.LOOP_DONE_KEY):
+            # execute_async fetched an item
             return [self.body_node] if self.body_node else []
         else:
             # Loop complete, clean up and exit
@@ -112,6 +402,11 @@ class ForLoopNode(BaseNode):
             "collection": self.collection,
             "iterator_var": self.iterator_var,
             "index_var": self.index_var,
+            "parallel": self.parallel,
+            "max_concurrency": self.max_concurrency,
+            "result": self.result,
+            "collect_results": self.collect_results,
+            "merge": str(self.merge),
         }
 
 
@@ -120,6 +415,8 @@ class EndLoopNode(BaseNode):
     description: str
     type: str = "end_loop"
 
+    __slots__ = ()
+
     def __init__(
         self,
         name: str,
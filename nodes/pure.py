@@ -0,0 +1,30 @@
+from collections.abc import Hashable
+from typing import TYPE_CHECKING
+
+from workflows.memo import MemoCache, input_key
+from workflows.path import FieldPath
+
+if TYPE_CHECKING:
+    from workflows.context import ExecutionContext
+
+
+class PureNode:
+    """
+    Mixin for nodes that can declare themselves pure.
+
+    A pure node's result depends only on the values at its `reads` paths, so
+    the workflow's MemoCache can return the result of an earlier execution
+    with the same inputs instead of evaluating again. `reads` is None for
+    nodes that are not pure; `memo` is set by the Workflow owning the node.
+    Subclasses declare both attributes in their `__slots__`.
+    """
+
+    __slots__ = ()
+
+    name: str
+    reads: tuple[FieldPath, ...] | None
+    memo: MemoCache | None
+
+    def memo_inputs(self, ctx: "ExecutionContext") -> Hashable:
+        """Key of the node's current inputs in the memo cache."""
+        return input_key(tuple(path.get(ctx) for path in self.reads))
@@ -0,0 +1,18 @@
+import pytest
+
+from workflows.tracing import Tracer
+
+
+class StartOrder(Tracer):
+    """Records the names of nodes in the order they start."""
+
+    def __init__(self):
+        self.names: list[str] = []
+
+    def on_node_start(self, ctx, node, level, timestamp):
+        self.names.append(node.name)
+
+
+@pytest.fixture
+def start_order() -> StartOrder:
+    return StartOrder()
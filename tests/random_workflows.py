@@ -0,0 +1,192 @@
+"""
+Random workflow definitions for differential tests.
+
+Definitions chain segments (set, if, map, reduce and for loop) over a
+handful of state keys, so runs of the same state can be compared across
+execution strategies. Prefixed definitions start with literal settings the
+optimizer can fold and prune on; nested ones nest loops and branches that
+end the run.
+"""
+
+import random
+
+KEYS = [f"k{i}" for i in range(6)]
+PREFIX_KEYS = [f"p{i}" for i in range(4)]
+
+
+class Definition:
+    def __init__(self):
+        self.nodes: list[dict] = []
+        self.connections: dict[str, list[dict]] = {}
+
+    def add(self, name: str, type: str, **parameters) -> str:
+        self.nodes.append({"name": name, "type": type, "parameters": parameters})
+        return name
+
+    def connect(self, source: str, target: str, label: str = "main") -> None:
+        self.connections.setdefault(source, []).append({"to": target, "label": label})
+
+    def build(self, name: str) -> dict:
+        return {"name": name, "nodes": self.nodes, "connections": self.connections}
+
+
+def value(rng: random.Random):
+    """A state path or a literal for set nodes."""
+    return rng.choice(KEYS) if rng.random() < 0.6 else rng.randrange(10)
+
+
+def segment(definition: Definition, rng: random.Random, i: int) -> tuple[str, list[tuple[str, str]]]:
+    """Add one segment; returns its entry node and its (node, label) exits."""
+    kind = rng.choice(("set", "set", "if", "map", "reduce", "loop"))
+    if kind == "set":
+        node = definition.add(f"set_{i}", "set", variable_name=rng.choice(KEYS), value=value(rng))
+        return node, [(node, "main")]
+
+    if kind == "if":
+        condition = {rng.choice((">", "<", "==")): [{"var": rng.choice(KEYS)}, rng.randrange(6)]}
+        check = definition.add(f"if_{i}", "if", condition=condition)
+        yes = definition.add(f"yes_{i}", "set", variable_name=rng.choice(KEYS), value=value(rng))
+        no = definition.add(f"no_{i}", "set", variable_name=rng.choice(KEYS), value=value(rng))
+        definition.connect(check, yes, "true")
+        definition.connect(check, no, "false")
+        return check, [(yes, "main"), (no, "main")]
+
+    if kind == "map":
+        node = definition.add(
+            f"map_{i}", "map", collection="xs", output="ys",
+            expression={"+": [{"var": ""}, rng.randrange(5)]},
+        )
+        return node, [(node, "main")]
+
+    if kind == "reduce":
+        node = definition.add(
+            f"reduce_{i}", "reduce", collection=rng.choice(("xs", "ys")),
+            operation=rng.choice(("sum", "count", "max")), output=rng.choice(KEYS),
+        )
+        return node, [(node, "main")]
+
+    loop = definition.add(f"loop_{i}", "for", collection="xs")
+    check = definition.add(
+        f"body_{i}", "if", condition={">": [{"var": "loop_%d.item" % i}, {"var": rng.choice(KEYS)}]}
+    )
+    take = definition.add(f"take_{i}", "set", variable_name=rng.choice(KEYS), value=f"loop_{i}.item")
+    skip = definition.add(f"skip_{i}", "set", variable_name=rng.choice(KEYS), value=value(rng))
+    end = definition.add(f"end_{i}", "end_loop")
+    definition.connect(loop, check, "body")
+    definition.connect(check, take, "true")
+    definition.connect(check, skip, "false")
+    definition.connect(take, end)
+    definition.connect(skip, end)
+    definition.connect(end, loop)
+    return loop, [(loop, "exit")]
+
+
+def random_definition(rng: random.Random, segments: int) -> dict:
+    definition = Definition()
+    exits: list[tuple[str, str]] = []
+    for i in range(segments):
+        entry, next_exits = segment(definition, rng, i)
+        for node, label in exits:
+            definition.connect(node, entry, label)
+        exits = next_exits
+    return definition.build("random")
+
+
+def random_state(rng: random.Random) -> dict:
+    state = {key: rng.randrange(6) for key in KEYS}
+    state["xs"] = [rng.randrange(6) for _ in range(rng.randrange(5))]
+    return state
+
+
+def random_change(rng: random.Random) -> dict:
+    changes = {}
+    for key in rng.sample([*KEYS, "xs"], rng.choice((1, 1, 2))):
+        changes[key] = [rng.randrange(6) for _ in range(rng.randrange(5))] if key == "xs" else rng.randrange(6)
+    return changes
+
+
+def _prefix_condition(rng: random.Random) -> dict:
+    key = rng.choice(PREFIX_KEYS)
+    if rng.random() < 0.2:
+        return {"==": [{"var": "settings.%s" % key}, rng.randrange(3)]}
+    return {rng.choice((">", "==", "<")): [{"var": key}, rng.randrange(3)]}
+
+
+def random_prefixed_definition(rng: random.Random, segments: int) -> dict:
+    """Segments after a literal prefix, with conditions on the prefix keys."""
+    definition = Definition()
+    exits: list[tuple[str, str]] = []
+
+    def chain(entry: str, next_exits: list[tuple[str, str]]) -> None:
+        nonlocal exits
+        for node, label in exits:
+            definition.connect(node, entry, label)
+        exits = next_exits
+
+    for i in range(rng.randrange(5)):
+        variable = rng.choice([*PREFIX_KEYS, "settings", "settings.p0", "k0"])
+        literal = {"p0": i} if variable == "settings" else rng.randrange(3)
+        node = definition.add(f"const_{i}", "set", variable_name=variable, value=literal)
+        chain(node, [(node, "main")])
+
+    for i in range(segments):
+        if rng.random() < 0.3:
+            check = definition.add(f"flag_{i}", "if", condition=_prefix_condition(rng))
+            yes = definition.add(f"on_{i}", "set", variable_name=rng.choice(("k1", "p1")), value=i)
+            definition.connect(check, yes, "true")
+            branches = [(yes, "main")]
+            if rng.random() < 0.8:
+                no = definition.add(f"off_{i}", "set", variable_name="k2", value=rng.choice(("k0", "k3")))
+                definition.connect(check, no, "false")
+                branches.append((no, "main"))
+            chain(check, branches)
+        else:
+            chain(*segment(definition, rng, i))
+    return definition.build("random")
+
+
+def _block(
+    definition: Definition, rng: random.Random, depth: int, prefix: str
+) -> tuple[str, list[tuple[str, str]]]:
+    """Sets, ifs (some branches end the run) and nested loops; returns entry and exits."""
+    kind = rng.choice(("set", "if", "loop") if depth else ("set", "if"))
+    key = rng.choice(KEYS)
+    if kind == "set":
+        node = definition.add(f"{prefix}set", "set", variable_name=key, value=value(rng))
+        return node, [(node, "main")]
+
+    if kind == "if":
+        check = definition.add(
+            f"{prefix}if", "if", condition={rng.choice((">", "<", "==")): [{"var": key}, rng.randrange(6)]}
+        )
+        exits = []
+        for label in ("true", "false"):
+            choice = rng.random()
+            if choice < 0.15:
+                continue  # Routes nowhere: the run ends
+            entry, branch_exits = _block(definition, rng, depth, f"{prefix}{label[0]}")
+            definition.connect(check, entry, label)
+            if choice > 0.3:
+                exits.extend(branch_exits)
+        return check, exits
+
+    loop = definition.add(f"{prefix}loop", "for", collection="xs", index_var=key)
+    end = definition.add(f"{prefix}end", "end_loop")
+    entry, exits = _block(definition, rng, depth - 1, f"{prefix}b")
+    definition.connect(loop, entry, "body")
+    for node, label in exits:
+        definition.connect(node, end, label)
+    definition.connect(end, loop)
+    return loop, [(loop, "exit")]
+
+
+def random_nested_definition(rng: random.Random) -> dict:
+    """Nested loops and branches, some of which end the run."""
+    definition = Definition()
+    exits = [(definition.add("start", "set", variable_name="started", value=True), "main")]
+    for i in range(rng.randrange(1, 4)):
+        entry, next_exits = _block(definition, rng, 2, f"s{i}_")
+        for node, label in exits:
+            definition.connect(node, entry, label)
+        exits = next_exits
+    return definition.build("nested")
@@ -0,0 +1,62 @@
+import asyncio
+import copy
+import random
+
+import pytest
+
+from tests.random_workflows import random_definition, random_prefixed_definition, random_state
+from workflows.artifact import load_artifact, save_artifact
+from workflows.builder import WorkflowBuilder
+from workflows.exception import ArtifactException
+
+
+async def _same_runs(built, loaded, states: list[dict]) -> None:
+    for state in states:
+        try:
+            expected = await built.execute_async(state=copy.deepcopy(state))
+        except Exception as error:
+            with pytest.raises(type(error)):
+                await loaded.execute_async(state=copy.deepcopy(state))
+            continue
+        result = await loaded.execute_async(state=copy.deepcopy(state))
+        assert result.state == expected.state
+        assert result.node_context == expected.node_context
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_loaded_artifact_runs_like_its_build(seed, tmp_path):
+    rng = random.Random(seed)
+    if seed % 2:
+        definition = random_definition(rng, rng.randrange(3, 12))
+    else:
+        definition = random_prefixed_definition(rng, rng.randrange(2, 10))
+    built = WorkflowBuilder(definition, cache=None, optimize=seed % 3 == 0).build()
+    path = tmp_path / "random.wfa"
+    save_artifact(built, path, source=str(seed))
+
+    loaded = load_artifact(path, source=str(seed))
+
+    assert loaded.name == built.name
+    assert loaded.definition_hash == built.definition_hash
+    assert repr(loaded.optimization) == repr(built.optimization)
+    assert repr(loaded.initial_patch) == repr(built.initial_patch)
+    asyncio.run(_same_runs(built, loaded, [random_state(rng) for _ in range(3)]))
+
+
+def test_artifact_of_another_source_is_stale(tmp_path):
+    built = WorkflowBuilder(random_definition(random.Random(0), 5), cache=None).build()
+    path = tmp_path / "random.wfa"
+    save_artifact(built, path, source="one")
+
+    assert load_artifact(path, source="other") is None
+
+
+def test_truncated_artifact_raises(tmp_path):
+    built = WorkflowBuilder(random_definition(random.Random(0), 5), cache=None).build()
+    path = tmp_path / "random.wfa"
+    save_artifact(built, path)
+    with open(path, "r+b") as file:
+        file.truncate(path.stat().st_size // 2)
+
+    with pytest.raises(ArtifactException):
+        load_artifact(path)
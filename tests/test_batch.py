@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from nodes.base import BaseNode
+from workflows.base import Workflow
+
+
+class Stop(BaseException):
+    """Raised by a run outside `Exception`, like KeyboardInterrupt."""
+
+
+class RaiseNode(BaseNode):
+    """Raises `error` for states whose `fail` key is set."""
+
+    type: str = "raise"
+
+    def __init__(self, name: str, error: BaseException):
+        super().__init__(name, "", {}, [])
+        self.error = error
+
+    async def execute_async(self, ctx) -> None:
+        await asyncio.sleep(0)
+        if ctx.state.get("fail"):
+            raise self.error
+        ctx.state["done"] = True
+
+    def to_dict(self) -> dict:
+        return super().to_dict()
+
+
+async def collect(workflow: Workflow, states, concurrency: int) -> list:
+    # A hung batch fails the test instead of blocking it
+    async with asyncio.timeout(5):
+        return [result async for result in workflow.execute_many(states, concurrency)]
+
+
+def test_failing_run_yields_its_error():
+    workflow = Workflow([RaiseNode("run", ValueError("bad"))], [])
+    states = [{}, {"fail": True}, {}]
+
+    results = asyncio.run(collect(workflow, states, concurrency=2))
+
+    errors = {result.index: result.error for result in results}
+    assert sorted(errors) == [0, 1, 2]
+    assert isinstance(errors[1], ValueError)
+    assert errors[0] is None and errors[2] is None
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_base_exception_in_a_run_reaches_the_caller(concurrency):
+    workflow = Workflow([RaiseNode("run", Stop())], [])
+    states = [{}, {"fail": True}, *({} for _ in range(50))]
+
+    with pytest.raises(Stop):
+        asyncio.run(collect(workflow, states, concurrency))
+
+
+def test_error_reading_states_is_raised_after_runs_drain():
+    workflow = Workflow([RaiseNode("run", ValueError("bad"))], [])
+    seen = []
+
+    def states():
+        yield {}
+        yield {}
+        raise OSError("input closed")
+
+    async def run():
+        with pytest.raises(OSError):
+            async with asyncio.timeout(5):
+                async for result in workflow.execute_many(states(), concurrency=2):
+                    seen.append(result.index)
+
+    asyncio.run(run())
+    assert sorted(seen) == [0, 1]
+
+
+class SlowFirstNode(BaseNode):
+    """Sleeps in the run whose `slow` key is set; counts the runs started."""
+
+    type: str = "slow_first"
+
+    def __init__(self, name: str):
+        super().__init__(name, "", {}, [])
+        self.started = 0
+
+    async def execute_async(self, ctx) -> None:
+        self.started += 1
+        await asyncio.sleep(0.05 if ctx.state.get("slow") else 0)
+
+    def to_dict(self) -> dict:
+        return super().to_dict()
+
+
+def test_ordered_results_follow_input_within_window():
+    node = SlowFirstNode("run")
+    workflow = Workflow([node], [])
+    states = [{"slow": True}, *({} for _ in range(20))]
+    started_before_first = []
+
+    async def run():
+        async with asyncio.timeout(5):
+            indices = []
+            async for result in workflow.execute_many(states, concurrency=2, ordered=True):
+                if not indices:
+                    started_before_first.append(node.started)
+                indices.append(result.index)
+            return indices
+
+    assert asyncio.run(run()) == list(range(21))
+    # Runs stop starting 2 * concurrency states past the slow one
+    assert started_before_first == [4]
+
+
+def test_ordered_results_past_unreadable_state_are_yielded():
+    workflow = Workflow([RaiseNode("run", ValueError("bad"))], [])
+    seen = []
+
+    def states():
+        yield {}
+        yield {}
+        raise OSError("input closed")
+
+    async def run():
+        with pytest.raises(OSError):
+            async with asyncio.timeout(5):
+                async for result in workflow.execute_many(states(), concurrency=2, ordered=True):
+                    seen.append(result.index)
+
+    asyncio.run(run())
+    assert seen == [0, 1]
+
+
+def test_serve_rejects_build_options(tmp_path, monkeypatch, capsys):
+    import main
+
+    path = tmp_path / "workflow.json"
+    path.write_text('{"name": "w", "nodes": [], "connections": {}}')
+    monkeypatch.setattr("sys.argv", ["main.py", str(path), "--serve", "8080", "--optimize"])
+
+    with pytest.raises(SystemExit) as exit:
+        main.main()
+
+    assert exit.value.code == 2
+    assert "cannot be combined with --serve" in capsys.readouterr().err
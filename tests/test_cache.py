@@ -0,0 +1,63 @@
+import copy
+
+from workflows.builder import WorkflowBuilder
+from workflows.cache import WorkflowCache, default_cache, definition_hash
+
+
+def chain_definition(size: int) -> dict:
+    """A linear chain of `size` set nodes."""
+    nodes = [
+        {"name": f"node_{i}", "type": "set", "parameters": {"variable_name": f"v{i}", "value": i}}
+        for i in range(size)
+    ]
+    connections = {
+        f"node_{i}": [{"to": f"node_{i + 1}", "label": "main"}] for i in range(size - 1)
+    }
+    return {"name": f"chain-{size}", "nodes": nodes, "connections": connections}
+
+
+def test_default_cache_shares_equal_definitions():
+    definition = chain_definition(3)
+    shared = WorkflowBuilder(definition).build()
+
+    assert WorkflowBuilder(copy.deepcopy(definition)).build() is shared
+    assert shared.definition_hash == definition_hash(definition)
+    assert shared.definition_hash in default_cache
+
+
+def test_private_cache_and_no_cache_do_not_share():
+    definition = chain_definition(3)
+    shared = WorkflowBuilder(definition).build()
+    private = WorkflowCache()
+
+    own = WorkflowBuilder(definition, cache=private).build()
+
+    assert own is not shared
+    assert WorkflowBuilder(definition, cache=private).build() is own
+    assert WorkflowBuilder(definition, cache=None).build() is not shared
+
+
+def test_key_replaces_hashing():
+    definition = chain_definition(3)
+    cache = WorkflowCache()
+    hashed = WorkflowBuilder(definition, cache=cache).build()
+
+    keyed = WorkflowBuilder(definition, cache=cache, key="chain-3@1").build()
+
+    assert keyed is not hashed
+    assert keyed.definition_hash is None
+    assert WorkflowBuilder({}, cache=cache, key="chain-3@1").build() is keyed
+
+
+def test_definition_edited_in_place_is_built_again():
+    definition = chain_definition(3)
+    cache = WorkflowCache()
+    before = WorkflowBuilder(definition, cache=cache).build()
+
+    definition["nodes"][0]["parameters"]["value"] = 42
+    after = WorkflowBuilder(definition, cache=cache).build()
+
+    assert after is not before
+    assert after.definition_hash == definition_hash(definition)
+    assert after.nodes[0].value == 42
+    assert cache.stats()["misses"] == 2
@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from nodes.assignment import SetNode
+from nodes.base import BaseNode
+from nodes.connection import NodeConnection
+from workflows.base import Workflow
+from workflows.checkpoint import load_checkpoint
+from workflows.tracing import Tracer
+
+
+class Interrupt(Exception):
+    pass
+
+
+class InterruptAt(Tracer):
+    """Fail the run when `node_name` starts."""
+
+    def __init__(self, node_name: str):
+        self.node_name = node_name
+
+    def on_node_start(self, ctx, node, level, timestamp):
+        if node.name == self.node_name:
+            raise Interrupt(node.name)
+
+
+class SlowNode(BaseNode):
+    """Sleeps, then sets `variable_name`; counts its runs."""
+
+    type: str = "slow"
+
+    def __init__(self, name: str, variable_name: str, delay: float):
+        super().__init__(name, "", {}, [])
+        self.variable_name = variable_name
+        self.delay = delay
+        self.runs = 0
+
+    async def execute_async(self, ctx) -> None:
+        self.runs += 1
+        await asyncio.sleep(self.delay)
+        ctx.set(self.variable_name, self.runs)
+
+    def to_dict(self) -> dict:
+        return super().to_dict()
+
+
+def branching_workflow() -> tuple[Workflow, SlowNode]:
+    """`start` forks into a slow branch and a fast chain, joined by `join`."""
+    start = SetNode("start", "", "started", True)
+    slow = SlowNode("slow", "slow", 0.05)
+    fast = SetNode("fast", "", "fast", 1)
+    after = SetNode("after", "", "after", "fast")
+    join = SetNode("join", "", "joined", True)
+
+    start.link([NodeConnection(slow), NodeConnection(fast)])
+    fast.link([NodeConnection(after)])
+    after.link([NodeConnection(join)])
+    slow.link([NodeConnection(join)])
+
+    nodes = [start, slow, fast, after, join]
+    return Workflow(nodes, [conn for node in nodes for conn in node.connections]), slow
+
+
+def test_checkpoint_records_nodes_in_flight(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    workflow, slow = branching_workflow()
+
+    with pytest.raises(Interrupt):
+        asyncio.run(
+            workflow.execute_async(
+                checkpoint=path, checkpoint_interval=0, tracer=InterruptAt("after")
+            )
+        )
+
+    # `fast` settled while `slow` was still sleeping
+    saved = load_checkpoint(path)
+    assert saved.running == ["slow"]
+    assert saved.ready == ["after"]
+    assert saved.state == {"started": True, "fast": 1}
+    assert not saved.completed
+
+
+def test_resume_runs_nodes_in_flight_again(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    expected = asyncio.run(branching_workflow()[0].execute_async()).state
+    workflow, slow = branching_workflow()
+
+    with pytest.raises(Interrupt):
+        asyncio.run(
+            workflow.execute_async(
+                checkpoint=path, checkpoint_interval=0, tracer=InterruptAt("after")
+            )
+        )
+    resumed = asyncio.run(workflow.resume(path))
+
+    assert slow.runs == 2
+    assert resumed.state == {**expected, "slow": 2}
+    assert load_checkpoint(path).completed
+
+
+def test_not_due_checkpoints_are_skipped(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    workflow, _ = branching_workflow()
+
+    asyncio.run(workflow.execute_async(checkpoint=path, checkpoint_interval=60))
+
+    with open(path) as f:
+        # The start record, the final snapshot and the end record
+        assert len(f.readlines()) == 3
@@ -0,0 +1,97 @@
+import asyncio
+import copy
+import random
+
+import pytest
+
+from tests.random_workflows import (
+    random_definition,
+    random_nested_definition,
+    random_prefixed_definition,
+    random_state,
+)
+from workflows.builder import WorkflowBuilder
+
+
+def node(name: str, type: str, **parameters) -> dict:
+    return {"name": name, "type": type, "parameters": parameters}
+
+
+LOOP_DEFINITION = {
+    "name": "codegen-loop",
+    "nodes": [
+        node("init", "set", variable_name="total", value=0),
+        node("loop", "for", collection="items", iterator_var="current"),
+        node("big", "if", condition={">": [{"var": "loop.item"}, 50]}),
+        node("mark_big", "set", variable_name="last_big", value="loop.item"),
+        node("seen", "set", variable_name="last", value="current"),
+        node("end", "end_loop"),
+        node("done", "set", variable_name="status", value=True),
+    ],
+    "connections": {
+        "init": [{"to": "loop", "label": "main"}],
+        "loop": [{"to": "big", "label": "body"}, {"to": "done", "label": "exit"}],
+        "big": [{"to": "mark_big", "label": "true"}, {"to": "seen", "label": "false"}],
+        "mark_big": [{"to": "seen", "label": "main"}],
+        "seen": [{"to": "end", "label": "main"}],
+        "end": [{"to": "loop", "label": "main"}],
+    },
+}
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_compiled_run_matches_interpreter(seed):
+    rng = random.Random(seed)
+    if seed % 3 == 1:
+        definition = random_definition(rng, rng.randrange(3, 12))
+    elif seed % 3 == 2:
+        definition = random_nested_definition(rng)
+    else:
+        definition = random_prefixed_definition(rng, rng.randrange(2, 10))
+    workflow = WorkflowBuilder(definition, cache=None, optimize=seed % 4 == 0).build()
+    program = workflow.compile()
+
+    async def check():
+        for _ in range(3):
+            state = random_state(rng)
+            try:
+                expected = await workflow.execute_async(state=copy.deepcopy(state))
+            except Exception as error:
+                # e.g. a comparison with a string: the compiled run fails the same way
+                with pytest.raises(type(error)):
+                    await program.execute_async(state=copy.deepcopy(state))
+                continue
+            result = await program.execute_async(state=copy.deepcopy(state), config={"seed": seed})
+            assert result.state == expected.state, program.source
+            assert result.node_context == expected.node_context, program.source
+
+    asyncio.run(check())
+
+
+def test_fan_out_falls_back_to_interpreter():
+    fan_out = {
+        "name": "fan-out",
+        "nodes": [
+            node("a", "set", variable_name="x", value=1),
+            node("b", "set", variable_name="y", value=2),
+            node("c", "set", variable_name="z", value=3),
+        ],
+        "connections": {"a": [{"to": "b", "label": "main"}, {"to": "c", "label": "main"}]},
+    }
+    program = WorkflowBuilder(fan_out, cache=None).build().compile()
+
+    assert not program.compiled
+    assert "fans out" in program.fallback_reason
+    assert asyncio.run(program.execute_async()).state == {"x": 1, "y": 2, "z": 3}
+
+
+def test_sources_are_cached_on_disk(tmp_path):
+    first = WorkflowBuilder(LOOP_DEFINITION, cache=None).build().compile(tmp_path)
+    second = WorkflowBuilder(LOOP_DEFINITION, cache=None).build().compile(tmp_path)
+
+    assert first.compiled and not first.from_cache
+    assert second.from_cache
+    assert second.source == first.source
+    result = asyncio.run(second.execute_async(state={"items": [5, 70, 8]}))
+    assert result.state["last_big"] == 70
+    assert result.state["last"] == 8
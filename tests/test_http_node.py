@@ -0,0 +1,227 @@
+import asyncio
+import json
+
+import pytest
+
+from utils.http_client import ConnectionPool, HTTPClientError
+from workflows.builder import WorkflowBuilder
+
+
+class StandIn:
+    """Minimal keep-alive HTTP/1.1 server answering the requests under test."""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+        # Paths whose next request is read, then answered by closing the connection
+        self.drop_once: set[str] = set()
+        self.port = 0
+        self._server: asyncio.Server | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        self._server.close()
+        for writer in self._writers:
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while request_line := await reader.readline():
+                method, path, _ = request_line.decode().split(" ", 2)
+                length = 0
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                body = await reader.readexactly(length) if length else b""
+                self.requests += 1
+                if not await self._respond(writer, method, path, body):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer, method: str, path: str, body: bytes) -> bool:
+        """Write the response; False when the connection is closed after it."""
+        if path in self.drop_once:
+            self.drop_once.discard(path)
+            return False
+        if path == "/slow":
+            await asyncio.sleep(1)
+        else:
+            await asyncio.sleep(0.001)
+
+        if path == "/chunked":
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n"
+                b"Content-Type: text/plain\r\n\r\n5\r\nhello\r\n6\r\n world\r\n0\r\n\r\n"
+            )
+            return True
+        if path == "/close":
+            writer.write(b"HTTP/1.1 200 OK\r\nConnection: close\r\n\r\nbye")
+            await writer.drain()
+            return False
+        if path.startswith("/raw/"):
+            # A canned malformed response, named by the rest of the path
+            writer.write(MALFORMED[path.removeprefix("/raw/")])
+            return True
+
+        if path.startswith("/items/"):
+            status, payload = 200, {"id": path.rsplit("/", 1)[1]}
+        elif path == "/echo":
+            status, payload = 201, {"method": method, "received": json.loads(body or b"null")}
+        else:
+            status, payload = 404, {"error": "not found"}
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        return True
+
+
+MALFORMED = {
+    "length": b"HTTP/1.1 200 OK\r\nContent-Length: ten\r\n\r\n",
+    "negative-length": b"HTTP/1.1 200 OK\r\nContent-Length: -1\r\n\r\n",
+    "chunk": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\nzz\r\nhello\r\n0\r\n\r\n",
+    "empty-chunk": b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n\r\n",
+}
+
+
+def node(name: str, type: str, **parameters) -> dict:
+    return {"name": name, "type": type, "parameters": parameters}
+
+
+def serve(scenario) -> None:
+    """Run `scenario(server)` against a stand-in server on an ephemeral port."""
+
+    async def run() -> None:
+        server = StandIn()
+        await server.start()
+        try:
+            await scenario(server)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_responses():
+    definition = {
+        "name": "responses",
+        "nodes": [
+            node("get", "http", url="{config.base}/items/{state.name}"),
+            node("post", "http", url="{config.base}/echo", method="POST", body="payload"),
+            node("chunked", "http", url="{config.base}/chunked", output="text"),
+            node("close", "http", url="{config.base}/close"),
+            node("missing", "http", url="{config.base}/missing"),
+        ],
+        "connections": {
+            "get": [{"to": "post", "label": "main"}],
+            "post": [{"to": "chunked", "label": "main"}],
+            "chunked": [{"to": "close", "label": "main"}],
+            "close": [{"to": "missing", "label": "main"}],
+        },
+    }
+
+    async def scenario(server):
+        workflow = WorkflowBuilder(definition, cache=None).build()
+        ctx = await workflow.execute_async(
+            state={"name": "a b", "payload": {"x": [1, 2]}}, config={"base": server.base}
+        )
+        results = ctx.node_context
+
+        assert results["get"]["body"] == {"id": "a%20b"}
+        assert results["post"]["status"] == 201
+        assert results["post"]["body"] == {"method": "POST", "received": {"x": [1, 2]}}
+        assert ctx.state["text"] == "hello world"
+        assert results["close"]["body"] == "bye"
+        assert results["missing"]["status"] == 404
+        assert not results["missing"]["ok"]
+
+    serve(scenario)
+
+
+def test_timeout():
+    definition = {"name": "timeout", "nodes": [], "connections": {}}
+
+    async def scenario(server):
+        definition["nodes"] = [node("slow", "http", url=f"{server.base}/slow", timeout=0.05)]
+        workflow = WorkflowBuilder(definition, cache=None).build()
+        with pytest.raises(TimeoutError):
+            await workflow.execute_async()
+
+    serve(scenario)
+
+
+def test_parallel_fan_out_reuses_capped_connections():
+    items, per_host = 50, 4
+    definition = {
+        "name": "fan-out",
+        "nodes": [
+            node("items", "set", variable_name="items", value=list(range(items))),
+            node("loop", "for", collection="items", parallel=True, result="fetch.body.id"),
+            node("fetch", "http", url="{config.base}/items/{loop.item}", timeout=10),
+            node("end", "end_loop"),
+        ],
+        "connections": {
+            "items": [{"to": "loop", "label": "main"}],
+            "loop": [{"to": "fetch", "label": "body"}],
+            "fetch": [{"to": "end", "label": "main"}],
+            "end": [{"to": "loop", "label": "main"}],
+        },
+    }
+
+    async def scenario(server):
+        workflow = WorkflowBuilder(definition, cache=None).build()
+        workflow.index.nodes[workflow.index.names["fetch"]].pool = ConnectionPool(per_host)
+        ctx = await workflow.execute_async(config={"base": server.base})
+
+        assert ctx.node_context["loop"]["results"] == [str(i) for i in range(items)]
+        assert server.requests == items
+        assert server.connections <= per_host
+
+    serve(scenario)
+
+
+@pytest.mark.parametrize("method, retried", [("GET", True), ("DELETE", True), ("POST", False)])
+def test_closed_reused_connection_retries_idempotent_methods(method, retried):
+    async def scenario(server):
+        pool = ConnectionPool()
+        await pool.request("GET", f"{server.base}/items/1")
+        # The server reads the next request on the idle connection, then closes it
+        server.drop_once.add("/echo")
+
+        if retried:
+            response = await pool.request(method, f"{server.base}/echo", timeout=5)
+            assert response.json()["method"] == method
+            assert server.requests == 3
+        else:
+            with pytest.raises(ConnectionError):
+                await pool.request(method, f"{server.base}/echo", body=b"1", timeout=5)
+            # Never sent twice: the server may have acted on it
+            assert server.requests == 2
+
+    serve(scenario)
+
+
+@pytest.mark.parametrize("name", sorted(MALFORMED))
+def test_malformed_framing_raises_client_error(name):
+    async def scenario(server):
+        with pytest.raises(HTTPClientError, match="Malformed"):
+            await ConnectionPool().request("GET", f"{server.base}/raw/{name}", timeout=5)
+
+    serve(scenario)
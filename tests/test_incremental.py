@@ -0,0 +1,66 @@
+import asyncio
+import copy
+import random
+
+import pytest
+
+from tests.random_workflows import random_change, random_definition, random_state
+from workflows.builder import WorkflowBuilder
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_reexecution_matches_full_run(seed):
+    """Re-executions with one or two keys changed end like full runs of the same state."""
+    rng = random.Random(seed)
+    workflow = WorkflowBuilder(random_definition(rng, rng.randrange(3, 12)), cache=None).build()
+    state = random_state(rng)
+
+    async def check():
+        nonlocal state
+        run = await workflow.record(state, {"seed": seed})
+        full = await workflow.execute_async(state=copy.deepcopy(state))
+        assert run.ctx.state == full.state
+
+        for _ in range(4):
+            changes = random_change(rng)
+            state = {**state, **changes}
+            run = await workflow.reexecute(run, changes)
+            full = await workflow.execute_async(state=copy.deepcopy(state))
+            assert run.initial_state == state
+            assert run.ctx.state == full.state
+            assert run.ctx.node_context == full.node_context
+
+    asyncio.run(check())
+
+
+def test_unchanged_branches_are_reused():
+    definition = {
+        "name": "branches",
+        "nodes": [{"name": "root", "type": "set", "parameters": {"variable_name": "started", "value": True}}],
+        "connections": {"root": []},
+    }
+    for i in range(3):
+        definition["nodes"] += [
+            {"name": f"check_{i}", "type": "if", "parameters": {"condition": {">=": [{"var": f"b{i}"}, 2]}}},
+            {"name": f"yes_{i}", "type": "set", "parameters": {"variable_name": f"r{i}", "value": f"b{i}"}},
+            {"name": f"no_{i}", "type": "set", "parameters": {"variable_name": f"r{i}", "value": -1}},
+        ]
+        definition["connections"]["root"].append({"to": f"check_{i}", "label": "main"})
+        definition["connections"][f"check_{i}"] = [
+            {"to": f"yes_{i}", "label": "true"},
+            {"to": f"no_{i}", "label": "false"},
+        ]
+    workflow = WorkflowBuilder(definition, cache=None).build()
+    state = {"b0": 1, "b1": 2, "b2": 3}
+
+    async def check():
+        run = await workflow.record(state)
+        run = await workflow.reexecute(run, {"b1": 0})
+        full = await workflow.execute_async(state={**state, "b1": 0})
+        return run, full
+
+    run, full = asyncio.run(check())
+
+    assert run.ctx.state == full.state
+    # Only the branch reading b1 runs again
+    assert (run.executed, run.reused) == (2, 5)
@@ -0,0 +1,126 @@
+import warnings
+from collections import ChainMap
+
+import pytest
+from json_logic import jsonLogic
+
+from utils.logic import compile_logic
+
+DATA = {
+    "age": 25,
+    "name": "Alice",
+    "temperature": 22.5,
+    "humidity": 60,
+    "status": "ok",
+    "items": [1, 2, 3, 4, 5],
+    "user": {"profile": {"age": 42, "tags": ["a", "b"]}},
+    "empty": [],
+    "zero": 0,
+    "flag": False,
+}
+
+NODE_CONTEXT = {"loop": {"item": {"price": 12, "qty": 3}, "index": 2}}
+
+# (rule, data) pairs; data=None means the merged DATA/NODE_CONTEXT view
+CASES: list[tuple[object, object]] = [
+    ({">=": [{"var": "age"}, 18]}, None),
+    ({"==": [{"var": "age"}, "25"]}, None),
+    ({"===": [{"var": "age"}, 25.0]}, None),
+    ({"!=": [{"var": "status"}, "error"]}, None),
+    ({"!==": [{"var": "status"}, "ok"]}, None),
+    ({"<": [1, {"var": "age"}, 30]}, None),
+    ({"<=": [25, {"var": "age"}, 25]}, None),
+    ({">": [{"var": "missing"}, 1]}, None),
+    ({"!": [{"var": "flag"}]}, None),
+    ({"!!": [{"var": "items"}]}, None),
+    ({"!": {"var": "zero"}}, None),
+    (
+        {
+            "and": [
+                {">=": [{"var": "temperature"}, 20]},
+                {"<=": [{"var": "temperature"}, 30]},
+                {"or": [{"==": [{"var": "humidity"}, 50]}, {"==": [{"var": "humidity"}, 60]}]},
+                {"!": {"==": [{"var": "status"}, "error"]}},
+            ]
+        },
+        None,
+    ),
+    ({"and": []}, None),
+    ({"or": [0, "", {"var": "name"}]}, None),
+    ({"or": [0, ""]}, None),
+    ({"if": []}, None),
+    ({"if": [{"var": "flag"}, "yes"]}, None),
+    ({"if": [{"var": "flag"}, "a", {"var": "zero"}, "b", "c"]}, None),
+    ({"?:": [{"var": "age"}, "adult", "minor"]}, None),
+    ({"var": "user.profile.age"}, None),
+    ({"var": "user.profile.tags.1"}, None),
+    ({"var": ["user.profile.nope", "fallback"]}, None),
+    ({"var": "items.x"}, None),
+    ({"var": ""}, [1, 2]),
+    ({"var": "loop.item.price"}, None),
+    ({"*": [{"var": "loop.item.price"}, {"var": "loop.item.qty"}]}, None),
+    ({"var": {"cat": ["user.", "profile.", "age"]}}, None),
+    ({"var": 1}, ["a", "b"]),
+    ({"missing": ["age", "nope", "user.profile.age"]}, None),
+    ({"missing_some": [1, ["age", "nope"]]}, None),
+    ({"missing_some": [2, ["age", "nope"]]}, None),
+    ({"in": ["li", {"var": "name"}]}, None),
+    ({"in": [3, {"var": "items"}]}, None),
+    ({"cat": ["Hello, ", {"var": "name"}, "!"]}, None),
+    ({"substr": [{"var": "name"}, 1, 2]}, None),
+    ({"+": [1, "2", 3.5]}, None),
+    ({"-": [{"var": "age"}]}, None),
+    ({"-": [10, 4]}, None),
+    ({"*": [2, 3, 4]}, None),
+    ({"/": [10, 4]}, None),
+    ({"%": [10, 4]}, None),
+    ({"min": [3, 1, 2]}, None),
+    ({"max": []}, None),
+    ({"merge": [[1, 2], 3, [4]]}, None),
+    ({"map": [{"var": "items"}, {"*": [{"var": ""}, 2]}]}, None),
+    ({"map": [{"var": "nope"}, {"var": ""}]}, None),
+    ({"map": [[0, 1], {"var": ""}]}, None),
+    ({"filter": [{"var": "items"}, {"%": [{"var": ""}, 2]}]}, None),
+    (
+        {"reduce": [{"var": "items"}, {"+": [{"var": "accumulator"}, {"var": "current"}]}, 0]},
+        None,
+    ),
+    ({"reduce": [{"var": "nope"}, {"var": "current"}, 7]}, None),
+    ({"all": [{"var": "items"}, {">=": [{"var": ""}, 1]}]}, None),
+    ({"all": [{"var": "empty"}, {">=": [{"var": ""}, 1]}]}, None),
+    ({"none": [{"var": "items"}, {"==": [{"var": ""}, 10]}]}, None),
+    ({"some": [{"var": "items"}, {"==": [{"var": ""}, 3]}]}, None),
+    ({"method": [{"var": "name"}, "upper"]}, None),
+    ([{"var": "age"}, {"var": "name"}, 3], None),
+    ({"a": 1, "b": 2}, None),
+    ("literal", None),
+    (42, None),
+    ({"var": "age"}, {}),
+    ({"var": ""}, 0),
+    ({"count": [1, 0, "x"]}, None),
+    ({"unknown_op": [1]}, None),
+    ({"?:": [1, 2]}, None),
+    ({"filter": [[1]]}, None),
+]
+
+
+def _evaluate(evaluate, data):
+    try:
+        return "ok", evaluate(data)
+    except Exception as exc:  # noqa: BLE001 - compare failure modes
+        return "error", type(exc)
+
+
+@pytest.mark.parametrize("rule, data", CASES, ids=[repr(rule) for rule, _ in CASES])
+def test_compiled_rule_matches_json_logic(rule, data):
+    """Same result, or the same exception type, as the `json_logic` interpreter."""
+    view = ChainMap(NODE_CONTEXT, DATA)
+    merged = {**DATA, **NODE_CONTEXT}
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = _evaluate(lambda d: jsonLogic(rule, d), merged if data is None else data)
+        actual = _evaluate(compile_logic(rule), view if data is None else data)
+    if rule == {"var": ""} and data is None:
+        actual = ("ok", dict(actual[1]))
+
+    assert actual == expected
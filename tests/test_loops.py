@@ -0,0 +1,165 @@
+import asyncio
+import copy
+
+import pytest
+
+from nodes.assignment import SetNode
+from nodes.base import BaseNode
+from nodes.connection import ConnectionLabel, NodeConnection
+from nodes.loop import EndLoopNode, ForLoopNode
+from workflows.base import Workflow
+from workflows.builder import WorkflowBuilder
+from workflows.exception import MergeConflictException
+
+
+class YieldNode(BaseNode):
+    """Yields to the event loop, the first item for `delay` seconds, so items overlap."""
+
+    type: str = "yield"
+
+    def __init__(self, name: str, delay: float = 0.0):
+        super().__init__(name, "", {}, [])
+        self.delay = delay
+        self.first_done: list[None] = []
+
+    async def execute_async(self, ctx) -> None:
+        first = ctx.get_node_context("loop")[ForLoopNode.INDEX_KEY] == 0
+        await asyncio.sleep(self.delay if first else 0)
+        if first:
+            self.first_done.append(None)
+
+    def to_dict(self) -> dict:
+        return super().to_dict()
+
+
+def branching_definition(parallel: bool, merge: str = "child_wins") -> dict:
+    """A loop whose body branches on the item and runs an inner loop over `cols`."""
+    return {
+        "name": "branching",
+        "nodes": [
+            {"name": "init", "type": "set", "parameters": {"variable_name": "cols", "value": [1, 2]}},
+            {"name": "loop", "type": "for", "parameters": {
+                "collection": "items", "iterator_var": "item", "parallel": parallel, "merge": merge}},
+            {"name": "big", "type": "if", "parameters": {"condition": {">": [{"var": "loop.item"}, 2]}}},
+            {"name": "set_big", "type": "set", "parameters": {"variable_name": "last_big", "value": "loop.item"}},
+            {"name": "set_small", "type": "set", "parameters": {"variable_name": "stats.last_small", "value": "loop.item"}},
+            {"name": "inner", "type": "for", "parameters": {"collection": "cols"}},
+            {"name": "cell", "type": "set", "parameters": {"variable_name": "last_cell", "value": "inner.item"}},
+            {"name": "inner_end", "type": "end_loop", "parameters": {}},
+            {"name": "end", "type": "end_loop", "parameters": {}},
+            {"name": "done", "type": "set", "parameters": {"variable_name": "done", "value": "item"}},
+        ],
+        "connections": {
+            "init": [{"to": "loop", "label": "main"}],
+            "loop": [{"to": "big", "label": "body"}, {"to": "done", "label": "exit"}],
+            "big": [{"to": "set_big", "label": "true"}, {"to": "set_small", "label": "false"}],
+            "set_big": [{"to": "inner", "label": "main"}],
+            "set_small": [{"to": "inner", "label": "main"}],
+            "inner": [{"to": "cell", "label": "body"}, {"to": "end", "label": "exit"}],
+            "cell": [{"to": "inner_end", "label": "main"}],
+            "inner_end": [{"to": "inner", "label": "main"}],
+            "end": [{"to": "loop", "label": "main"}],
+        },
+    }
+
+
+def yielding_loop(merge: str, max_concurrency: int | None = None, delay: float = 0.0) -> Workflow:
+    """A parallel loop whose items write `last`, then yield before finishing."""
+    init = SetNode("init", "", "started", True)
+    loop = ForLoopNode(
+        "loop", "", "items", parallel=True, max_concurrency=max_concurrency, merge=merge
+    )
+    wait = YieldNode("wait", delay)
+    write = SetNode("write", "", "last", "loop.item")
+    end = EndLoopNode("end", "")
+
+    init.link([NodeConnection(loop)])
+    loop.link([NodeConnection(write, ConnectionLabel.BODY)])
+    write.link([NodeConnection(wait)])
+    wait.link([NodeConnection(end)])
+    end.link([NodeConnection(loop)])
+
+    nodes = [init, loop, write, wait, end]
+    return Workflow(nodes, [conn for node in nodes for conn in node.connections])
+
+
+STATE = {"items": [1, 5, 2, 7, 3], "stats": {"runs": 1}}
+
+
+@pytest.mark.parametrize("merge", ["child_wins", "error"])
+def test_parallel_loop_leaves_sequential_state(merge):
+    runs = {
+        parallel: asyncio.run(
+            WorkflowBuilder(branching_definition(parallel, merge), cache=None)
+            .build()
+            .execute_async(state=copy.deepcopy(STATE))
+        ).state
+        for parallel in (False, True)
+    }
+
+    assert runs[True] == runs[False]
+    assert runs[True]["stats"] == {"runs": 1, "last_small": 2}
+    assert runs[True]["done"] == 3
+
+
+def test_error_policy_reports_items_that_overlapped():
+    workflow = yielding_loop("error")
+
+    with pytest.raises(MergeConflictException) as error:
+        asyncio.run(workflow.execute_async(state={"items": [1, 2, 3]}))
+
+    # The second item wrote the key before the first one merged it
+    assert error.value.conflicts == ["state.last"]
+
+
+@pytest.mark.parametrize("merge, last", [("child_wins", 3), ("parent_wins", 1)])
+def test_overlapping_writes_follow_merge_policy(merge, last):
+    ctx = asyncio.run(yielding_loop(merge).execute_async(state={"items": [1, 2, 3]}))
+
+    assert ctx.state["last"] == last
+    assert ctx.node_context["loop"]["count"] == 3
+
+
+def test_items_merge_in_order_within_window():
+    workflow = yielding_loop("child_wins", max_concurrency=2, delay=0.01)
+    wait = workflow.nodes[3]
+    pulled_while_first_ran = 0
+
+    def items():
+        nonlocal pulled_while_first_ran
+        for item in range(100):
+            if not wait.first_done:
+                pulled_while_first_ran += 1
+            yield item
+
+    # The first item runs long: later items finish but wait to be merged in order
+    ctx = asyncio.run(workflow.execute_async(state={"items": items()}))
+
+    assert ctx.state["last"] == 99
+    assert ctx.node_context["loop"]["count"] == 100
+    # No more than twice max_concurrency items were pulled but not merged
+    assert pulled_while_first_ran == 4
+
+
+def test_parallel_loop_without_results():
+    definition = branching_definition(True)
+    definition["nodes"][1]["parameters"]["collect_results"] = False
+
+    ctx = asyncio.run(
+        WorkflowBuilder(definition, cache=None).build().execute_async(state=copy.deepcopy(STATE))
+    )
+
+    assert ctx.node_context["loop"] == {"count": 5}
+    assert ctx.state["last_big"] == 3
+
+
+def test_body_leaving_loop_is_rejected_at_build():
+    leaking = branching_definition(True)
+    leaking["connections"]["set_big"].append({"to": "done", "label": "main"})
+
+    with pytest.raises(ValueError, match="outside the loop body"):
+        WorkflowBuilder(leaking, cache=None).build()
+
+    # Sequential mode runs it as written
+    leaking["nodes"][1]["parameters"]["parallel"] = False
+    WorkflowBuilder(leaking, cache=None).build()
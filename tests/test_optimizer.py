@@ -0,0 +1,47 @@
+import asyncio
+import copy
+import random
+
+import pytest
+
+from tests.random_workflows import random_prefixed_definition, random_state
+from workflows.builder import WorkflowBuilder
+from workflows.tracing import Tracer
+
+
+class StepCounter(Tracer):
+    """Counts scheduler steps, i.e. node executions seen by the scheduler."""
+
+    def __init__(self):
+        self.steps = 0
+
+    def on_node_start(self, ctx, node, level, timestamp) -> None:
+        self.steps += 1
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_optimized_build_matches_plain_build(seed):
+    """Optimized builds end in the same contexts, in no more scheduler steps."""
+    rng = random.Random(seed)
+    definition = random_prefixed_definition(rng, rng.randrange(2, 10))
+    plain = WorkflowBuilder(definition, cache=None).build()
+    optimized = WorkflowBuilder(definition, cache=None, optimize=True).build()
+
+    async def check():
+        for _ in range(3):
+            state = random_state(rng)
+            if rng.random() < 0.5:
+                state["p0"] = rng.randrange(3)
+            for max_concurrency in (None, 1):
+                counters = StepCounter(), StepCounter()
+                expected = await plain.execute_async(
+                    state=copy.deepcopy(state), max_concurrency=max_concurrency, tracer=counters[0]
+                )
+                result = await optimized.execute_async(
+                    state=copy.deepcopy(state), max_concurrency=max_concurrency, tracer=counters[1]
+                )
+                assert result.state == expected.state
+                assert result.node_context == expected.node_context
+                assert counters[1].steps <= counters[0].steps
+
+    asyncio.run(check())
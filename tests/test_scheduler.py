@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from workflows.builder import WorkflowBuilder
+from workflows.scheduler import ExecutionMode
+
+
+def _set(name: str, variable: str, value) -> dict:
+    return {"name": name, "type": "set", "parameters": {"variable_name": variable, "value": value}}
+
+
+def break_definition() -> dict:
+    """A loop whose condition breaks out to J, joined with K into D."""
+    return {
+        "name": "break-join",
+        "nodes": [
+            _set("start", "started", True),
+            {"name": "loop", "type": "for", "parameters": {"collection": "items"}},
+            {"name": "check", "type": "if", "parameters": {"condition": {">": [{"var": "loop.item"}, 100]}}},
+            {"name": "end", "type": "end_loop", "parameters": {}},
+            _set("J", "after", "yes"),
+            _set("K", "k", 1),
+            _set("D", "d", "state.after"),
+        ],
+        "connections": {
+            "start": [{"to": "loop", "label": "main"}, {"to": "K", "label": "main"}],
+            "loop": [{"to": "check", "label": "body"}, {"to": "J", "label": "exit"}],
+            "check": [{"to": "J", "label": "true"}, {"to": "end", "label": "false"}],
+            "end": [{"to": "loop", "label": "main"}],
+            "J": [{"to": "D", "label": "main"}],
+            "K": [{"to": "D", "label": "main"}],
+        },
+    }
+
+
+@pytest.mark.parametrize("items", [[1, 2, 3, 4, 5], [1, 200, 3]], ids=["exit", "break"])
+def test_break_edge_join_runs_once_after_all_branches(items, start_order):
+    workflow = WorkflowBuilder(break_definition(), cache=None).build()
+    ctx = asyncio.run(
+        workflow.execute_async(state={"items": items}, mode=ExecutionMode.DATAFLOW, tracer=start_order)
+    )
+
+    assert start_order.names.count("D") == 1
+    assert start_order.names.count("J") == 1
+    assert start_order.names.index("J") < start_order.names.index("D")
+    assert ctx.state["d"] == "yes"
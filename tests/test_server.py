@@ -0,0 +1,175 @@
+import asyncio
+import json
+
+import pytest
+
+from workflows.server import WorkflowRegistry, WorkflowServer
+
+DEFINITION = {
+    "name": "profile",
+    "nodes": [
+        {"name": "check_adult", "type": "if", "parameters": {"condition": {">=": [{"var": "age"}, 18]}}},
+        {"name": "adult", "type": "set", "parameters": {"variable_name": "status", "value": "adult"}},
+        {"name": "minor", "type": "set", "parameters": {"variable_name": "status", "value": "minor"}},
+        {"name": "copy_name", "type": "set", "parameters": {"variable_name": "profile.name", "value": "name"}},
+    ],
+    "connections": {
+        "check_adult": [{"to": "adult", "label": "true"}, {"to": "minor", "label": "false"}],
+        "adult": [{"to": "copy_name", "label": "main"}],
+        "minor": [{"to": "copy_name", "label": "main"}],
+    },
+}
+
+SLOW_DEFINITION = {
+    "name": "slow",
+    "nodes": [
+        {"name": "items", "type": "set", "parameters": {"variable_name": "items", "value": list(range(20_000))}},
+        {"name": "loop", "type": "for", "parameters": {"collection": "items", "iterator_var": "item"}},
+        {"name": "end", "type": "end_loop", "parameters": {}},
+    ],
+    "connections": {
+        "items": [{"to": "loop", "label": "main"}],
+        "loop": [{"to": "end", "label": "body"}],
+        "end": [{"to": "loop", "label": "main"}],
+    },
+}
+
+
+class Client:
+    """Minimal keep-alive HTTP/1.1 client with JSON bodies."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self._streams = None
+
+    async def request(self, method: str, path: str, body=None) -> tuple[int, dict]:
+        if self._streams is None:
+            self._streams = await asyncio.open_connection("127.0.0.1", self.port)
+        reader, writer = self._streams
+
+        data = json.dumps(body).encode() if body is not None else b""
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+        )
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        length, keep_alive = 0, True
+        while (line := await reader.readline()) != b"\r\n":
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+            elif name.lower() == "connection":
+                keep_alive = value.strip() == "keep-alive"
+        payload = json.loads(await reader.readexactly(length))
+        if not keep_alive:
+            self.close()
+        return status, payload
+
+    def close(self) -> None:
+        if self._streams is not None:
+            self._streams[1].close()
+            self._streams = None
+
+
+def serve(scenario) -> None:
+    """Run `scenario(server, client)` against a server on an ephemeral port."""
+
+    async def run() -> None:
+        server = WorkflowServer(WorkflowRegistry())
+        listener = await server.start("127.0.0.1", 0)
+        client = Client(listener.sockets[0].getsockname()[1])
+        try:
+            await client.request("PUT", "/workflows/profile", DEFINITION)
+            await scenario(server, client)
+        finally:
+            client.close()
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_register_and_list():
+    async def scenario(server, client):
+        status, payload = await client.request("PUT", "/workflows/other", DEFINITION)
+        assert (status, payload["registered"]) == (200, "other")
+
+        status, payload = await client.request("GET", "/workflows")
+        assert payload == {"workflows": ["profile", "other"]}
+
+        status, _ = await client.request("DELETE", "/workflows/other")
+        assert status == 200
+        status, payload = await client.request("GET", "/workflows")
+        assert payload == {"workflows": ["profile"]}
+
+    serve(scenario)
+
+
+def test_execute():
+    async def scenario(server, client):
+        status, payload = await client.request(
+            "POST", "/workflows/profile/execute", {"state": {"age": 30, "name": "Ada"}}
+        )
+
+        assert status == 200
+        assert payload["state"]["status"] == "adult"
+        assert payload["state"]["profile"] == {"name": "Ada"}
+
+    serve(scenario)
+
+
+@pytest.mark.parametrize(
+    "method, path, body, expected",
+    [
+        ("POST", "/workflows/missing/execute", {}, 404),
+        ("PUT", "/workflows/bad", {"nodes": [{"type": "nope"}]}, 400),
+        ("POST", "/workflows/profile/execute", {"state": []}, 400),
+        ("POST", "/workflows/profile/execute", {"config": "x"}, 400),
+    ],
+    ids=["unknown workflow", "invalid definition", "state not an object", "config not an object"],
+)
+def test_errors(method, path, body, expected):
+    async def scenario(server, client):
+        status, _ = await client.request(method, path, body)
+        assert status == expected
+
+    serve(scenario)
+
+
+def test_body_not_an_object_keeps_connection():
+    async def scenario(server, client):
+        for body in ([], "x", 1):
+            status, payload = await client.request("POST", "/workflows/profile/execute", body)
+            assert status == 400, payload
+
+        # Answered on the same connection
+        status, _ = await client.request("POST", "/workflows/profile/execute", {})
+        assert status == 200
+
+    serve(scenario)
+
+
+def test_admission_control():
+    async def scenario(server, client):
+        await client.request("PUT", "/workflows/slow", SLOW_DEFINITION)
+        server.max_in_flight = 1
+        first, second = Client(client.port), Client(client.port)
+        try:
+            results = await asyncio.gather(
+                first.request("POST", "/workflows/slow/execute", {}),
+                second.request("POST", "/workflows/slow/execute", {}),
+            )
+        finally:
+            first.close()
+            second.close()
+
+        # With one slot, the second concurrent run is rejected
+        assert sorted(status for status, _ in results) == [200, 503]
+        server.max_in_flight = 1000
+        await client.request("POST", "/workflows/profile/execute", {"state": {"age": 3}})
+        status, stats = await client.request("GET", "/stats")
+        assert stats["rejected"] == 1
+        assert stats["workflows"]["profile"]["requests"] == 1
+
+    serve(scenario)
@@ -0,0 +1,87 @@
+import asyncio
+import tracemalloc
+
+import pytest
+
+from nodes.assignment import SetNode
+from nodes.connection import ConnectionLabel, NodeConnection
+from nodes.loop import EndLoopNode, ForLoopNode
+from workflows.base import Workflow
+
+ROW_SIZE = 1024
+
+# Lazy peaks may grow by this factor at most from the smallest to the largest row count
+FLAT_TOLERANCE = 1.5
+
+
+def rows(count: int):
+    for i in range(count):
+        yield str(i).rjust(ROW_SIZE, "x")
+
+
+async def async_rows(count: int):
+    for i in range(count):
+        await asyncio.sleep(0)
+        yield str(i).rjust(ROW_SIZE, "x")
+
+
+def loop_workflow(parallel: bool) -> Workflow:
+    init = SetNode("init", "", "started", True)
+    loop = ForLoopNode(
+        "loop",
+        "",
+        "rows",
+        iterator_var="row",
+        parallel=parallel,
+        max_concurrency=10,
+        collect_results=False,
+    )
+    body = SetNode("body", "", "last", "row")
+    end = EndLoopNode("end", "")
+
+    init.link([NodeConnection(loop)])
+    loop.link([NodeConnection(body, ConnectionLabel.BODY)])
+    body.link([NodeConnection(end)])
+    end.link([NodeConnection(loop)])
+
+    nodes = [init, loop, body, end]
+    return Workflow(nodes, [conn for node in nodes for conn in node.connections])
+
+
+def peak_memory(source, count: int, parallel: bool) -> int:
+    """Peak traced memory (bytes) of one loop run over `count` rows."""
+    workflow = loop_workflow(parallel)
+
+    async def run():
+        tracemalloc.start()
+        try:
+            ctx = await workflow.execute_async(state={"rows": source(count)})
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        # Parallel items are merged in item order, so the last row wins too
+        assert ctx.state["last"] == str(count - 1).rjust(ROW_SIZE, "x")
+        return peak
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "source, parallel",
+    [(rows, False), (async_rows, False), (rows, True)],
+    ids=["generator", "async generator", "generator (parallel)"],
+)
+def test_lazy_loop_memory_is_flat(source, parallel):
+    small, large = (peak_memory(source, count, parallel) for count in (2_000, 10_000))
+
+    assert large <= small * FLAT_TOLERANCE
+
+
+def test_list_is_read_in_place():
+    workflow = loop_workflow(False)
+    collection = list(rows(100))
+
+    ctx = asyncio.run(workflow.execute_async(state={"rows": collection}))
+
+    assert ctx.state["last"] is collection[-1]
+    assert ctx.state["rows"] is collection
@@ -0,0 +1,316 @@
+import asyncio
+import json
+import ssl
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+from urllib.parse import urlsplit
+
+# Default maximum number of connections (and so concurrent requests) per host
+DEFAULT_MAX_PER_HOST = 10
+
+# Idle connections older than this are closed instead of reused
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+# Responses larger than this are rejected
+MAX_RESPONSE_SIZE = 64 * 1024 * 1024
+
+# Methods sent again when a reused connection turns out to be closed; the
+# server may have processed the request before closing, so others are not
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "DELETE", "TRACE"})
+
+_HostKey = tuple[str, str, int]  # scheme, host, port
+
+
+class HTTPClientError(Exception):
+    """Raised when a response cannot be read, e.g. malformed or too large."""
+
+
+@dataclass
+class HTTPResponse:
+    status: int
+    reason: str
+    headers: dict[str, str] = field(default_factory=dict)  # Lower-case names
+    body: bytes = b""
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def text(self) -> str:
+        return self.body.decode(self._charset(), errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+    def decoded(self) -> Any:
+        """The body as JSON when declared so, else as text (or None when empty)."""
+        if not self.body:
+            return None
+        if "json" in self.headers.get("content-type", ""):
+            try:
+                return self.json()
+            except ValueError:
+                pass
+        return self.text()
+
+    def _charset(self) -> str:
+        for part in self.headers.get("content-type", "").split(";")[1:]:
+            name, _, value = part.strip().partition("=")
+            if name.lower() == "charset" and value:
+                return value.strip('"')
+        return "utf-8"
+
+
+class _Connection:
+    __slots__ = ("reader", "writer", "idle_since")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.idle_since = 0.0
+
+    def usable(self, now: float, idle_timeout: float) -> bool:
+        return (
+            not self.writer.is_closing()
+            and not self.reader.at_eof()
+            and now - self.idle_since < idle_timeout
+        )
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class _LoopState:
+    """Connections and host limits of one event loop; streams cannot cross loops."""
+
+    def __init__(self):
+        self.idle: dict[_HostKey, deque[_Connection]] = {}
+        self.limits: dict[_HostKey, asyncio.Semaphore] = {}
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP/1.1 connection pool on asyncio streams.
+
+    At most `max_per_host` connections are open to a host at once; further
+    requests wait for one to be released, so a fan-out of hundreds of
+    requests reuses a few connections. Connections belong to the event loop
+    that opened them: each running loop gets its own set.
+
+    Usage:
+        response = await default_pool.request("GET", "http://localhost:8080/items/1")
+        response.status, response.json()
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        connect_timeout: float | None = 10.0,
+    ):
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be a positive integer")
+
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.requests = 0
+        self.connections_opened = 0
+        self._loops: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "reuse_rate": 1 - self.connections_opened / self.requests if self.requests else 0.0,
+        }
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        timeout: float | None = None,
+    ) -> HTTPResponse:
+        """
+        Send a request and read the whole response.
+
+        Args:
+            method: HTTP method.
+            url: Absolute http:// or https:// URL.
+            headers: Extra request headers.
+            body: Request body.
+            timeout: Seconds for the whole exchange, including waiting for a
+                free connection. No limit when None.
+
+        Raises:
+            TimeoutError: If `timeout` elapsed.
+            OSError: If the host cannot be reached, or closed a reused
+                connection on a request whose method is not idempotent.
+            HTTPClientError: If the response is malformed.
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported URL: {url}")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        key = (parts.scheme, parts.hostname, port)
+
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        host = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        request = self._encode(method, target, host, headers or {}, body)
+
+        self.requests += 1
+        async with asyncio.timeout(timeout):
+            state = self._state()
+            limit = state.limits.get(key)
+            if limit is None:
+                limit = state.limits[key] = asyncio.Semaphore(self.max_per_host)
+            async with limit:
+                return await self._exchange(state, key, request, method)
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState()
+        return state
+
+    async def _exchange(
+        self, state: _LoopState, key: _HostKey, request: bytes, method: str
+    ) -> HTTPResponse:
+        loop = asyncio.get_running_loop()
+        idle = state.idle.setdefault(key, deque())
+        while True:
+            reused = bool(idle)
+            connection = idle.pop() if reused else await self._connect(key)
+            if reused and not connection.usable(loop.time(), self.idle_timeout):
+                connection.close()
+                continue
+            try:
+                response, reusable = await self._send(connection, request, method)
+            except ConnectionError:
+                connection.close()
+                if reused and method.upper() in IDEMPOTENT_METHODS:
+                    # The server most likely closed the idle connection before
+                    # reading the request; sending it again is safe either way
+                    continue
+                raise
+            except asyncio.IncompleteReadError as error:
+                connection.close()
+                raise HTTPClientError("Connection closed mid-response") from error
+            except BaseException:
+                connection.close()
+                raise
+
+            if reusable:
+                connection.idle_since = loop.time()
+                idle.append(connection)
+            else:
+                connection.close()
+            return response
+
+    async def _connect(self, key: _HostKey) -> _Connection:
+        scheme, host, port = key
+        context = ssl.create_default_context() if scheme == "https" else None
+        async with asyncio.timeout(self.connect_timeout):
+            reader, writer = await asyncio.open_connection(host, port, ssl=context)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    @staticmethod
+    def _encode(
+        method: str, target: str, host: str, headers: dict[str, str], body: bytes | None
+    ) -> bytes:
+        lines = [f"{method.upper()} {target} HTTP/1.1", f"Host: {host}"]
+        names = {name.lower() for name in headers}
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        if body is not None or method.upper() in ("POST", "PUT", "PATCH"):
+            if "content-length" not in names:
+                lines.append(f"Content-Length: {len(body or b'')}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b"")
+
+    @staticmethod
+    async def _send(
+        connection: _Connection, request: bytes, method: str
+    ) -> tuple[HTTPResponse, bool]:
+        """Write the request and read the response; also says if the connection can be reused."""
+        reader = connection.reader
+        connection.writer.write(request)
+        await connection.writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the server")
+        try:
+            version, status, *reason = status_line.decode("latin-1").split(" ", 2)
+            status = int(status)
+        except ValueError:
+            raise HTTPClientError(f"Malformed status line: {status_line!r}") from None
+
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        reusable = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if method.upper() == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await _read_chunked(reader)
+        elif "content-length" in headers:
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                raise HTTPClientError(
+                    f"Malformed Content-Length: {headers['content-length']!r}"
+                ) from None
+            if length < 0:
+                raise HTTPClientError(f"Malformed Content-Length: {length}")
+            if length > MAX_RESPONSE_SIZE:
+                raise HTTPClientError("Response body too large")
+            body = await reader.readexactly(length)
+        else:
+            # Delimited by the server closing the connection
+            body = await reader.read(MAX_RESPONSE_SIZE + 1)
+            if len(body) > MAX_RESPONSE_SIZE:
+                raise HTTPClientError("Response body too large")
+            reusable = False
+
+        reason_text = reason[0].strip() if reason else ""
+        return HTTPResponse(status, reason_text, headers, body), reusable
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    size = 0
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(b"", None)
+        try:
+            length = int(line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise HTTPClientError(f"Malformed chunk size: {line!r}") from None
+        if length < 0:
+            raise HTTPClientError(f"Malformed chunk size: {line!r}")
+        if length == 0:
+            # Skip trailers up to the final empty line
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(chunks)
+        size += length
+        if size > MAX_RESPONSE_SIZE:
+            raise HTTPClientError("Response body too large")
+        chunks.append(await reader.readexactly(length))
+        await reader.readexactly(2)  # CRLF after each chunk
+
+
+# Process-wide pool shared by every http node unless told otherwise
+default_pool = ConnectionPool()
@@ -0,0 +1,315 @@
+"""
+Compile JSON Logic rules into Python closures.
+
+`jsonLogic` re-walks the rule dict on every call: it looks up the operator,
+normalizes the operand list and dispatches through several operation tables
+before doing any real work. `compile_logic` performs that walk once and
+returns a callable that only evaluates the operands, reusing the operation
+functions of `json_logic` so results match the interpreter exactly.
+
+Operators that cannot be resolved at compile time (custom, unsupported or
+unknown operations) fall back to `jsonLogic` for that sub-rule, which keeps
+error behaviour identical to the interpreter.
+"""
+
+from collections.abc import Callable
+from functools import reduce
+from typing import Any
+
+from json_logic import is_logic, jsonLogic, operations
+
+Evaluator = Callable[[Any], Any]
+
+LOGICAL_OPERATORS = frozenset({"if", "?:", "and", "or"})
+SCOPED_OPERATORS = frozenset({"filter", "map", "reduce", "all", "none", "some"})
+DATA_OPERATORS = frozenset({"var", "missing", "missing_some"})
+COMMON_OPERATORS = frozenset(
+    {
+        "==", "===", "!=", "!==", ">", ">=", "<", "<=", "!!", "!",
+        "log", "in", "cat", "substr", "+", "-", "*", "/", "%",
+        "min", "max", "merge", "method",
+    }
+)
+
+
+def compile_logic(logic: Any, falsy_data_as_empty: bool = True) -> Evaluator:
+    """
+    Compile a JSON Logic rule into a callable taking the data object.
+
+    Args:
+        logic: A JSON Logic rule, an array of rules or a primitive value.
+        falsy_data_as_empty: Replace falsy data with `{}` like `jsonLogic`
+            does. Disable to evaluate collection items such as `0` as-is.
+
+    Returns:
+        A function `evaluate(data)` equivalent to `jsonLogic(logic, data)`.
+        `data` may be any mapping, e.g. a `ChainMap` view over the context.
+    """
+    evaluate = _compile(logic)
+    if not falsy_data_as_empty:
+        return evaluate
+
+    def evaluate_rule(data: Any = None) -> Any:
+        # jsonLogic replaces falsy data with an empty dict before evaluating
+        return evaluate(data or {})
+
+    return evaluate_rule
+
+
+def deferred_logic(
+    owner: Any, attribute: str, logic: Any, falsy_data_as_empty: bool = True
+) -> Evaluator:
+    """
+    An evaluator compiling `logic` on its first call.
+
+    The compiled evaluator then replaces this one as `owner.<attribute>`, so
+    later evaluations through the owner skip the indirection. Used where
+    many rules are loaded but few may ever run, e.g. workflow artifacts.
+    """
+    compiled: Evaluator | None = None
+
+    def evaluate_deferred(data: Any = None) -> Any:
+        nonlocal compiled
+        if compiled is None:
+            compiled = compile_logic(logic, falsy_data_as_empty)
+            setattr(owner, attribute, compiled)
+        return compiled(data)
+
+    return evaluate_deferred
+
+
+def _compile(logic: Any) -> Evaluator:
+    if isinstance(logic, (list, tuple)):
+        evaluators = [_compile(item) for item in logic]
+        return lambda data: [evaluate(data) for evaluate in evaluators]
+
+    if not is_logic(logic):
+        return lambda data: logic
+
+    operator = str(next(iter(logic)))
+    values = logic[operator]
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+
+    if operator in LOGICAL_OPERATORS:
+        return _compile_logical(logic, operator, values)
+    if operator in SCOPED_OPERATORS:
+        return _compile_scoped(logic, operator, values)
+    if operator == "var":
+        return _compile_var(values)
+    if operator in DATA_OPERATORS:
+        operation = operations[operator]
+        evaluators = [_compile(value) for value in values]
+        return lambda data: operation(data, *[evaluate(data) for evaluate in evaluators])
+    if operator in COMMON_OPERATORS and operations.get(operator) is not None:
+        return _compile_common(operations[operator], values)
+
+    # Custom, unsupported or unknown operation: defer to the interpreter
+    return lambda data: jsonLogic(logic, data)
+
+
+def _compile_common(operation: Callable, values: list) -> Evaluator:
+    evaluators = [_compile(value) for value in values]
+
+    # Specialize the common arities to avoid building an argument list
+    if len(evaluators) == 1:
+        (first,) = evaluators
+        return lambda data: operation(first(data))
+    if len(evaluators) == 2:
+        first, second = evaluators
+        return lambda data: operation(first(data), second(data))
+
+    return lambda data: operation(*[evaluate(data) for evaluate in evaluators])
+
+
+def _compile_var(values: list) -> Evaluator:
+    if len(values) > 2:
+        # Let the interpreter raise the same arity error
+        return lambda data: jsonLogic({"var": values}, data)
+
+    var_name = values[0] if values else None
+    default = _compile(values[1]) if len(values) > 1 else (lambda data: None)
+
+    if is_logic(var_name) or isinstance(var_name, (list, tuple)):
+        # Dynamic variable name, resolved per evaluation
+        name = _compile(var_name)
+        var = operations["var"]
+        return lambda data: var(data, name(data), default(data))
+
+    if var_name is None or var_name == "":
+        return lambda data: data
+
+    keys = tuple(str(var_name).split("."))
+
+    def evaluate_var(data: Any) -> Any:
+        value = data
+        try:
+            for key in keys:
+                try:
+                    value = value[key]
+                except TypeError:
+                    value = value[int(key)]
+        except (KeyError, TypeError, ValueError):
+            return default(data)
+        return value
+
+    return evaluate_var
+
+
+def _compile_logical(logic: dict, operator: str, values: list) -> Evaluator:
+    evaluators = [_compile(value) for value in values]
+
+    if operator == "and":
+
+        def evaluate_and(data: Any) -> Any:
+            current = False
+            for evaluate in evaluators:
+                current = evaluate(data)
+                if not current:
+                    return current
+            return current
+
+        return evaluate_and
+
+    if operator == "or":
+
+        def evaluate_or(data: Any) -> Any:
+            current = False
+            for evaluate in evaluators:
+                current = evaluate(data)
+                if current:
+                    return current
+            return current
+
+        return evaluate_or
+
+    if operator == "?:" and len(evaluators) != 3:
+        # Let the interpreter raise the same arity error
+        return lambda data: jsonLogic(logic, data)
+
+    pairs = [
+        (evaluators[i], evaluators[i + 1]) for i in range(0, len(evaluators) - 1, 2)
+    ]
+    otherwise = evaluators[-1] if len(evaluators) % 2 else (lambda data: None)
+
+    def evaluate_if(data: Any) -> Any:
+        for condition, consequent in pairs:
+            if condition(data):
+                return consequent(data)
+        return otherwise(data)
+
+    return evaluate_if
+
+
+def _compile_scoped(logic: dict, operator: str, values: list) -> Evaluator:
+    if len(values) < 2 or len(values) > (3 if operator == "reduce" else 2):
+        # Let the interpreter raise the same arity error
+        return lambda data: jsonLogic(logic, data)
+
+    scoped_data = _compile(values[0])
+    scoped_logic = compile_logic(values[1])
+
+    if operator == "map":
+
+        def evaluate_map(data: Any) -> Any:
+            items = scoped_data(data)
+            if not isinstance(items, (list, tuple)):
+                return []
+            return [scoped_logic(item) for item in items]
+
+        return evaluate_map
+
+    if operator == "reduce":
+        initial = values[2] if len(values) > 2 else None
+
+        def evaluate_reduce(data: Any) -> Any:
+            items = scoped_data(data)
+            if not isinstance(items, (list, tuple)):
+                return initial
+            return reduce(
+                lambda accumulator, current: scoped_logic(
+                    {"accumulator": accumulator, "current": current}
+                ),
+                items,
+                initial,
+            )
+
+        return evaluate_reduce
+
+    def evaluate_filter(data: Any) -> list:
+        items = scoped_data(data)
+        if not isinstance(items, (list, tuple)):
+            return []
+        return [item for item in items if scoped_logic(item)]
+
+    if operator == "filter":
+        return evaluate_filter
+    if operator == "none":
+        return lambda data: len(evaluate_filter(data)) == 0
+    if operator == "some":
+        return lambda data: len(evaluate_filter(data)) > 0
+
+    def evaluate_all(data: Any) -> bool:
+        items = scoped_data(data)
+        if not isinstance(items, (list, tuple)) or len(items) == 0:
+            return False
+        for item in items:
+            if not scoped_logic(item):
+                return False
+        return True
+
+    return evaluate_all
+
+
+
+def logic_vars(logic: Any) -> frozenset[str] | None:
+    """
+    Names of the data variables a JSON Logic rule can read.
+
+    Rules of scoped operators (`map`, `filter`, ...) read the items of their
+    collection, not the data object, and are not included.
+
+    Returns:
+        The `var` names (and `missing` keys) of the rule, or None when they
+        cannot be known before evaluation, e.g. `{"var": ""}` (the whole
+        data object) or a variable name computed by another rule.
+    """
+    names: set[str] = set()
+    return frozenset(names) if _collect_vars(logic, names) else None
+
+
+def _collect_vars(logic: Any, names: set[str]) -> bool:
+    """Add the variables of a rule to `names`; False if they are not static."""
+    if isinstance(logic, (list, tuple)):
+        return all(_collect_vars(item, names) for item in logic)
+    if not is_logic(logic):
+        return True
+
+    operator = str(next(iter(logic)))
+    values = logic[operator]
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+
+    if operator == "var":
+        name = values[0] if values else None
+        if is_logic(name) or isinstance(name, (list, tuple)) or name is None or name == "":
+            return False
+        names.add(str(name))
+        return _collect_vars(list(values[1:]), names)
+
+    if operator in ("missing", "missing_some"):
+        keys = values[-1] if operator == "missing_some" and values else values
+        if operator == "missing" and len(keys) == 1 and isinstance(keys[0], (list, tuple)):
+            keys = keys[0]
+        if not isinstance(keys, (list, tuple)) or any(
+            is_logic(key) or isinstance(key, (list, tuple)) for key in keys
+        ):
+            return False
+        names.update(str(key) for key in keys)
+        return _collect_vars(list(values[:-1]) if operator == "missing_some" else [], names)
+
+    if operator in SCOPED_OPERATORS:
+        # Only the collection is read from the data object
+        return _collect_vars(values[:1], names)
+
+    return _collect_vars(list(values), names)
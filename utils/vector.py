@@ -0,0 +1,216 @@
+"""
+Optional NumPy acceleration for JSON Logic expressions over whole collections.
+
+`vectorize` translates the numeric subset of JSON Logic (arithmetic and
+comparisons on the current item, `{"var": ""}`) into NumPy array operations.
+Anything outside that subset, and any input that is not a plain list of
+ints/floats, yields None so callers fall back to evaluating the compiled
+rule item by item. Vectorized results are identical to per-item evaluation:
+values are kept within the range where float64 and Python arithmetic agree
+exactly, otherwise the caller falls back too.
+"""
+
+from collections.abc import Callable, Sequence
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+# Largest magnitude kept on the vectorized path: int64 cannot overflow and
+# every integer is exactly representable as a float64
+MAX_EXACT = 2**52
+
+ARITHMETIC_OPERATORS = frozenset({"+", "-", "*", "/", "%"})
+COMPARISON_OPERATORS = frozenset({"==", "===", "!=", "!==", "<", "<=", ">", ">="})
+PREDICATE_OPERATORS = COMPARISON_OPERATORS | {"and", "or", "!"}
+
+_NUMBER_TYPES = frozenset({int, float})
+
+# (array or scalar, upper bound of its magnitude)
+Bounded = tuple[Any, float]
+
+
+class VectorExpression:
+    """
+    A JSON Logic expression compiled to array operations over the items.
+
+    Attributes:
+        operator: Top-level operator, or None for the item itself or a literal.
+        evaluate: Maps (items, bound) to a Bounded result; raises
+            FloatingPointError when the result would not be exact.
+    """
+
+    def __init__(self, operator: str | None, evaluate: Callable[[Any, float], Bounded]):
+        self.operator = operator
+        self.evaluate = evaluate
+
+    @property
+    def is_arithmetic(self) -> bool:
+        return self.operator in ARITHMETIC_OPERATORS
+
+    @property
+    def is_predicate(self) -> bool:
+        return self.operator in PREDICATE_OPERATORS
+
+    def __call__(self, items: "np.ndarray") -> "np.ndarray | None":
+        """Evaluate over an array from `as_array`, or None to fall back."""
+        bound = float(np.abs(items).max())
+        with np.errstate(all="raise"):
+            try:
+                result, _ = self.evaluate(items, bound)
+            except FloatingPointError:
+                return None
+        return np.broadcast_to(result, items.shape)
+
+
+def as_array(items: Sequence) -> "np.ndarray | None":
+    """Convert a non-empty list of plain ints/floats to an array, or None if unsuitable."""
+    if np is None or not items:
+        return None
+    # bool is an int subclass but compares differently in JSON Logic
+    if not set(map(type, items)) <= _NUMBER_TYPES:
+        return None
+
+    try:
+        array = np.asarray(items)
+    except OverflowError:
+        return None
+    if array.dtype.kind not in "if" or np.isnan(array).any():
+        return None
+    if float(np.abs(array).max()) >= MAX_EXACT:
+        return None
+    return array
+
+
+def vectorize(expression: Any) -> VectorExpression | None:
+    """Compile a JSON Logic expression over the current item, or None if unsupported."""
+    if np is None:
+        return None
+    vector = _vectorize(expression)
+    # The item itself or a literal gains nothing from an array round trip
+    return vector if vector is not None and vector.operator is not None else None
+
+
+def normalize_number(value: Any) -> Any:
+    """Turn an integral float into an int, as JSON Logic arithmetic does."""
+    if type(value) is float and value.is_integer():
+        return int(value)
+    return value
+
+
+def normalize_numbers(values: list) -> list:
+    return [normalize_number(value) for value in values]
+
+
+def _checked(value: Any) -> Bounded:
+    bound = float(np.abs(value).max()) if np.ndim(value) else abs(float(value))
+    if bound >= MAX_EXACT:
+        raise FloatingPointError("value out of the exact range")
+    return value, bound
+
+
+def _vectorize(expression: Any) -> VectorExpression | None:
+    if not isinstance(expression, dict):
+        if type(expression) not in _NUMBER_TYPES or not abs(expression) < MAX_EXACT:
+            return None
+        return VectorExpression(None, lambda items, bound: (expression, abs(expression)))
+    if len(expression) != 1:
+        return None
+
+    operator, values = next(iter(expression.items()))
+    if not isinstance(values, (list, tuple)):
+        values = [values]
+
+    if operator == "var":
+        if len(values) == 1 and values[0] in ("", None):
+            return VectorExpression(None, lambda items, bound: (items, bound))
+        return None
+
+    operands = [_vectorize(value) for value in values]
+    if not operands or None in operands:
+        return None
+
+    if operator in ARITHMETIC_OPERATORS:
+        return _arithmetic(operator, operands)
+    if operator in COMPARISON_OPERATORS and len(operands) == 2:
+        return _comparison(operator, *operands)
+    if operator in ("and", "or") and all(operand.is_predicate for operand in operands):
+        # On booleans, JSON Logic and/or return plain booleans too
+        combine = np.logical_and if operator == "and" else np.logical_or
+
+        def evaluate_logical(items, bound):
+            result = operands[0].evaluate(items, bound)[0]
+            for operand in operands[1:]:
+                result = combine(result, operand.evaluate(items, bound)[0])
+            return result, 1.0
+
+        return VectorExpression(operator, evaluate_logical)
+    if operator == "!" and len(operands) == 1:
+        (operand,) = operands
+        return VectorExpression(
+            operator, lambda items, bound: (np.logical_not(operand.evaluate(items, bound)[0]), 1.0)
+        )
+    return None
+
+
+def _arithmetic(operator: str, operands: list[VectorExpression]) -> VectorExpression | None:
+    if operator in ("/", "%") and len(operands) != 2:
+        return None
+    if operator == "-" and len(operands) > 2:
+        return None
+    if any(operand.is_predicate for operand in operands):
+        # Booleans in arithmetic follow int() coercion, leave that to the interpreter
+        return None
+
+    def evaluate_arithmetic(items, bound):
+        value, value_bound = operands[0].evaluate(items, bound)
+        if operator == "-" and len(operands) == 1:
+            return np.negative(value), value_bound
+
+        for operand in operands[1:]:
+            other, other_bound = operand.evaluate(items, bound)
+            if operator == "+":
+                value, value_bound = np.add(value, other), value_bound + other_bound
+            elif operator == "-":
+                value, value_bound = np.subtract(value, other), value_bound + other_bound
+            elif operator == "*":
+                value, value_bound = np.multiply(value, other), value_bound * other_bound
+            else:
+                # Python raises ZeroDivisionError here, let the fallback do so
+                if not np.all(other):
+                    raise FloatingPointError("division by zero")
+                divide = np.true_divide if operator == "/" else np.remainder
+                value, value_bound = _checked(divide(value, other))
+                continue
+            if value_bound >= MAX_EXACT:
+                # The bound is conservative; check the actual values
+                value, value_bound = _checked(value)
+        return value, value_bound
+
+    return VectorExpression(operator, evaluate_arithmetic)
+
+
+def _comparison(
+    operator: str, left: VectorExpression, right: VectorExpression
+) -> VectorExpression | None:
+    if left.is_predicate or right.is_predicate:
+        # Comparing booleans involves JSON Logic type coercion
+        return None
+
+    compare = {
+        "==": np.equal,
+        "===": np.equal,
+        "!=": np.not_equal,
+        "!==": np.not_equal,
+        "<": np.less,
+        "<=": np.less_equal,
+        ">": np.greater,
+        ">=": np.greater_equal,
+    }[operator]
+
+    def evaluate_comparison(items, bound):
+        return compare(left.evaluate(items, bound)[0], right.evaluate(items, bound)[0]), 1.0
+
+    return VectorExpression(operator, evaluate_comparison)
@@ -0,0 +1,267 @@
+"""
+Built workflows saved as binary artifacts, loaded without rebuilding.
+
+An artifact holds a validated, linked workflow: its nodes with their
+compiled field paths, its connections and its GraphIndex. Loading one skips
+parsing the JSON definition, validating nodes and indexing the graph.
+
+File layout: MAGIC, the length of a JSON header (4 bytes, big endian), the
+header, then a pickle payload. The header records the artifact format, an
+engine version fingerprinting this package's source code and the Python
+version, and the hash of the source the workflow was built from; a loader
+expecting another engine or source treats the artifact as stale. The file
+is memory-mapped and the payload unpickled straight from the mapping.
+
+Compiled JSON Logic rules are closures and are not saved: conditions and
+collection expressions compile on their first evaluation instead, and
+vectorized expressions are rebuilt on load. Nodes
+are pickled without their connections, which are relinked from an edge
+table, so long chains do not recurse. Artifacts are pickles: only load
+files you built.
+"""
+
+import gc
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import nodes
+import utils
+import workflows
+from nodes.base import BaseNode
+from nodes.collection import CollectionNode, ReduceNode
+from nodes.condition import ConditionNode
+from nodes.connection import NodeConnection
+from nodes.fused import FusedNode
+from nodes.http import HttpNode
+from utils.http_client import default_pool
+from utils.logic import deferred_logic
+from utils.vector import vectorize
+from workflows.base import Workflow
+from workflows.exception import ArtifactException
+from workflows.memo import MemoCache
+
+MAGIC = b"WFARTIF\x00"
+# Bump whenever the layout or payload changes
+ARTIFACT_VERSION = 1
+
+_HEADER_LENGTH = struct.Struct(">I")
+
+# Attributes set by `link` from a node's connections
+_LINKED = frozenset({"connections", "true_node", "false_node", "body_node", "exit_node"})
+# Attributes rebuilt on load: closures, per-process state and caches
+_TRANSIENT = frozenset({"evaluator", "key_evaluator", "memo", "pool", "_body_index"})
+# Compiled rules restored as deferred evaluators: (attribute, rule attribute, falsy as empty)
+_DEFERRED: dict[type, tuple[tuple[str, str, bool], ...]] = {
+    ConditionNode: (("evaluator", "condition", True),),
+    CollectionNode: (("evaluator", "expression", False),),
+    ReduceNode: (("evaluator", "expression", False), ("key_evaluator", "key", False)),
+}
+
+
+@lru_cache(maxsize=1)
+def engine_version() -> str:
+    """Fingerprint of the artifact format, the Python version and the engine's source."""
+    digest = hashlib.sha256(f"{ARTIFACT_VERSION}:{sys.version_info[:2]}".encode())
+    for package in (nodes, utils, workflows):
+        root = Path(package.__path__[0])
+        for path in sorted(root.rglob("*.py")):
+            digest.update(str(path.relative_to(root.parent)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def source_hash(source: bytes) -> str:
+    """Hash of a workflow's source, e.g. the bytes of its JSON file."""
+    return hashlib.sha256(source).hexdigest()
+
+
+def save_artifact(workflow: Workflow, path: str, source: str | None = None) -> None:
+    """
+    Write a built workflow to `path`, replacing any previous artifact atomically.
+
+    Args:
+        workflow: A workflow built by WorkflowBuilder, optimized or not.
+        path: Where to write the artifact.
+        source: Hash of the source the workflow was built from, checked by
+            `load_artifact`. Defaults to the workflow's definition hash.
+    """
+    index = workflow.index
+    all_nodes = list(index.nodes)
+    for node in index.nodes:
+        if isinstance(node, FusedNode):
+            all_nodes.extend(node.nodes)
+    ids = {node: node_id for node_id, node in enumerate(all_nodes)}
+
+    payload = {
+        "nodes": all_nodes,
+        "edges": [[(ids[conn.to], conn.label) for conn in node.connections] for node in all_nodes],
+        "index": index,
+        "initial_patch": workflow.initial_patch,
+        "optimization": workflow.optimization,
+        "memo": (workflow.memo.maxsize, workflow.memo.ttl),
+    }
+    header = {
+        "version": ARTIFACT_VERSION,
+        "engine": engine_version(),
+        "source": source if source is not None else workflow.definition_hash,
+        "name": getattr(workflow, "name", None),
+        "definition_hash": workflow.definition_hash,
+        "nodes": len(index.nodes),
+    }
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            encoded = json.dumps(header).encode()
+            file.write(MAGIC + _HEADER_LENGTH.pack(len(encoded)) + encoded)
+            _Pickler(file, protocol=pickle.HIGHEST_PROTOCOL).dump(payload)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def load_artifact(path: str, source: str | None = None) -> Workflow | None:
+    """
+    Load a workflow saved by `save_artifact`, without validating or indexing it again.
+
+    Args:
+        path: The artifact file.
+        source: Expected source hash; None accepts any source.
+
+    Returns:
+        The workflow, or None if the file does not exist or is stale: built
+        from another source, or by another engine version.
+
+    Raises:
+        ArtifactException: If the file is not a readable artifact.
+    """
+    try:
+        file = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as error:  # An empty file cannot be mapped
+            raise ArtifactException(f"{path} is not a workflow artifact") from error
+    with data:
+        header, offset = _read_header(data, path)
+        if header.get("engine") != engine_version():
+            return None
+        if source is not None and header.get("source") != source:
+            return None
+
+        # Every object loaded stays alive: collections mid-load only cost time
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            workflow = _load_payload(data, offset, path)
+        finally:
+            if enabled:
+                gc.enable()
+
+    workflow.name = header.get("name")
+    workflow.definition_hash = header.get("definition_hash")
+    return workflow
+
+
+def _load_payload(data: mmap.mmap, offset: int, path: str) -> Workflow:
+    """Unpickle the payload and relink its nodes into a workflow."""
+    try:
+        with memoryview(data) as view:
+            payload = pickle.loads(view[offset:])
+    except Exception as error:
+        raise ArtifactException(f"{path}: unreadable artifact payload") from error
+
+    all_nodes: list[BaseNode] = payload["nodes"]
+    for node, edges in zip(all_nodes, payload["edges"]):
+        node.link([NodeConnection(all_nodes[target], label) for target, label in edges])
+
+    index = payload["index"]
+    maxsize, ttl = payload["memo"]
+    workflow = Workflow(
+        list(index.nodes),
+        [conn for node in index.nodes for conn in node.connections],
+        index,
+        MemoCache(maxsize, ttl),
+        payload["initial_patch"],
+    )
+    workflow.optimization = payload["optimization"]
+    return workflow
+
+
+def _read_header(data: mmap.mmap, path: str) -> tuple[dict, int]:
+    """The artifact's header and the offset of its payload."""
+    start = len(MAGIC) + _HEADER_LENGTH.size
+    if data[: len(MAGIC)] != MAGIC or len(data) < start:
+        raise ArtifactException(f"{path} is not a workflow artifact")
+    (length,) = _HEADER_LENGTH.unpack(data[len(MAGIC) : start])
+    try:
+        header = json.loads(data[start : start + length])
+    except ValueError as error:
+        raise ArtifactException(f"{path}: unreadable artifact header") from error
+    return header, start + length
+
+
+@lru_cache(maxsize=None)
+def _slots(cls: type) -> tuple[str, ...]:
+    """Every slot of a node class, inherited ones included."""
+    return tuple(
+        dict.fromkeys(
+            slot
+            for klass in reversed(cls.__mro__)
+            for slot in klass.__dict__.get("__slots__", ())
+        )
+    )
+
+
+@lru_cache(maxsize=None)
+def _transient_slots(cls: type) -> tuple[str, ...]:
+    return tuple(slot for slot in _slots(cls) if slot in _TRANSIENT)
+
+
+class _Pickler(pickle.Pickler):
+    def reducer_override(self, obj: Any) -> Any:
+        if not isinstance(obj, BaseNode):
+            return NotImplemented
+        state = {
+            slot: getattr(obj, slot)
+            for slot in _slots(type(obj))
+            if slot not in _LINKED and slot not in _TRANSIENT and hasattr(obj, slot)
+        }
+        if "vector" in state:
+            # Vectorized expressions are closures too: keep whether the node had one
+            state["vector"] = state["vector"] is not None
+        # Created empty, so references to the node resolve before its state is set
+        return object.__new__, (type(obj),), state, None, None, _restore_node
+
+
+def _restore_node(node: BaseNode, state: dict) -> None:
+    for slot, value in state.items():
+        setattr(node, slot, value)
+    for slot in _transient_slots(type(node)):
+        setattr(node, slot, None)
+    if isinstance(node, HttpNode):
+        node.pool = default_pool
+    if isinstance(node, CollectionNode):
+        node.vector = vectorize(node.expression) if node.vector else None
+    for cls in type(node).__mro__:
+        for attribute, rule, falsy_data_as_empty in _DEFERRED.get(cls, ()):
+            logic = getattr(node, rule)
+            if logic is not None:
+                setattr(node, attribute, deferred_logic(node, attribute, logic, falsy_data_as_empty))
+        if cls in _DEFERRED:
+            break  # The most derived entry lists every rule of the node
@@ -1,33 +1,127 @@
 import asyncio
-from typing import TypedDict
+import copy
+from time import perf_counter_ns
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from typing import Any, NotRequired, TypedDict
 from nodes.base import BaseNode, RawNode
 from nodes.connection import NodeConnection, RawConnection
+from nodes.fused import FusedNode
+from nodes.pure import PureNode
+from workflows.checkpoint import DEFAULT_CHECKPOINT_INTERVAL, Checkpointer, load_checkpoint
+from workflows.codegen import CompiledWorkflow, compile_workflow
 from workflows.context import ExecutionContext
+from workflows.graph import GraphIndex
+from workflows.incremental import RecordedRun, StepRecorder
+from workflows.memo import MemoCache
+from workflows.metrics import MetricsRegistry, WorkflowMetrics, default_registry
+from workflows.optimizer import OptimizationReport
+from workflows.path import FieldPath, compile_path
+from workflows.scheduler import DataflowScheduler, ExecutionMode, LevelScheduler
+from workflows.tracing import Tracer
+
+
+class RawMemoConfig(TypedDict, total=False):
+    size: int  # Maximum number of memoized results
+    ttl: float  # Seconds a result stays valid
 
 
 class RawWorkflow(TypedDict):
     name: str
     nodes: list[RawNode]
     connections: dict[str, list[RawConnection]]
+    memo: NotRequired[RawMemoConfig]
+
+
+@dataclass
+class RunResult:
+    """
+    Outcome of one run in `Workflow.execute_many`.
+
+    Attributes:
+        index: Position of the run's initial state in the input.
+        ctx: The run's ExecutionContext, partially updated if the run failed.
+        error: The exception raised by the run, or None on success.
+    """
+
+    index: int
+    ctx: ExecutionContext
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class Workflow:
-    def __init__(self, nodes: list[BaseNode], connections: list[NodeConnection]):
+    def __init__(
+        self,
+        nodes: list[BaseNode],
+        connections: list[NodeConnection],
+        index: GraphIndex | None = None,
+        memo: MemoCache | None = None,
+        initial_patch: Iterable[tuple[FieldPath, Any]] = (),
+    ):
         self.nodes = nodes
         self.connections = connections
+        # Content hash of the raw definition, set by WorkflowBuilder
+        self.definition_hash: str | None = None
+        self._index = index
+        # Literal assignments folded out of the graph, applied to every new run
+        self.initial_patch = tuple(initial_patch)
+        # Set by WorkflowBuilder when the graph was optimized
+        self.optimization: OptimizationReport | None = None
 
-    def get_start_nodes(self) -> list[BaseNode]:
-        # Assuming start nodes are those without any incoming connections
-        nodes_as_target = {conn.to for conn in self.connections}
-        start_nodes = [node for node in self.nodes if node not in nodes_as_target]
+        # Results of pure nodes, shared by every run of this workflow
+        self.memo = memo if memo is not None else MemoCache()
+        for node in nodes:
+            for inner in node.nodes if isinstance(node, FusedNode) else (node,):
+                if isinstance(inner, PureNode) and inner.reads is not None:
+                    inner.memo = self.memo
 
-        return start_nodes
+    @property
+    def index(self) -> GraphIndex:
+        # Nodes and connections never change after build, so index once
+        if self._index is None:
+            self._index = GraphIndex(self.nodes)
+        return self._index
+
+    def compile(self, cache_dir: str | None = None) -> CompiledWorkflow:
+        """
+        Generate one Python coroutine function running this workflow.
+
+        Conditions and sequential for loops become `if` and `while`
+        statements and set nodes call their field paths directly, so a run
+        pays no scheduler overhead. Graphs the code generator does not
+        support (see workflows.codegen) run on the interpreter instead.
+
+        Args:
+            cache_dir: Optional directory caching generated sources by
+                definition hash, shared across processes.
+
+        Returns:
+            A CompiledWorkflow; `fallback_reason` says why a workflow was
+            not compiled.
+        """
+        return compile_workflow(self, cache_dir)
+
+    def get_start_nodes(self) -> list[BaseNode]:
+        # Start nodes are those without any incoming connections
+        return self.index.start_nodes()
 
     async def execute_async(
         self,
         ctx: ExecutionContext | None = None,
         state: dict | None = None,
         config: dict | None = None,
+        mode: ExecutionMode | str = ExecutionMode.DATAFLOW,
+        max_concurrency: int | None = None,
+        tracer: Tracer | None = None,
+        checkpoint: str | None = None,
+        checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        deadline: float | None = None,
+        partial: bool = False,
+        metrics: MetricsRegistry | None = default_registry,
     ) -> ExecutionContext:
         """
         Execute the workflow asynchronously.
@@ -36,30 +130,329 @@ class Workflow:
             ctx: Optional ExecutionContext. If not provided, one will be created.
             state: Optional initial state (used if ctx is not provided).
             config: Optional config (used if ctx is not provided).
+            mode: "dataflow" starts each node as soon as its predecessors
+                finish; "level" keeps the legacy lock-step levels.
+            max_concurrency: Maximum number of nodes running at once in
+                dataflow mode. Unlimited when None.
+            tracer: Optional hooks called around every node, e.g. a
+                ChromeTraceRecorder. Nodes of parallel loop bodies are not
+                traced individually.
+            checkpoint: Optional path of a file to checkpoint the run to,
+                so `resume` can continue it after a crash. Dataflow mode only.
+            checkpoint_interval: Minimum seconds between two checkpoints;
+                0 checkpoints after every step.
+            deadline: Optional seconds the whole run may take. Nodes still
+                running when it expires are cancelled, like nodes outliving
+                their own `deadline` parameter.
+            partial: Instead of raising DeadlineExceededException, return the
+                context with cut-off nodes marked `timed_out` in node_context.
+                A node past its own deadline then routes nowhere while the
+                rest of the run goes on.
+            metrics: Registry counting and timing the run and its nodes;
+                None records nothing.
 
         Returns:
             The ExecutionContext after workflow completion.
+
+        Raises:
+            DeadlineExceededException: If a deadline expires, unless `partial`.
         """
         if ctx is None:
             ctx = ExecutionContext(
                 state=state or {},
                 config=config or {},
             )
+        self._apply_patch(ctx)
+
+        checkpointer = None
+        if checkpoint is not None:
+            checkpointer = Checkpointer(checkpoint, checkpoint_interval)
+
+        workflow_metrics = metrics.workflow(self) if metrics is not None else None
+        if ExecutionMode(mode) == ExecutionMode.LEVEL:
+            if checkpointer is not None:
+                raise ValueError("Checkpointing requires the dataflow execution mode")
+            scheduler = LevelScheduler(self, tracer, deadline, partial, workflow_metrics)
+        else:
+            scheduler = DataflowScheduler(
+                self.index,
+                max_concurrency,
+                tracer,
+                checkpointer,
+                deadline=deadline,
+                partial=partial,
+                metrics=workflow_metrics,
+            )
+
+        return await self._run(scheduler, ctx, tracer, workflow_metrics)
+
+    async def resume(
+        self,
+        checkpoint: str,
+        config: dict | None = None,
+        max_concurrency: int | None = None,
+        tracer: Tracer | None = None,
+        checkpoint_interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        metrics: MetricsRegistry | None = default_registry,
+    ) -> ExecutionContext:
+        """
+        Continue a run from the last consistent point of its checkpoint file.
+
+        The run keeps appending checkpoints to the same file, so it can be
+        resumed again. Config is not checkpointed and must be passed again.
+
+        Args:
+            checkpoint: Path of a file written by `execute_async(checkpoint=...)`.
+            config: Config of the run.
+            max_concurrency: As in `execute_async`.
+            tracer: As in `execute_async`.
+            checkpoint_interval: As in `execute_async`.
+            metrics: As in `execute_async`.
+
+        Returns:
+            The ExecutionContext after workflow completion. A run that had
+            already completed is returned as is, without executing nodes.
+
+        Raises:
+            CheckpointException: If the file holds no checkpoint, or was
+                written by a different workflow.
+        """
+        saved = load_checkpoint(checkpoint)
+        ctx = ExecutionContext(
+            state=saved.state,
+            config=config or {},
+            node_context=saved.node_context,
+        )
+        if saved.completed:
+            return ctx
+
+        checkpointer = Checkpointer(checkpoint, checkpoint_interval, resume_from=saved)
+        workflow_metrics = metrics.workflow(self) if metrics is not None else None
+        scheduler = DataflowScheduler(
+            self.index, max_concurrency, tracer, checkpointer, metrics=workflow_metrics
+        )
+        return await self._run(scheduler, ctx, tracer, workflow_metrics)
+
+    async def record(self, state: dict | None = None, config: dict | None = None) -> RecordedRun:
+        """
+        Execute the workflow, recording what each node step reads and writes.
+
+        The record lets `reexecute` re-run the workflow with a few initial
+        keys changed. Steps run one at a time, each on a fork of the context,
+        which makes a recorded run slower than `execute_async`.
+
+        Args:
+            state: Initial state; copied, the record keeps it unchanged.
+            config: Config of the run, reused by `reexecute`.
+
+        Returns:
+            The RecordedRun, with the final context in `ctx`.
+        """
+        initial_state = copy.deepcopy(state or {})
+        ctx = ExecutionContext(state=dict(initial_state), config=config or {})
+        return await self._record(RecordedRun(ctx, initial_state), None, set())
 
-        nodes_to_exe = self.get_start_nodes()
-        coroutine_list = []
+    async def reexecute(self, previous: RecordedRun, changed_keys: dict[str, Any]) -> RecordedRun:
+        """
+        Re-run a recorded run with some initial state keys changed.
 
-        while nodes_to_exe:
-            for node in nodes_to_exe:
-                coroutine_list.append(node.execute_async(ctx))
+        Only node steps that read a changed key, or a value changed by a step
+        that ran again, are executed; the others are replayed from `previous`.
+        The result is the same as a full run of the new initial state.
 
-            await asyncio.gather(*coroutine_list)
+        Args:
+            previous: A run returned by `record` or `reexecute` on this workflow.
+            changed_keys: New values by state path, e.g. `{"user.age": 31}`.
+                A nested path changes the value of its top-level key.
 
-            next_nodes = []
-            for node in nodes_to_exe:
-                next_nodes.extend(await node.next_nodes(ctx))
+        Returns:
+            A RecordedRun of the new initial state, which can be passed as
+            `previous` again. `executed` and `reused` count the steps.
+        """
+        initial_state = dict(previous.initial_state)
+        scratch = ExecutionContext(state=initial_state)
+        changed = set()
+        for path, value in changed_keys.items():
+            keys = compile_path(path).set_keys
+            if not keys:
+                continue
+            if keys[0] in initial_state and len(keys) > 1:
+                # Copy only the changed top-level value, the rest is shared
+                initial_state[keys[0]] = copy.deepcopy(initial_state[keys[0]])
+            scratch.set(path, copy.deepcopy(value))
+            changed.add(keys[0])
 
-            nodes_to_exe = next_nodes
-            coroutine_list = []
+        ctx = ExecutionContext(state=dict(initial_state), config=previous.ctx.config)
+        return await self._record(RecordedRun(ctx, initial_state), previous, changed)
 
+    async def _record(
+        self, run: RecordedRun, previous: RecordedRun | None, changed: set[str]
+    ) -> RecordedRun:
+        self._apply_patch(run.ctx)
+        recorder = StepRecorder(self.index, run, previous, changed)
+        # One step at a time, so every step reads the writes of all earlier ones
+        await DataflowScheduler(self.index, max_concurrency=1, recorder=recorder).run(run.ctx)
+        return run
+
+    def _apply_patch(self, ctx: ExecutionContext) -> None:
+        for path, value in self.initial_patch:
+            ctx.set(path, value)
+
+    async def _run(
+        self,
+        scheduler: DataflowScheduler | LevelScheduler,
+        ctx: ExecutionContext,
+        tracer: Tracer | None,
+        metrics: WorkflowMetrics | None = None,
+    ) -> ExecutionContext:
+        if metrics is not None:
+            shard = metrics.shard()
+            start = metrics.start_run(shard)
+            try:
+                await self._run(scheduler, ctx, tracer)
+            except BaseException:
+                metrics.end_run(shard, start, failed=True)
+                raise
+            metrics.end_run(shard, start, failed=False)
+            return ctx
+
+        if tracer is None:
+            await scheduler.run(ctx)
+            return ctx
+
+        try:
+            await scheduler.run(ctx)
+        except BaseException as error:
+            tracer.on_run_end(ctx, perf_counter_ns(), error)
+            raise
+        tracer.on_run_end(ctx, perf_counter_ns(), None)
         return ctx
+
+    async def execute_many(
+        self,
+        states: Iterable[dict],
+        concurrency: int = 100,
+        config: dict | None = None,
+        copy_states: bool = True,
+        ordered: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[RunResult]:
+        """
+        Execute the workflow once per initial state, yielding results as they complete.
+
+        The node graph is shared by every run; each run gets its own
+        ExecutionContext with a deep copy of its initial state, so runs never
+        see each other's writes. States are pulled lazily, so `states` may be
+        a generator over a large input.
+
+        Args:
+            states: Initial states, one per run.
+            concurrency: Maximum number of runs in flight.
+            config: Config shared (read-only) by every run.
+            copy_states: Deep-copy each initial state before its run. Pass
+                False when every state is a fresh object, e.g. parsed JSON.
+            ordered: Yield results in input order. A run then starts only
+                within `2 * concurrency` states of the oldest result not yet
+                yielded, so a slow run holds back a bounded number of results.
+            **kwargs: Forwarded to `execute_async` (e.g. mode, max_concurrency).
+
+        Yields:
+            A RunResult per run, in completion order unless `ordered`. A
+            failing run yields a result carrying its error; the rest of the
+            batch keeps running.
+
+        Raises:
+            BaseException: Raised by a run outside `Exception` (e.g.
+                KeyboardInterrupt); the other runs are cancelled.
+            Exception: Raised while reading `states`, once started runs drain.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be a positive integer")
+
+        config = config or {}
+        pending_states = enumerate(states)
+        results: asyncio.Queue[RunResult | None] = asyncio.Queue()
+        # Set while the queue has room, so a fast producer never runs far
+        # ahead of the consumer. The queue itself is unbounded so the end of
+        # a worker never waits on the consumer.
+        room = asyncio.Event()
+        room.set()
+
+        # With `ordered`: a slot per state pulled but not yet yielded, and the
+        # results completed ahead of the next index to yield
+        slots = asyncio.Semaphore(2 * concurrency) if ordered else None
+        held: dict[int, RunResult] = {}
+        next_index = 0
+
+        input_errors: list[Exception] = []
+        fatal_errors: list[BaseException] = []
+
+        async def worker() -> None:
+            try:
+                while True:
+                    if slots is not None:
+                        await slots.acquire()
+                    pulled = None if input_errors else next(pending_states, None)
+                    if pulled is None:
+                        if slots is not None:
+                            # Pass the slot on, so waiting workers stop too
+                            slots.release()
+                        break
+                    index, state = pulled
+                    if copy_states:
+                        state = copy.deepcopy(state)
+                    ctx = ExecutionContext(state=state, config=config)
+                    try:
+                        await self.execute_async(ctx, **kwargs)
+                    except Exception as error:
+                        result = RunResult(index, ctx, error)
+                    else:
+                        result = RunResult(index, ctx)
+                    while results.qsize() >= concurrency:
+                        room.clear()
+                        await room.wait()
+                    results.put_nowait(result)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                # Reading `states` failed; stop the batch once runs drain
+                input_errors.append(error)
+                if slots is not None:
+                    slots.release()
+            except BaseException as error:
+                # e.g. KeyboardInterrupt in a run: stop the batch and re-raise it
+                fatal_errors.append(error)
+            finally:
+                # Never blocks, so the consumer hears from every worker however it stopped
+                results.put_nowait(None)
+
+        # Each worker pulls the next state once its current run finishes, which
+        # caps in-flight runs at `concurrency` without per-run tasks
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        active = len(workers)
+        try:
+            while active:
+                result = await results.get()
+                if not room.is_set() and results.qsize() < concurrency:
+                    room.set()
+                if result is None:
+                    active -= 1
+                    if fatal_errors:
+                        raise fatal_errors[0]
+                elif slots is None:
+                    yield result
+                else:
+                    held[result.index] = result
+                    while next_index in held:
+                        yield held.pop(next_index)
+                        next_index += 1
+                        slots.release()
+            # Results past a state that failed to read, in input order
+            for index in sorted(held):
+                yield held[index]
+            if input_errors:
+                raise input_errors[0]
+        finally:
+            # Consumer stopped early: do not leave runs executing in the background
+            for task in workers:
+                task.cancel()
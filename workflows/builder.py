@@ -2,19 +2,81 @@ from nodes.base import BaseNode
 from nodes.builders.connection import ConnectionBuilder
 from nodes.connection import NodeConnection
 from nodes.factory import NodeFactory
+from nodes.loop import ForLoopNode
+from workflows import optimizer
 from workflows.base import RawWorkflow, Workflow
+from workflows.cache import WorkflowCache, default_cache, definition_hash
+from workflows.graph import GraphIndex
+from workflows.memo import DEFAULT_MEMO_SIZE, MemoCache
 
 
 class WorkflowBuilder:
     state: dict = {}
     variables: dict = {}
 
-    def __init__(self, params: RawWorkflow):
+    def __init__(
+        self,
+        params: RawWorkflow,
+        cache: WorkflowCache | None = default_cache,
+        optimize: bool = False,
+        key: str | None = None,
+    ):
+        """
+        Args:
+            params: The raw workflow definition.
+            cache: Cache of built workflows keyed by definition hash. The
+                default is the process-wide `default_cache`: builders of
+                identical definitions anywhere in the process get the same
+                Workflow instance, with its memo cache and metrics. Pass a
+                private WorkflowCache to scope sharing, or None to always
+                build a fresh Workflow.
+            optimize: Fold the literal prefix into an initial-state patch,
+                prune conditions known at build time and fuse linear chains
+                (see workflows.optimizer). Final states are unchanged.
+            key: Optional cache key identifying this definition, e.g. a
+                version id, used instead of hashing it. Workflows built with
+                a key have no `definition_hash`.
+        """
+        self.params = params
         self.name = params.get("name", "Unnamed Workflow")
         self.raw_nodes = params.get("nodes", [])
         self.raw_connections = params.get("connections", [])
+        self.cache = cache
+        self.optimize = optimize
+        self.key = key
 
     def build(self) -> "Workflow":
+        """
+        Build the workflow, reusing a cached instance of an identical definition.
+
+        The definition is hashed on every build, so one edited in place is
+        built again; with a `key`, a cache hit costs a dict lookup instead.
+
+        Returns:
+            A linked and validated Workflow. Cached workflows are shared, so
+            callers must not modify them.
+        """
+        if self.key is not None:
+            key = f"key:{self.key}"
+        else:
+            key = definition_hash(self.params)
+        if self.optimize:
+            # Optimized graphs have other nodes, e.g. for checkpoints
+            key += ":optimized"
+        if self.cache is not None:
+            workflow = self.cache.get(key)
+            if workflow is not None:
+                return workflow
+
+        workflow = self._build()
+        if self.key is None:
+            workflow.definition_hash = key
+
+        if self.cache is not None:
+            self.cache.put(key, workflow)
+        return workflow
+
+    def _build(self) -> "Workflow":
         nodes: list[BaseNode] = []
         node_factory = NodeFactory()
         for item in self.raw_nodes:
@@ -41,7 +103,28 @@ class WorkflowBuilder:
 
             node.link(node_connections)
 
-        workflow = Workflow(nodes, connections)
+        for node in nodes:
+            if isinstance(node, ForLoopNode):
+                node.validate_body()
+
+        if not self.optimize:
+            workflow = Workflow(nodes, connections, GraphIndex(nodes), self._memo())
+            workflow.name = self.name
+            return workflow
+
+        graph = optimizer.optimize(nodes)
+        index = GraphIndex(graph.nodes, graph.start_nodes)
+        workflow = Workflow(
+            graph.nodes, graph.connections(), index, self._memo(), graph.initial_patch
+        )
+        workflow.optimization = graph.report
         workflow.name = self.name
         # Implement the logic to convert nodes and connections into a Workflow instance
         return workflow
+
+    def _memo(self) -> MemoCache:
+        """Memo cache of pure node results, sized by the optional "memo" settings."""
+        settings = self.params.get("memo", {})
+        if not isinstance(settings, dict):
+            raise ValueError("'memo' must be an object with optional 'size' and 'ttl'")
+        return MemoCache(settings.get("size", DEFAULT_MEMO_SIZE), settings.get("ttl"))
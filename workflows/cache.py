@@ -0,0 +1,79 @@
+import hashlib
+import json
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from workflows.base import RawWorkflow, Workflow
+
+
+def definition_hash(raw_workflow: "RawWorkflow") -> str:
+    """
+    Stable content hash of a raw workflow definition.
+
+    Key order does not matter: two definitions that serialize to the same
+    canonical JSON get the same hash.
+    """
+    canonical = json.dumps(
+        raw_workflow, sort_keys=True, separators=(",", ":"), default=repr
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class WorkflowCache:
+    """
+    LRU cache of built workflows keyed by definition hash.
+
+    Built workflows keep no per-run state (runs live in ExecutionContext), so
+    one cached instance can safely serve concurrent executions.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._workflows: OrderedDict[str, "Workflow"] = OrderedDict()
+
+    def get(self, key: str) -> "Workflow | None":
+        workflow = self._workflows.get(key)
+        if workflow is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._workflows.move_to_end(key)
+        return workflow
+
+    def put(self, key: str, workflow: "Workflow") -> None:
+        self._workflows[key] = workflow
+        self._workflows.move_to_end(key)
+        while len(self._workflows) > self.maxsize:
+            self._workflows.popitem(last=False)
+
+    def clear(self) -> None:
+        self._workflows.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._workflows),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._workflows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._workflows
+
+
+# Process-wide cache used by WorkflowBuilder unless told otherwise
+default_cache = WorkflowCache()
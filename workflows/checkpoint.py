@@ -0,0 +1,279 @@
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from nodes.loop import ForLoopNode
+from workflows.context import ChangeSet
+from workflows.exception import CheckpointException
+from workflows.overlay import materialize
+
+if TYPE_CHECKING:
+    from workflows.context import ExecutionContext
+    from workflows.graph import GraphIndex
+
+# Default seconds between two checkpoints of a run
+DEFAULT_CHECKPOINT_INTERVAL = 1.0
+
+# Loop cursor entries held by reference; a resumed loop re-opens its
+# collection from the saved index instead
+_CURSOR_KEYS = (ForLoopNode.LOOP_COLLECTION_KEY, ForLoopNode.LOOP_ITERATOR_KEY)
+
+
+def _node_context(value: Any) -> Any:
+    """A node's context as written to the checkpoint, without loop cursors."""
+    value = materialize(value)
+    if isinstance(value, dict) and any(key in value for key in _CURSOR_KEYS):
+        return {key: item for key, item in value.items() if key not in _CURSOR_KEYS}
+    return value
+
+
+@dataclass
+class Checkpoint:
+    """
+    A run replayed from a checkpoint file, up to its last complete record.
+
+    Attributes:
+        state: The run's state at the last checkpoint.
+        node_context: The run's node_context at the last checkpoint.
+        nodes: Names of the workflow's nodes, in scheduler order.
+        ready: Names of the nodes ready to run.
+        running: Names of the nodes in flight at the last checkpoint; a
+            resumed run executes them again, before the ready ones.
+        pending: Unsettled predecessor count per node name, for the nodes
+            whose count changed since the run started.
+        live: Names of the nodes some predecessor routed to.
+        exits: Loop-leaving edges already settled, as [source, target] names.
+        completed: True if the run finished; nothing is left to execute.
+        size: Bytes of the file holding complete records.
+    """
+
+    state: dict = field(default_factory=dict)
+    node_context: dict = field(default_factory=dict)
+    nodes: list[str] = field(default_factory=list)
+    ready: list[str] = field(default_factory=list)
+    running: list[str] = field(default_factory=list)
+    pending: dict[str, int] = field(default_factory=dict)
+    live: set[str] = field(default_factory=set)
+    exits: list[list[str]] = field(default_factory=list)
+    completed: bool = False
+    size: int = 0
+
+    def apply(self, record: dict) -> None:
+        if record["type"] == "end":
+            self.completed = True
+            return
+        if record["type"] == "start":
+            self.nodes = record["nodes"]
+            self.state, self.node_context = {}, {}
+
+        for target, key in ((self.state, "state"), (self.node_context, "node_context")):
+            target.update(record[key])
+            for deleted in record[f"deleted_{key}"]:
+                target.pop(deleted, None)
+
+        self.ready = record["ready"]
+        self.running = record.get("running", [])
+        self.exits = record.get("exits", [])
+        self.pending.update(record["pending"])
+        for name, is_live in record["live"].items():
+            if is_live:
+                self.live.add(name)
+            else:
+                self.live.discard(name)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """
+    Replay a checkpoint file.
+
+    A truncated last line, left by a process killed while writing, is
+    ignored: the run resumes from the record before it.
+
+    Raises:
+        CheckpointException: If the file holds no complete run header.
+    """
+    checkpoint = Checkpoint()
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not checkpoint.nodes and record.get("type") != "start":
+                break
+            checkpoint.apply(record)
+            checkpoint.size += len(line)
+
+    if not checkpoint.nodes:
+        raise CheckpointException(f"No checkpoint found in {path}")
+    return checkpoint
+
+
+class Checkpointer:
+    """
+    Append consistent snapshots of a running workflow to a JSONL file.
+
+    The first record holds the full state, node_context and scheduler
+    frontier; each later one only the top-level keys and frontier entries
+    changed since the previous record. The context collects the keys its
+    writes touch in a ChangeSet, and the scheduler the node ids whose
+    pending count or liveness changed in `dirty`, so a checkpoint costs time
+    proportional to what changed, not to the size of the state or graph,
+    and a run costs next to nothing more between checkpoints.
+
+    The scheduler takes a snapshot whenever it settles a node and `due` has
+    passed, even with other nodes still in flight: their ids are recorded
+    and they run again on resume, on top of whatever they had written by
+    then, so nodes must be safe to re-run. Loops keep their index; their
+    collection is re-read from the state on resume. State and node_context
+    must be JSON serializable, and written through the ExecutionContext
+    (`set`, the node_context methods), not by mutating values read from it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        interval: float = DEFAULT_CHECKPOINT_INTERVAL,
+        resume_from: Checkpoint | None = None,
+    ):
+        if interval < 0:
+            raise ValueError("checkpoint interval must not be negative")
+
+        self.path = path
+        self.interval = interval
+        self.resume_from = resume_from
+        self.records = 0
+        # time.monotonic() deadline of the next checkpoint
+        self.due = 0.0
+        # Node ids whose pending count or liveness changed since the last record
+        self.dirty: set[int] = set()
+        # Loop headers whose body the scheduler re-armed since the last record
+        self.rearmed: set[int] = set()
+        self._file = None
+        self._frontier: Any = None
+        self._names: list[str] = []
+        self._loop_in_degree: dict[int, tuple[tuple[int, int], ...]] = {}
+
+    def attach(
+        self,
+        ctx: "ExecutionContext",
+        index: "GraphIndex",
+        ready: deque[int],
+        pending: list[int],
+        live: bytearray,
+        settled: set[tuple[int, int]],
+        running: dict[Any, int],
+    ) -> None:
+        """
+        Start checkpointing a run of the scheduler.
+
+        `ready`, `pending`, `live` and `settled` are the scheduler's
+        frontier, and `running` maps its tasks in flight to node ids; all are
+        read in place at every checkpoint. The scheduler adds the ids of the
+        `pending`/`live` entries it changes to `dirty`, and the loops whose
+        body it re-arms to `rearmed`. When resuming, the
+        frontier is first restored from the checkpoint file, with the nodes
+        that were in flight ready again.
+        """
+        names = self._names = [node.name for node in index.nodes]
+        self._frontier = (ready, running, pending, live, settled)
+        self._loop_in_degree = index.loop_in_degree
+        self.dirty, self.rearmed = set(), set()
+        checkpoint = self.resume_from
+
+        if checkpoint is None:
+            self._file = open(self.path, "w")
+            self._write(
+                {key: materialize(value) for key, value in ctx.state.items()},
+                dict(ctx.node_context),
+                (),
+                (),
+                type="start",
+                nodes=names,
+            )
+        else:
+            if checkpoint.nodes != names:
+                raise CheckpointException(
+                    f"{self.path} was written by a different workflow"
+                )
+            ids = {name: node_id for node_id, name in enumerate(names)}
+            ready.clear()
+            ready.extend(ids[name] for name in (*checkpoint.running, *checkpoint.ready))
+            for name, degree in checkpoint.pending.items():
+                pending[ids[name]] = degree
+            for name in checkpoint.live:
+                live[ids[name]] = 1
+            settled.update((ids[source], ids[target]) for source, target in checkpoint.exits)
+
+            # Drop a record cut short by the process that wrote the file
+            os.truncate(self.path, checkpoint.size)
+            self._file = open(self.path, "a")
+
+        ctx.changes = ChangeSet()
+        self.due = time.monotonic() + self.interval
+
+    def checkpoint(self, ctx: "ExecutionContext") -> None:
+        """
+        Write a checkpoint and set when the next one is due.
+
+        The scheduler calls it once `due` has passed, between two steps; the
+        check is left to the caller so a run pays one comparison per step.
+        """
+        state, node_context, changes = ctx.state, ctx.node_context, ctx.changes
+        self._write(
+            {key: materialize(state[key]) for key in changes.state if key in state},
+            {key: node_context[key] for key in changes.node_context if key in node_context},
+            [key for key in changes.state if key not in state],
+            [key for key in changes.node_context if key not in node_context],
+            type="checkpoint",
+        )
+        changes.state.clear()
+        changes.node_context.clear()
+        self.due = time.monotonic() + self.interval
+
+    def close(self, ctx: "ExecutionContext", completed: bool) -> None:
+        """
+        Stop checkpointing and stop collecting the context's changes.
+
+        A completed run writes its final snapshot and an end record. A failed
+        one writes nothing more: resuming continues from the last checkpoint.
+        """
+        if self._file is None:
+            return
+        try:
+            if completed:
+                self.checkpoint(ctx)
+                self._file.write(json.dumps({"type": "end"}) + "\n")
+        finally:
+            ctx.changes = None
+            self._file.close()
+            self._file = None
+
+    def _write(self, state, node_context, deleted_state, deleted_node_context, **record) -> None:
+        ready, running, pending, live, settled = self._frontier
+        names = self._names
+        for header in self.rearmed:
+            self.dirty.update(body_id for body_id, _ in self._loop_in_degree[header])
+        dirty = sorted(self.dirty)
+
+        record.update(
+            state=state,
+            node_context={key: _node_context(value) for key, value in node_context.items()},
+            deleted_state=list(deleted_state),
+            deleted_node_context=list(deleted_node_context),
+            ready=[names[node_id] for node_id in ready],
+            running=[names[node_id] for node_id in running.values()],
+            pending={names[node_id]: pending[node_id] for node_id in dirty},
+            live={names[node_id]: live[node_id] for node_id in dirty},
+            exits=[[names[source], names[target]] for source, target in sorted(settled)],
+        )
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        self.dirty.clear()
+        self.rearmed.clear()
+        self.records += 1
@@ -0,0 +1,483 @@
+"""
+Compile a workflow into one generated Python coroutine function.
+
+Graphs whose runs follow a single path (no node routes to several nodes at
+once) are turned into straight-line code: `if` nodes become `if`/`else`
+statements that rejoin at their immediate post-dominator, sequential `for`
+loops become `while` loops over the same cursor the ForLoopNode uses, and
+set nodes call their compiled field paths directly. Other nodes with a
+single unconditional connection (collection, http, parallel for) are
+called through `execute_async` inside the generated code.
+
+Anything else, e.g. a fan-out whose branches the scheduler runs
+concurrently, a cycle that is not a for loop, a node with a deadline or an
+unknown node type with its own routing, makes the whole workflow fall back
+to the interpreter.
+
+Generated sources only refer to nodes by their GraphIndex id, so they can be
+cached on disk by definition hash and reused by any process building the
+same definition.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import TYPE_CHECKING
+
+from nodes.assignment import SetNode
+from nodes.base import BaseNode
+from nodes.condition import ConditionNode
+from nodes.fused import FusedNode
+from nodes.loop import _EXHAUSTED, EndLoopNode, ForLoopNode, _pull
+from workflows.context import ExecutionContext
+
+if TYPE_CHECKING:
+    from workflows.base import Workflow
+
+# Bump whenever generated code changes, so stale disk caches are ignored
+CODEGEN_VERSION = 2
+
+# Generated statements allowed per node before giving up: joins that are not
+# post-dominators duplicate the code after them
+_STATEMENTS_PER_NODE = 50
+
+_END = -1  # Virtual node after every end of the run
+
+
+class _Unsupported(Exception):
+    """The graph cannot be compiled; the message says why."""
+
+
+class CompiledWorkflow:
+    """
+    A workflow compiled by `Workflow.compile`.
+
+    Attributes:
+        workflow: The workflow it was compiled from.
+        source: The generated source, or None when falling back.
+        fallback_reason: Why the interpreter runs instead, or None.
+        from_cache: True when the source was read from the disk cache.
+    """
+
+    def __init__(
+        self,
+        workflow: "Workflow",
+        source: str | None,
+        fallback_reason: str | None = None,
+        from_cache: bool = False,
+    ):
+        self.workflow = workflow
+        self.source = source
+        self.fallback_reason = fallback_reason
+        self.from_cache = from_cache
+        self._run = None
+        if source is not None:
+            namespace = {
+                "N": workflow.index.nodes,
+                "EXHAUSTED": _EXHAUSTED,
+                "pull": _pull,
+            }
+            exec(compile(source, f"<workflow {workflow.name!r}>", "exec"), namespace)
+            self._run = namespace["run"]
+
+    @property
+    def compiled(self) -> bool:
+        return self._run is not None
+
+    async def execute_async(
+        self,
+        ctx: ExecutionContext | None = None,
+        state: dict | None = None,
+        config: dict | None = None,
+    ) -> ExecutionContext:
+        """
+        Run the workflow, like `Workflow.execute_async` without scheduler options.
+
+        Args:
+            ctx: Optional ExecutionContext. If not provided, one will be created.
+            state: Optional initial state (used if ctx is not provided).
+            config: Optional config (used if ctx is not provided).
+
+        Returns:
+            The ExecutionContext after workflow completion.
+        """
+        if self._run is None:
+            return await self.workflow.execute_async(ctx, state, config)
+
+        if ctx is None:
+            ctx = ExecutionContext(state=state or {}, config=config or {})
+        self.workflow._apply_patch(ctx)
+        await self._run(ctx)
+        return ctx
+
+
+def compile_workflow(workflow: "Workflow", cache_dir: str | None = None) -> CompiledWorkflow:
+    """
+    Generate, or load from `cache_dir`, the code of a workflow.
+
+    The disk cache is keyed by the workflow's definition hash, so it is only
+    used for workflows built by WorkflowBuilder.
+    """
+    path = None
+    if cache_dir is not None and workflow.definition_hash is not None:
+        key = f"{CODEGEN_VERSION}:{workflow.definition_hash}"
+        path = os.path.join(cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".py")
+        try:
+            with open(path) as file:
+                source = file.read()
+        except FileNotFoundError:
+            pass
+        else:
+            try:
+                compiled = CompiledWorkflow(workflow, source, from_cache=True)
+            except Exception:
+                pass  # Unreadable or stale: generate it again
+            else:
+                if compiled._run is not None and _node_count(source) == len(workflow.index):
+                    return compiled
+
+    try:
+        source = _Generator(workflow).generate()
+        compiled = CompiledWorkflow(workflow, source)
+    except _Unsupported as error:
+        return CompiledWorkflow(workflow, None, str(error))
+    except (SyntaxError, RecursionError, MemoryError) as error:
+        # e.g. nesting deeper than the Python compiler accepts
+        return CompiledWorkflow(workflow, None, f"generated code does not compile: {error!r}")
+
+    if path is not None:
+        _write_atomic(path, source)
+    return compiled
+
+
+def _node_count(source: str) -> int | None:
+    for line in source.splitlines():
+        if line.startswith("NODE_COUNT = "):
+            return int(line.removeprefix("NODE_COUNT = "))
+    return None
+
+
+def _write_atomic(path: str, source: str) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as file:
+            file.write(source)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def _routes_unconditionally(node: BaseNode) -> bool:
+    return type(node).next_nodes is BaseNode.next_nodes
+
+
+class _Generator:
+    def __init__(self, workflow: "Workflow"):
+        self.workflow = workflow
+        self.index = workflow.index
+        self.nodes = self.index.nodes
+        self.ids = self.index.ids
+        self.lines: list[str] = []
+        self.bindings: dict[str, str] = {}  # Global name -> expression over N
+        self.budget = _STATEMENTS_PER_NODE * len(self.nodes) + 1000
+        # Expression reaching each node, including the nodes of fused chains,
+        # and the suffix of the global names bound to its attributes
+        self.refs: dict[BaseNode, tuple[str, str]] = {}
+        for node_id, node in enumerate(self.nodes):
+            self.refs[node] = (f"N[{node_id}]", str(node_id))
+            if isinstance(node, FusedNode):
+                for position, inner in enumerate(node.nodes):
+                    self.refs[inner] = (f"N[{node_id}].nodes[{position}]", f"{node_id}_{position}")
+        self.loop_ends: dict[ForLoopNode, EndLoopNode] = {}
+
+    def generate(self) -> str:
+        index = self.index
+        if len(index.start) > 1:
+            raise _Unsupported("several start nodes run concurrently")
+        if index.deadlines:
+            raise _Unsupported("deadlines need the scheduler")
+        start = self.nodes[index.start[0]] if index.start else None
+        # Nodes the generated code runs; parallel loop bodies run in their loop node
+        self.reached = self._region(start, None)
+        self._check_loops()
+        self.ipdom = self._post_dominators()
+        self._emit(start, None, None, 1)
+        if not self.lines:
+            self._line(1, "pass")
+
+        header = [
+            f"# Generated for workflow {self.workflow.name!r} "
+            f"(definition {self.workflow.definition_hash})",
+            f"NODE_COUNT = {len(self.nodes)}",
+        ]
+        bindings = [f"{name} = {expression}" for name, expression in self.bindings.items()]
+        return "\n".join([*header, *bindings, "", "", "async def run(ctx):", *self.lines, ""])
+
+    # Graph checks
+
+    def _successors(self, node: BaseNode) -> tuple[BaseNode | None, ...]:
+        """Where a run continues after `node`; None ends the run. Loop bodies are separate."""
+        if isinstance(node, FusedNode):
+            tail = node.nodes[-1]
+            if isinstance(tail, ConditionNode):
+                return (tail.true_node, tail.false_node)
+            node = tail
+        if isinstance(node, ConditionNode):
+            return (node.true_node, node.false_node)
+        if isinstance(node, ForLoopNode):
+            return (node.exit_node,)
+        if isinstance(node, EndLoopNode):
+            return ()  # Ends an iteration
+        if not _routes_unconditionally(node):
+            raise _Unsupported(f"node {node.name!r} ({node.type}) has its own routing")
+        if len(node.connections) > 1:
+            raise _Unsupported(f"node {node.name!r} fans out to concurrent branches")
+        return (node.connections[0].to,) if node.connections else (None,)
+
+    def _check_loops(self) -> None:
+        index = self.index
+        for source, target in index.back_edges:
+            header, end = self.nodes[target], self.nodes[source]
+            if not (
+                isinstance(header, ForLoopNode)
+                and isinstance(end, EndLoopNode)
+                and [conn.to for conn in end.connections] == [header]
+            ):
+                raise _Unsupported(f"cycle through {header.name!r} is not a for loop")
+            if self.loop_ends.setdefault(header, end) is not end:
+                raise _Unsupported(f"loop {header.name!r} has several end_loop nodes")
+
+        for header, end in self.loop_ends.items():
+            if header.parallel or header not in self.reached:
+                continue  # Runs its own body, like any other node
+            # The scheduler holds a body node that also follows the loop exit
+            # until the loop is done, i.e. not within the iteration
+            body = self._region(header.body_node, end)
+            if not body.isdisjoint(self._region(header.exit_node, None)):
+                raise _Unsupported(f"body of loop {header.name!r} is not structured")
+
+    def _region(self, start: BaseNode | None, stop: BaseNode | None) -> set[BaseNode]:
+        """Nodes reachable from `start`, through loop bodies too, up to `stop`."""
+        seen: set[BaseNode] = set()
+        pending = [start]
+        while pending:
+            node = pending.pop()
+            if node is None or node is stop or node in seen:
+                continue
+            seen.add(node)
+            if isinstance(node, ForLoopNode) and not node.parallel:
+                pending.append(node.body_node)
+            if not isinstance(node, EndLoopNode):
+                pending.extend(self._successors(node))
+        return seen
+
+    def _post_dominators(self) -> dict[BaseNode, BaseNode | None]:
+        """
+        Immediate post-dominator of every node, None for the end of the run.
+
+        Cooper-Harvey-Kennedy dominators on the reversed successor graph,
+        which is acyclic: back edges end at end_loop nodes.
+        """
+        nodes = [node for node in self.nodes if node in self.reached]
+        ids = {node: node_id for node_id, node in enumerate(nodes)}
+        successors = []
+        for node in nodes:
+            targets = []
+            for target in self._successors(node):
+                target_id = _END if target is None else ids.get(target)
+                if target_id is None:
+                    raise _Unsupported(f"node {node.name!r} routes outside the workflow")
+                targets.append(target_id)
+            successors.append(targets or [_END])
+
+        predecessors: list[list[int]] = [[] for _ in nodes]
+        end_predecessors = []
+        for node_id, targets in enumerate(successors):
+            for target in targets:
+                (end_predecessors if target == _END else predecessors[target]).append(node_id)
+
+        # Postorder of the reversed graph from the virtual end
+        order: dict[int, int] = {}
+        visited = {_END}
+        stack = [(_END, iter(end_predecessors))]
+        while stack:
+            node_id, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                order[node_id] = len(order)
+            elif child not in visited:
+                visited.add(child)
+                stack.append((child, iter(predecessors[child])))
+
+        idom = {_END: _END}
+
+        def intersect(a: int, b: int) -> int:
+            while a != b:
+                while order[a] < order[b]:
+                    a = idom[a]
+                while order[b] < order[a]:
+                    b = idom[b]
+            return a
+
+        reverse_postorder = sorted(order, key=order.get, reverse=True)
+        changed = True
+        while changed:
+            changed = False
+            for node_id in reverse_postorder:
+                if node_id == _END:
+                    continue
+                new = None
+                for target in successors[node_id]:
+                    if target in idom:
+                        new = target if new is None else intersect(target, new)
+                if idom.get(node_id) != new:
+                    idom[node_id] = new
+                    changed = True
+
+        return {
+            nodes[node_id]: None if dominator == _END else nodes[dominator]
+            for node_id, dominator in idom.items()
+            if node_id != _END
+        }
+
+    # Code generation
+
+    def _line(self, indent: int, code: str) -> None:
+        self.budget -= 1
+        if self.budget < 0:
+            raise _Unsupported("generated code would be too large")
+        self.lines.append("    " * indent + code)
+
+    def _bind(self, name: str, expression: str) -> str:
+        self.bindings[name] = expression
+        return name
+
+    def _emit(
+        self, node: BaseNode | None, stop: BaseNode | None, loop: ForLoopNode | None, indent: int
+    ) -> None:
+        """Code of the run from `node` until it reaches `stop`."""
+        while True:
+            if node is None:
+                if indent > 1:
+                    self._line(indent, "return")
+                return
+            if node is stop:
+                return
+
+            vertex = node
+            if isinstance(node, FusedNode):
+                for inner in node.nodes[:-1]:
+                    self._step(inner, indent)
+                node = node.nodes[-1]
+
+            if isinstance(node, EndLoopNode):
+                if loop is None or self.loop_ends.get(loop) is not node:
+                    raise _Unsupported(f"{node.name!r} is reached outside of its loop")
+                self._line(indent, f"nc{self.ids[loop]}[{ForLoopNode.LOOP_INDEX_KEY!r}] += 1")
+                self._line(indent, "continue")
+                return
+
+            if isinstance(node, ConditionNode):
+                after = self.ipdom[vertex]
+                self._line(indent, f"if {self._condition(node)}:")
+                self._branch(node.true_node, after, loop, indent + 1)
+                self._line(indent, "else:")
+                self._branch(node.false_node, after, loop, indent + 1)
+                if after is None:
+                    return
+                node = after
+                continue
+
+            if isinstance(node, ForLoopNode) and not node.parallel:
+                self._loop(node, indent)
+                node = node.exit_node
+                continue
+
+            self._step(node, indent)
+            (node,) = self._successors(node)
+
+    def _branch(
+        self, node: BaseNode | None, stop: BaseNode | None, loop: ForLoopNode | None, indent: int
+    ) -> None:
+        start = len(self.lines)
+        # A branch routing nowhere ends the run, even when nothing follows the if
+        if node is not stop or node is None:
+            self._emit(node, stop, loop, indent)
+        if len(self.lines) == start:
+            self._line(indent, "pass")
+
+    def _condition(self, node: ConditionNode) -> str:
+        ref, suffix = self.refs[node]
+        if node.memo is not None:
+            return f"{self._bind(f'matches{suffix}', f'{ref}.matches')}(ctx)"
+        return f"{self._bind(f'condition{suffix}', f'{ref}.evaluator')}(ctx.data_view())"
+
+    def _step(self, node: BaseNode, indent: int) -> None:
+        """Execute a node without routing."""
+        ref, name = self.refs[node]
+        if isinstance(node, ConditionNode):
+            return  # Conditions only route
+
+        if isinstance(node, SetNode) and node.variable_path is not None:
+            target = self._bind(f"set{name}", f"{ref}.variable_path.set")
+            value = self._bind(f"value{name}", f"{ref}.value")
+            if node.value_path is not None:
+                get = self._bind(f"get{name}", f"{ref}.value_path.get")
+                value = f"{get}(ctx, {value})"
+            self._line(indent, f"{target}(ctx, {value})")
+            return
+
+        # Interpreted, e.g. collection and http nodes
+        self._line(indent, f"await {self._bind(f'node{name}', ref)}.execute_async(ctx)")
+
+    def _loop(self, node: ForLoopNode, indent: int) -> None:
+        """A sequential for loop, the way ForLoopNode and EndLoopNode step through it."""
+        loop_id = self.ids[node]
+        loop = self._bind(f"loop{loop_id}", self.refs[node][0])
+        # Locals of run()
+        context, index, items, item = (f"{name}{loop_id}" for name in ("nc", "i", "seq", "item"))
+        keys = {
+            key: repr(value)
+            for key, value in (
+                ("index", ForLoopNode.LOOP_INDEX_KEY),
+                ("collection", ForLoopNode.LOOP_COLLECTION_KEY),
+                ("iterator", ForLoopNode.LOOP_ITERATOR_KEY),
+                ("item", ForLoopNode.ITEM_KEY),
+                ("position", ForLoopNode.INDEX_KEY),
+            )
+        }
+        name = repr(node.name)
+
+        self._line(indent, f"{context} = ctx.get_node_context({name})")
+        self._line(indent, f"if {keys['index']} not in {context}:")
+        self._line(indent + 1, f"ctx.set_node_context({name}, {{{keys['index']}: 0}})")
+        self._line(indent + 1, f"{context} = ctx.get_node_context({name})")
+        self._line(
+            indent, f"if {keys['collection']} not in {context} and {keys['iterator']} not in {context}:"
+        )
+        self._line(
+            indent + 1,
+            f"{context}.update(await {loop}._resume_cursor(ctx, {context}[{keys['index']}]))",
+        )
+        self._line(indent, "while True:")
+        body = indent + 1
+        self._line(body, f"{index} = {context}[{keys['index']}]")
+        self._line(body, f"{items} = {context}.get({keys['collection']})")
+        self._line(body, f"if {items} is not None:")
+        self._line(body + 1, f"{item} = {items}[{index}] if {index} < len({items}) else EXHAUSTED")
+        self._line(body, "else:")
+        self._line(body + 1, f"{item} = await pull({context}[{keys['iterator']}])")
+        self._line(body, f"if {item} is EXHAUSTED:")
+        self._line(body + 1, "break")
+        self._line(body, f"{context}[{keys['item']}] = {item}")
+        self._line(body, f"{context}[{keys['position']}] = {index}")
+        if node.iterator_var:
+            self._line(body, f"{self._bind(f'item_path{loop_id}', f'{loop}.iterator_path')}.set(ctx, {item})")
+        if node.index_var:
+            self._line(body, f"{self._bind(f'index_path{loop_id}', f'{loop}.index_path')}.set(ctx, {index})")
+        self._emit(node.body_node, None, node, body)
+        self._line(indent, f"ctx.clear_node_context({name})")
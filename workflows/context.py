@@ -1,31 +1,23 @@
+from collections import ChainMap
 from dataclasses import dataclass, field
 from typing import Any
 
+from workflows.exception import MergeConflictException
+from workflows.overlay import MergePolicy, Overlay
+from workflows.path import FieldPath, compile_path
 
-def _get_nested(data: dict, keys: list[str], default: Any = None) -> Any:
-    """Navigate nested dict/list structure using key path."""
-    try:
-        for key in keys:
-            try:
-                data = data[key]
-            except TypeError:
-                # Handle list index access
-                data = data[int(key)]
-        return data
-    except (KeyError, TypeError, ValueError, IndexError):
-        return default
 
+class ChangeSet:
+    """Top-level state keys and node names written since the set was last cleared."""
 
-def _set_nested(data: dict, keys: list[str], value: Any) -> None:
-    """Set a value in nested dict structure, creating intermediate dicts as needed."""
-    for key in keys[:-1]:
-        if key not in data:
-            data[key] = {}
-        data = data[key]
-    data[keys[-1]] = value
+    __slots__ = ("state", "node_context")
 
+    def __init__(self):
+        self.state: set[str] = set()
+        self.node_context: set[str] = set()
 
-@dataclass
+
+@dataclass(slots=True)
 class ExecutionContext:
     """
     Context object passed to nodes during workflow execution.
@@ -34,6 +26,13 @@ class ExecutionContext:
         state: Mutable workflow state that persists across all nodes.
         config: Immutable configuration (global + workflow level).
         node_context: Data generated by nodes, keyed by node name.
+        changes: When set (e.g. by a checkpointer), collects the top-level
+            keys written through `set`, the node_context methods and `merge`.
+            A node's context is counted as written whenever it is read with
+            `get_node_context`, since callers update it in place.
+
+    In a context created by `fork()`, state and node_context are copy-on-write
+    `Overlay` mappings over the parent's.
 
     Field path format for get():
         - state.<path>: Get from state (e.g., "state.user.name")
@@ -44,13 +43,15 @@ class ExecutionContext:
     state: dict = field(default_factory=dict)
     config: dict = field(default_factory=dict)
     node_context: dict[str, dict] = field(default_factory=dict)
+    changes: ChangeSet | None = field(default=None, repr=False, compare=False)
 
     def get(self, path: Any, default: Any = None) -> Any:
         """
         Extract a value using field path notation.
 
         Args:
-            path: Field path in format "source.key1.key2..." or a literal value.
+            path: Field path in format "source.key1.key2...", a compiled
+                  FieldPath, or a literal value.
                   - "state.*" → get from state
                   - "config.*" → get from config
                   - "<node_name>.*" → get from node_context[node_name]
@@ -61,72 +62,103 @@ class ExecutionContext:
         Returns:
             The value at the path, or default if not found.
         """
-        # Non-string values are treated as literals
-        if not isinstance(path, str):
+        if isinstance(path, str):
+            path = compile_path(path)
+        elif not isinstance(path, FieldPath):
+            # Non-string values are treated as literals
             return path
 
-        if not path:
-            return default
-
-        parts = path.split(".")
-        if len(parts) < 1:
-            return default
-
-        source = parts[0]
-        remaining = parts[1:]
-
-        if source == "state":
-            if not remaining:
-                return self.state
-            return _get_nested(self.state, remaining, default)
-
-        if source == "config":
-            if not remaining:
-                return self.config
-            return _get_nested(self.config, remaining, default)
+        return path.get(self, default)
 
-        # Check if it's a node name in node_context
-        if source in self.node_context:
-            node_data = self.node_context[source]
-            if not remaining:
-                return node_data
-            return _get_nested(node_data, remaining, default)
-
-        # Fallback: treat entire path as state lookup for backward compatibility
-        result = _get_nested(self.state, parts, None)
-        if result is not None:
-            return result
-
-        return default
-
-    def set(self, path: str, value: Any) -> None:
+    def set(self, path: str | FieldPath, value: Any) -> None:
         """
         Set a value in the state using field path notation.
 
         Args:
-            path: Field path for state (e.g., "user.name" or "state.user.name")
+            path: Field path for state (e.g., "user.name" or "state.user.name"),
+                  or a compiled FieldPath.
             value: The value to set.
 
         Raises:
             ValueError: If trying to set config (immutable).
         """
-        if not path:
-            return
+        if not isinstance(path, FieldPath):
+            if not path:
+                return
+            path = compile_path(path)
+
+        path.set(self, value)
+
+    def data_view(self) -> ChainMap:
+        """
+        Get a read-only view combining node_context and state.
 
-        parts = path.split(".")
+        Lookups check node_context first, then state, matching the precedence
+        of `{**state, **node_context}` without copying either dict. Callers
+        must not write through the view.
 
-        # Handle "state.x.y" format
-        if parts[0] == "state":
-            parts = parts[1:]
+        Returns:
+            A ChainMap over node_context and state.
+        """
+        return ChainMap(self.node_context, self.state)
+
+    def fork(self) -> "ExecutionContext":
+        """
+        Create a copy-on-write child context in O(1).
+
+        The child's state and node_context are overlays: reads fall through to
+        this context, writes stay in the child until `merge` is called.
+        Config is shared.
+
+        Returns:
+            The forked ExecutionContext.
+        """
+        return ExecutionContext(
+            state=Overlay(self.state),
+            config=self.config,
+            node_context=Overlay(self.node_context),
+        )
+
+    def merge(
+        self,
+        child: "ExecutionContext",
+        policy: MergePolicy | str = MergePolicy.CHILD_WINS,
+    ) -> None:
+        """
+        Apply the writes of a context forked from this one.
 
-        if not parts:
-            return
+        Runs in time proportional to the keys the child touched. A key is in
+        conflict when this context changed it after the child did.
 
-        # Check if trying to set config
-        if parts[0] == "config":
-            raise ValueError("Cannot modify config - it is immutable")
+        Args:
+            child: A context returned by `fork()` on this context.
+            policy: "child_wins", "parent_wins" or "error" on conflicts.
 
-        _set_nested(self.state, parts, value)
+        Raises:
+            ValueError: If `child` was not forked from this context.
+            MergeConflictException: With the "error" policy, if any key
+                conflicts. Nothing is merged in that case.
+        """
+        overlays = (child.state, child.node_context)
+        if not all(isinstance(overlay, Overlay) for overlay in overlays) or (
+            child.state.parent is not self.state
+            or child.node_context.parent is not self.node_context
+        ):
+            raise ValueError("Can only merge a context forked from this one")
+
+        policy = MergePolicy(policy)
+        if policy is MergePolicy.ERROR:
+            conflicts = [
+                *child.state.conflicts("state."),
+                *child.node_context.conflicts(),
+            ]
+            if conflicts:
+                raise MergeConflictException(conflicts)
+        for overlay in overlays:
+            overlay.merge(policy)
+        if self.changes is not None:
+            self.changes.state.update(child.state.base)
+            self.changes.node_context.update(child.node_context.base)
 
     def set_node_context(self, node_name: str, data: dict) -> None:
         """
@@ -137,6 +169,8 @@ class ExecutionContext:
             data: The context data to store.
         """
         self.node_context[node_name] = data
+        if self.changes is not None:
+            self.changes.node_context.add(node_name)
 
     def update_node_context(self, node_name: str, key: str, value: Any) -> None:
         """
@@ -150,6 +184,8 @@ class ExecutionContext:
         if node_name not in self.node_context:
             self.node_context[node_name] = {}
         self.node_context[node_name][key] = value
+        if self.changes is not None:
+            self.changes.node_context.add(node_name)
 
     def get_node_context(self, node_name: str) -> dict:
         """
@@ -161,6 +197,8 @@ class ExecutionContext:
         Returns:
             The node's context data, or empty dict if not found.
         """
+        if self.changes is not None:
+            self.changes.node_context.add(node_name)
         return self.node_context.get(node_name, {})
 
     def clear_node_context(self, node_name: str) -> None:
@@ -171,3 +209,5 @@ class ExecutionContext:
             node_name: The name of the node.
         """
         self.node_context.pop(node_name, None)
+        if self.changes is not None:
+            self.changes.node_context.add(node_name)
@@ -4,3 +4,31 @@ class CreateNodeException(Exception):
     def __init__(self, errors: list[str], *args):
         super().__init__(*args)
         self.errors = errors
+
+
+class MergeConflictException(Exception):
+    """Raised when merging a forked context whose keys also changed in the parent."""
+
+    conflicts: list[str]
+
+    def __init__(self, conflicts: list[str], *args):
+        super().__init__(f"Merge conflict on: {', '.join(conflicts)}", *args)
+        self.conflicts = conflicts
+
+
+class CheckpointException(Exception):
+    """Raised when a checkpoint file cannot be resumed by a workflow."""
+
+
+class DeadlineExceededException(TimeoutError):
+    """Raised when a run, or a node with a `deadline` parameter, runs out of time."""
+
+    nodes: list[str]
+
+    def __init__(self, nodes: list[str], *args):
+        super().__init__(f"Deadline exceeded, cancelled: {', '.join(nodes)}", *args)
+        self.nodes = nodes
+
+
+class ArtifactException(Exception):
+    """Raised when a file cannot be loaded as a workflow artifact."""
@@ -0,0 +1,281 @@
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+
+from nodes.base import BaseNode
+
+
+@dataclass(frozen=True)
+class Adjacency:
+    """
+    CSR adjacency: the targets of node `i` are `targets[offsets[i]:offsets[i + 1]]`.
+    """
+
+    offsets: array
+    targets: array
+
+    def __getitem__(self, node_id: int) -> array:
+        return self.targets[self.offsets[node_id] : self.offsets[node_id + 1]]
+
+    def degree(self, node_id: int) -> int:
+        return self.offsets[node_id + 1] - self.offsets[node_id]
+
+
+@dataclass(frozen=True)
+class LoopInfo:
+    """
+    A cycle closed by a back edge.
+
+    Attributes:
+        header: Id of the back-edge target (the `for` node of a loop).
+        end: Id of the back-edge source (the `end_loop` node of a loop).
+        body: Ids of the natural loop: the header plus every node that reaches
+            `end` without passing through the header.
+        is_for_loop: True when header/end form a `for`/`end_loop` pair.
+    """
+
+    header: int
+    end: int
+    body: frozenset[int]
+    is_for_loop: bool
+
+
+def _csr(count: int, edges: Sequence[tuple[int, int]]) -> Adjacency:
+    """Counting sort of (source, target) edges into CSR form, keeping edge order."""
+    offsets = array("q", bytes(8 * (count + 1)))
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    targets = array("q", bytes(8 * len(edges)))
+    cursor = array("q", offsets[:-1])
+    for source, target in edges:
+        targets[cursor[source]] = target
+        cursor[source] += 1
+    return Adjacency(offsets, targets)
+
+
+class GraphIndex:
+    """
+    Immutable, integer-indexed view of a workflow graph.
+
+    Built once by WorkflowBuilder; the scheduler and tooling read graph
+    structure from here instead of following `node.connections` at runtime.
+    Building is linear in the number of nodes and connections.
+
+    Attributes:
+        nodes: Nodes in id order.
+        ids: Node -> id.
+        names: Node name -> id.
+        labels: Connection label of each label code.
+        adjacency: CSR adjacency over all connections.
+        edge_labels: Label code of each edge, parallel to `adjacency.targets`.
+        by_label: CSR adjacency restricted to each label.
+        predecessors: Reverse CSR adjacency over all connections.
+        in_degree: Number of incoming connections of each node.
+        start: Ids of the start nodes.
+        reachable: 1 for every node reachable from the start nodes.
+        back_edges: (source, target) id pairs closing a cycle.
+        forward: Distinct non back-edge successors of each node.
+        forward_in_degree: Distinct reachable forward predecessors of each node.
+        loops: Loops keyed by header id, merged when a header has several back edges.
+        loop_exits: Forward edges leaving each loop, keyed by the header of the
+            outermost loop they leave. They are settled once, when it exits.
+        exit_targets: Targets of each node's loop-leaving edges.
+        exit_resets: Loop-leaving edges into each loop's body, keyed by header,
+            settled again in every iteration.
+        deadlines: Seconds allowed per step, for the nodes with a `deadline`.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[BaseNode],
+        start_nodes: Iterable[BaseNode] | None = None,
+        closed: bool = True,
+    ):
+        """
+        Args:
+            nodes: The nodes of the graph, already linked.
+            start_nodes: Entry points. Defaults to nodes without incoming connections.
+            closed: When False, connections to nodes outside `nodes` are
+                dropped instead of rejected, e.g. to index a loop body.
+        """
+        self.nodes: tuple[BaseNode, ...] = tuple(nodes)
+        self.ids: dict[BaseNode, int] = {node: i for i, node in enumerate(self.nodes)}
+        self.names: dict[str, int] = {node.name: i for i, node in enumerate(self.nodes)}
+        count = len(self.nodes)
+
+        label_codes: dict[str, int] = {}
+        edges: list[tuple[int, int]] = []
+        edge_labels = array("b")
+        for source, node in enumerate(self.nodes):
+            for conn in node.connections:
+                target = self.ids.get(conn.to)
+                if target is None and not closed:
+                    continue
+                if target is None:
+                    raise ValueError(
+                        f"Connection from {node.name} targets a node outside the workflow."
+                    )
+                edges.append((source, target))
+                edge_labels.append(label_codes.setdefault(str(conn.label), len(label_codes)))
+
+        self.labels: tuple[str, ...] = tuple(label_codes)
+        self.adjacency = _csr(count, edges)
+        # Edges are emitted in source order, so labels already line up with targets
+        self.edge_labels = edge_labels
+        self.by_label: dict[str, Adjacency] = {
+            label: _csr(count, [e for e, c in zip(edges, edge_labels) if c == code])
+            for label, code in label_codes.items()
+        }
+        self.predecessors = _csr(count, [(target, source) for source, target in edges])
+        self.in_degree = array(
+            "q", (self.predecessors.degree(i) for i in range(count))
+        )
+
+        if start_nodes is None:
+            self.start: tuple[int, ...] = tuple(
+                i for i in range(count) if self.in_degree[i] == 0
+            )
+        else:
+            self.start = tuple(self.ids[node] for node in start_nodes)
+
+        self._classify_edges(count)
+        self._find_loops()
+        self.deadlines: dict[int, float] = {
+            i: node.deadline for i, node in enumerate(self.nodes) if node.deadline is not None
+        }
+
+    def _classify_edges(self, count: int) -> None:
+        distinct = [tuple(dict.fromkeys(self.adjacency[i])) for i in range(count)]
+
+        # Iterative DFS from the start nodes: an edge to a node still on the
+        # stack closes a cycle
+        reachable = bytearray(count)
+        on_stack = bytearray(count)
+        back_edges: set[tuple[int, int]] = set()
+        for start in self.start:
+            if reachable[start]:
+                continue
+            reachable[start] = on_stack[start] = 1
+            stack = [(start, iter(distinct[start]))]
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    on_stack[node] = 0
+                elif on_stack[child]:
+                    back_edges.add((node, child))
+                elif not reachable[child]:
+                    reachable[child] = on_stack[child] = 1
+                    stack.append((child, iter(distinct[child])))
+
+        self.reachable = bytes(reachable)
+        self.back_edges: frozenset[tuple[int, int]] = frozenset(back_edges)
+        self.forward: tuple[tuple[int, ...], ...] = tuple(
+            tuple(t for t in distinct[i] if (i, t) not in back_edges) if reachable[i] else ()
+            for i in range(count)
+        )
+
+        forward_in_degree = array("q", bytes(8 * count))
+        for targets in self.forward:
+            for target in targets:
+                forward_in_degree[target] += 1
+        self.forward_in_degree = forward_in_degree
+
+    def _find_loops(self) -> None:
+        back_sources: dict[int, list[int]] = {}
+        for source, header in self.back_edges:
+            back_sources.setdefault(header, []).append(source)
+
+        self.loops: dict[int, LoopInfo] = {}
+        for header, sources in sorted(back_sources.items()):
+            body = {header}
+            pending = list(sources)
+            while pending:
+                node = pending.pop()
+                if node in body or not self.reachable[node]:
+                    continue
+                body.add(node)
+                pending.extend(
+                    pred for pred in self.predecessors[node] if (pred, node) not in self.back_edges
+                )
+                pending.extend(back_sources.get(node, ()))
+
+            end = min(sources)
+            self.loops[header] = LoopInfo(
+                header=header,
+                end=end,
+                body=frozenset(body),
+                is_for_loop=self.nodes[header].type == "for"
+                and all(self.nodes[s].type == "end_loop" for s in sources),
+            )
+
+        # Forward in-degree counting only predecessors inside each loop body,
+        # used to re-arm joins at the start of every iteration
+        self.loop_in_degree: dict[int, tuple[tuple[int, int], ...]] = {}
+        for header, loop in self.loops.items():
+            degrees = dict.fromkeys(loop.body, 0)
+            for node in loop.body:
+                for target in self.forward[node]:
+                    if target in degrees:
+                        degrees[target] += 1
+            self.loop_in_degree[header] = tuple(degrees.items())
+
+        # Edges from a loop body to a node outside it: routed or not in
+        # every iteration, they count once, for the outermost loop they leave
+        owners: dict[tuple[int, int], int] = {}
+        for header, loop in self.loops.items():
+            for node in loop.body:
+                for target in self.forward[node]:
+                    if target in loop.body:
+                        continue
+                    owner = owners.get((node, target))
+                    if owner is None or len(self.loops[owner].body) < len(loop.body):
+                        owners[(node, target)] = header
+
+        loop_exits: dict[int, list[tuple[int, int]]] = {}
+        exit_targets: list[set[int]] = [set() for _ in self.nodes]
+        for edge, header in sorted(owners.items()):
+            loop_exits.setdefault(header, []).append(edge)
+            exit_targets[edge[0]].add(edge[1])
+        self.loop_exits: dict[int, tuple[tuple[int, int], ...]] = {
+            header: tuple(edges) for header, edges in loop_exits.items()
+        }
+        self.exit_targets: tuple[frozenset[int], ...] = tuple(map(frozenset, exit_targets))
+        self.exit_resets: dict[int, tuple[tuple[int, int], ...]] = {
+            header: tuple(edge for edge in sorted(owners) if edge[1] in loop.body)
+            for header, loop in self.loops.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def start_nodes(self) -> list[BaseNode]:
+        return [self.nodes[i] for i in self.start]
+
+    def successors(self, node_id: int, label: str | None = None) -> array:
+        """Ids of the targets of a node's connections, optionally for one label."""
+        if label is None:
+            return self.adjacency[node_id]
+        adjacency = self.by_label.get(label)
+        return adjacency[node_id] if adjacency else array("q")
+
+    def is_back_edge(self, source: int, target: int) -> bool:
+        return (source, target) in self.back_edges
+
+    def reachable_from(self, node_ids: Iterable[int]) -> bytearray:
+        """Mark every node reachable from the given ids (inclusive), in linear time."""
+        seen = bytearray(len(self.nodes))
+        pending = list(node_ids)
+        for node in pending:
+            seen[node] = 1
+        while pending:
+            node = pending.pop()
+            for target in self.adjacency[node]:
+                if not seen[target]:
+                    seen[target] = 1
+                    pending.append(target)
+        return seen
@@ -0,0 +1,238 @@
+"""
+Incremental re-execution of a workflow run.
+
+A recorded run executes every node step on a fork of the context whose
+top-level mappings record the keys the step reads; the fork's changes are
+its writes. Every write gets a version number, and every step remembers
+the version of each key it read, the values it wrote and where it routed.
+
+Re-executing the run with a few changed initial keys replays the same
+scheduler. A step whose every read still sees the value the recorded step
+saw (same version, or an equal value written by a re-executed step) is not
+executed: its recorded writes and routing are applied instead. Everything
+else, i.e. what the changed keys transitively affect, runs again. Nodes
+are assumed to be deterministic functions of the context they read.
+"""
+
+from collections.abc import Hashable, Iterator
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from workflows.context import ExecutionContext
+from workflows.overlay import Overlay
+
+if TYPE_CHECKING:
+    from nodes.base import BaseNode
+    from workflows.graph import GraphIndex
+
+# First element of a recorded key: which top-level mapping it belongs to
+STATE = 0
+NODE_CONTEXT = 1
+
+# Version of every key (present or absent) of the initial context
+INITIAL_VERSION = 0
+
+# Pseudo key read by a step that found a mapping empty
+EMPTY = object()
+
+_Key = tuple[int, Hashable]
+
+
+class RecordingOverlay(Overlay):
+    """Overlay that remembers the top-level keys read through it."""
+
+    __slots__ = ("reads", "iterated")
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.reads: set = set()
+        self.iterated = False  # Read every key, e.g. copied the whole mapping
+
+    def __getitem__(self, key: Any) -> Any:
+        self.reads.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key: Any) -> bool:
+        self.reads.add(key)
+        return super().__contains__(key)
+
+    def __iter__(self) -> Iterator:
+        self.iterated = True
+        return super().__iter__()
+
+    def __bool__(self) -> bool:
+        # e.g. `data or {}` in JSON Logic: non-empty depends on one key only
+        for key in super().__iter__():
+            self.reads.add(key)
+            return True
+        self.reads.add(EMPTY)
+        return False
+
+
+@dataclass(slots=True)
+class StepRecord:
+    """One execution of a node in a recorded run."""
+
+    node: str
+    reads: dict[_Key, int] | None  # Key -> version it held when read; None: all keys
+    writes: dict[_Key, Any]  # Key -> value written
+    deletes: set[_Key]
+    versions: dict[_Key, int]  # Key -> version given to the write or deletion
+    next_nodes: list[str]
+
+
+@dataclass
+class RecordedRun:
+    """
+    A workflow run with what each node step read and wrote.
+
+    Attributes:
+        ctx: The ExecutionContext after the run. Its values are shared with
+            the record and must not be modified in place.
+        initial_state: The initial state of the run.
+        steps: Node steps in execution order.
+        executed: Steps that ran their node.
+        reused: Steps replayed from the previous run by `Workflow.reexecute`.
+    """
+
+    ctx: ExecutionContext
+    initial_state: dict
+    steps: list[StepRecord] = field(default_factory=list)
+    executed: int = 0
+    reused: int = 0
+
+
+class StepRecorder:
+    """
+    Runs node steps for the scheduler, recording them into a RecordedRun.
+
+    With a previous run, steps whose inputs did not change are replayed from
+    it instead of executed. `changed` holds the initial-state keys whose
+    values differ from the previous run.
+    """
+
+    def __init__(
+        self,
+        index: "GraphIndex",
+        run: RecordedRun,
+        previous: RecordedRun | None = None,
+        changed: set[str] = frozenset(),
+    ):
+        self.index = index
+        self.run = run
+        self.nodes = {node.name: node for node in index.nodes}
+        # Version of each key in this run; absent keys hold INITIAL_VERSION
+        self.versions: dict[_Key, int] = {}
+        self.next_version = INITIAL_VERSION + 1
+
+        # Steps of the previous run by (node, occurrence), and for each key
+        # the previous-run version its current value equals (None: differs)
+        self.previous: dict[tuple[str, int], StepRecord] = {}
+        self.same_as: dict[_Key, int | None] = {}
+        # Executions of each node so far in this run
+        self.occurrences: dict[str, int] = {}
+        if previous is not None:
+            counts: dict[str, int] = {}
+            for record in previous.steps:
+                occurrence = counts.get(record.node, 0)
+                counts[record.node] = occurrence + 1
+                self.previous[(record.node, occurrence)] = record
+            for key in changed:
+                self.same_as[(STATE, key)] = None
+
+    async def step(self, node: "BaseNode", ctx: ExecutionContext) -> list["BaseNode"]:
+        occurrence = self.occurrences.get(node.name, 0)
+        self.occurrences[node.name] = occurrence + 1
+        previous = self.previous.get((node.name, occurrence))
+
+        if previous is not None and self._unchanged(previous, ctx):
+            return self._replay(previous, ctx)
+
+        state = RecordingOverlay(ctx.state)
+        node_context = RecordingOverlay(ctx.node_context)
+        fork = ExecutionContext(state=state, config=ctx.config, node_context=node_context)
+        await node.execute_async(fork)
+        next_nodes = await node.next_nodes(fork)
+
+        reads = None  # Read every key: never reused
+        if not (state.iterated or node_context.iterated):
+            reads = {
+                key: self.versions.get(key, INITIAL_VERSION)
+                for key in [
+                    *((STATE, key) for key in state.reads),
+                    *((NODE_CONTEXT, key) for key in node_context.reads),
+                ]
+            }
+        writes = {(STATE, key): value for key, value in state.changes().items()}
+        for key, value in node_context.changes().items():
+            writes[(NODE_CONTEXT, key)] = value
+        deletes = {(STATE, key) for key in state.deleted}
+        deletes.update((NODE_CONTEXT, key) for key in node_context.deleted)
+
+        # Replace changed top-level values rather than merging into them, so
+        # values held by earlier records are never modified
+        self._apply(ctx, writes, deletes)
+
+        for key in (*writes, *deletes):
+            self.same_as[key] = self._previous_version(previous, key, writes)
+        self._record(node.name, reads, writes, deletes, [node.name for node in next_nodes])
+        self.run.executed += 1
+        return next_nodes
+
+    def _unchanged(self, previous: StepRecord, ctx: ExecutionContext) -> bool:
+        """True if every key the previous step read still holds the value it saw."""
+        if previous.reads is None:
+            return False
+        same_as = self.same_as
+        for key, version in previous.reads.items():
+            space, name = key
+            if name is EMPTY:
+                if ctx.state if space == STATE else ctx.node_context:
+                    return False
+            elif same_as.get(key, INITIAL_VERSION) != version:
+                return False
+        return True
+
+    def _replay(self, previous: StepRecord, ctx: ExecutionContext) -> list["BaseNode"]:
+        reads = {key: self.versions.get(key, INITIAL_VERSION) for key in previous.reads}
+        self._apply(ctx, previous.writes, previous.deletes)
+        self.same_as.update(previous.versions)
+        self._record(previous.node, reads, previous.writes, previous.deletes, previous.next_nodes)
+        self.run.reused += 1
+        return [self.nodes[name] for name in previous.next_nodes]
+
+    @staticmethod
+    def _apply(ctx: ExecutionContext, writes: dict[_Key, Any], deletes: set[_Key]) -> None:
+        for (space, key), value in writes.items():
+            (ctx.state if space == STATE else ctx.node_context)[key] = value
+        for space, key in deletes:
+            (ctx.state if space == STATE else ctx.node_context).pop(key, None)
+
+    @staticmethod
+    def _previous_version(
+        previous: StepRecord | None, key: _Key, writes: dict[_Key, Any]
+    ) -> int | None:
+        """Previous-run version equal to what a re-executed step left at `key`."""
+        if previous is None or key not in previous.versions:
+            return None
+        if key in writes:
+            if key not in previous.writes or previous.writes[key] != writes[key]:
+                return None
+        elif key not in previous.deletes:
+            return None
+        # Same output as in the previous run: readers of it can be reused
+        return previous.versions[key]
+
+    def _record(
+        self,
+        node: str,
+        reads: dict[_Key, int] | None,
+        writes: dict[_Key, Any],
+        deletes: set[_Key],
+        next_nodes: list[str],
+    ) -> None:
+        versions = {}
+        for key in (*writes, *deletes):
+            versions[key] = self.versions[key] = self.next_version
+            self.next_version += 1
+        self.run.steps.append(StepRecord(node, reads, writes, deletes, versions, next_nodes))
@@ -0,0 +1,133 @@
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from workflows.overlay import materialize
+
+# Default maximum number of memoized results per workflow
+DEFAULT_MEMO_SIZE = 4096
+
+# Returned by MemoCache.get when no result is cached
+MISSING = object()
+
+_SCALAR_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+def input_key(values: tuple) -> Hashable:
+    """
+    Hashable key for the input values a pure node read.
+
+    Scalars are tagged with their type, so 1, 1.0 and True get different
+    entries as JSON Logic may tell them apart. Containers are keyed by their
+    canonical JSON, which makes equal lists and dicts share an entry.
+    """
+    key = []
+    for value in values:
+        if type(value) in _SCALAR_TYPES:
+            key.append((type(value), value))
+            continue
+        try:
+            key.append(
+                json.dumps(materialize(value), sort_keys=True, separators=(",", ":"), default=repr)
+            )
+        except (TypeError, ValueError):
+            # e.g. dicts mixing key types, which cannot be sorted
+            key.append(repr(value))
+    return tuple(key)
+
+
+class MemoCache:
+    """
+    Bounded cache of pure node results, keyed by node name and input values.
+
+    Entries are evicted least recently used first once `maxsize` is reached,
+    and expire `ttl` seconds after they were stored. Each workflow owns one
+    cache shared by all of its runs, so results carry over between the runs
+    of a batch.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_MEMO_SIZE,
+        ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be a positive integer")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be a positive number of seconds")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        # (node name, input key) -> (expiry time or None, result)
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float | None, Any]] = (
+            OrderedDict()
+        )
+        self._nodes: dict[str, list[int]] = {}  # node name -> [hits, misses]
+
+    def get(self, node: str, inputs: Hashable) -> Any:
+        """The cached result of `node` for `inputs`, or MISSING."""
+        counts = self._nodes.get(node)
+        if counts is None:
+            counts = self._nodes[node] = [0, 0]
+
+        key = (node, inputs)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, result = entry
+            if expires is None or self.clock() < expires:
+                self.hits += 1
+                counts[0] += 1
+                self._entries.move_to_end(key)
+                return result
+            del self._entries[key]
+            self.expirations += 1
+
+        self.misses += 1
+        counts[1] += 1
+        return MISSING
+
+    def put(self, node: str, inputs: Hashable, result: Any) -> None:
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        key = (node, inputs)
+        self._entries[key] = (expires, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._nodes.clear()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "nodes": {
+                name: {
+                    "hits": hits,
+                    "misses": misses,
+                    "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                }
+                for name, (hits, misses) in self._nodes.items()
+            },
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
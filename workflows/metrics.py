@@ -0,0 +1,466 @@
+"""
+Runtime metrics aggregated across runs, exportable in Prometheus text format.
+
+A MetricsRegistry counts, per workflow and node, executions, failures and
+latency in fixed buckets, loop iterations, which branch conditions took, and
+runs started, finished and in flight. `Workflow.execute_async` updates
+`default_registry` unless passed another registry or None.
+
+Each thread writes its own shard of flat per-node counters, so updates take
+no lock; `snapshot` sums the shards when read. Per-type totals are derived
+from per-node counters at snapshot time and cost nothing per node. Nodes of
+parallel loop bodies are not counted individually, as with tracers.
+
+The registry holds no workflow alive: when one is garbage collected, its
+counters are folded into a total kept per workflow name and node layout,
+so rebuilding workflows keeps the number of series bounded.
+"""
+
+import os
+import tempfile
+import threading
+import weakref
+from bisect import bisect_left
+from collections import deque
+from collections.abc import Awaitable, Callable
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Any
+
+from nodes.base import BaseNode
+from nodes.condition import ConditionNode
+from nodes.loop import ForLoopNode
+
+if TYPE_CHECKING:
+    from workflows.base import Workflow
+    from workflows.context import ExecutionContext
+
+# Upper bounds, in seconds, of latency histogram buckets
+DEFAULT_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+# How a node's routing is counted
+_PLAIN, _CONDITION, _LOOP, _PARALLEL_LOOP = range(4)
+
+Step = Callable[[int], Awaitable[list[BaseNode]]]
+Histogram = dict[str, Any]
+
+
+def _kind(node: BaseNode) -> int:
+    if isinstance(node, ConditionNode):
+        # Branches both missing or both the same node cannot be told apart
+        return _CONDITION if node.true_node is not node.false_node else _PLAIN
+    if isinstance(node, ForLoopNode):
+        if node.parallel:
+            return _PARALLEL_LOOP
+        return _LOOP if node.body_node is not None else _PLAIN
+    return _PLAIN
+
+
+class _Shard:
+    """Counters of one workflow written by one thread."""
+
+    __slots__ = (
+        "counts",
+        "errors",
+        "durations",
+        "buckets",
+        "branches",
+        "iterations",
+        "runs",
+        "run_buckets",
+    )
+
+    def __init__(self, nodes: int, width: int):
+        self.counts = [0] * nodes
+        self.errors = [0] * nodes
+        self.durations = [0] * nodes  # Nanoseconds
+        self.buckets = [0] * (nodes * width)  # Row of `width` buckets per node
+        self.branches = [0] * (nodes * 2)  # True, false per node
+        self.iterations = [0] * nodes
+        self.runs = [0, 0, 0, 0]  # Started, finished, failed, nanoseconds
+        self.run_buckets = [0] * width
+
+    def add(self, other: "_Shard") -> None:
+        """Add `other`'s counters into this shard."""
+        for name in _Shard.__slots__:
+            summed = getattr(self, name)
+            for i, value in enumerate(getattr(other, name)):
+                summed[i] += value
+
+
+class WorkflowMetrics:
+    """
+    Metrics of one built workflow, updated by its schedulers.
+
+    Node counters are indexed like `workflow.index.nodes`. Holds names, not
+    nodes, so counters outlive the workflow they were collected from.
+    """
+
+    def __init__(self, workflow: "Workflow", bounds: tuple[int, ...], lock: threading.Lock):
+        index = workflow.index
+        self.name: str = getattr(workflow, "name", None) or "unnamed"
+        self.nodes = tuple(node.name for node in index.nodes)
+        self.types = tuple(node.type for node in index.nodes)
+        self.kinds = bytes(_kind(node) for node in index.nodes)
+        self.bounds = bounds
+        self._local = threading.local()
+        self._shards: list[_Shard] = []
+        self._lock = lock
+
+    def shard(self) -> _Shard:
+        """This thread's counters."""
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard(len(self.nodes), len(self.bounds) + 1)
+            with self._lock:
+                self._shards.append(shard)
+            return shard
+
+    def metered(
+        self, step: Step | None, nodes: tuple[BaseNode, ...], ctx: "ExecutionContext"
+    ) -> Step:
+        """
+        Wrap a dataflow scheduler step to count and time every node it runs.
+
+        With no `step`, nodes run directly, saving a coroutine per node.
+        """
+        shard = self.shard()
+        counts, errors, durations, buckets = shard.counts, shard.errors, shard.durations, shard.buckets
+        bounds, width, kinds = self.bounds, len(self.bounds) + 1, self.kinds
+
+        async def metered_step(node_id: int) -> list[BaseNode]:
+            start = perf_counter_ns()
+            try:
+                if step is None:
+                    node = nodes[node_id]
+                    await node.execute_async(ctx)
+                    next_nodes = await node.next_nodes(ctx)
+                else:
+                    next_nodes = await step(node_id)
+            except Exception:
+                counts[node_id] += 1
+                errors[node_id] += 1
+                raise
+            elapsed = perf_counter_ns() - start
+            counts[node_id] += 1
+            durations[node_id] += elapsed
+            buckets[node_id * width + bisect_left(bounds, elapsed)] += 1
+            if kinds[node_id]:
+                self.route(shard, node_id, nodes[node_id], next_nodes, ctx)
+            return next_nodes
+
+        return metered_step
+
+    async def measure(self, shard: _Shard, node_id: int, coroutine: Awaitable[Any]) -> Any:
+        """Count and time a node's `execute_async` (level scheduler)."""
+        start = perf_counter_ns()
+        try:
+            result = await coroutine
+        except Exception:
+            shard.counts[node_id] += 1
+            shard.errors[node_id] += 1
+            raise
+        elapsed = perf_counter_ns() - start
+        shard.counts[node_id] += 1
+        shard.durations[node_id] += elapsed
+        shard.buckets[node_id * (len(self.bounds) + 1) + bisect_left(self.bounds, elapsed)] += 1
+        return result
+
+    def route(
+        self,
+        shard: _Shard,
+        node_id: int,
+        node: BaseNode,
+        next_nodes: list[BaseNode],
+        ctx: "ExecutionContext",
+    ) -> None:
+        """Count the branch a condition took, or the iterations a loop started."""
+        kind = self.kinds[node_id]
+        if kind == _CONDITION:
+            if next_nodes:
+                taken = next_nodes[0] is node.true_node
+            else:
+                # Routed to its only missing branch
+                taken = node.true_node is None
+            shard.branches[node_id * 2 + (not taken)] += 1
+        elif kind == _LOOP:
+            if next_nodes and next_nodes[0] is node.body_node:
+                shard.iterations[node_id] += 1
+        elif kind == _PARALLEL_LOOP:
+            node_ctx = ctx.get_node_context(node.name) or {}
+            shard.iterations[node_id] += node_ctx.get(ForLoopNode.COUNT_KEY, 0)
+
+    def start_run(self, shard: _Shard) -> int:
+        shard.runs[0] += 1
+        return perf_counter_ns()
+
+    def end_run(self, shard: _Shard, start: int, failed: bool) -> None:
+        elapsed = perf_counter_ns() - start
+        runs = shard.runs
+        runs[1] += 1
+        runs[2] += failed
+        runs[3] += elapsed
+        shard.run_buckets[bisect_left(self.bounds, elapsed)] += 1
+
+    def totals(self) -> _Shard:
+        """Counters summed over every thread's shard."""
+        with self._lock:
+            shards = list(self._shards)
+        return self._sum(shards)
+
+    def _sum(self, shards: list[_Shard]) -> _Shard:
+        total = _Shard(len(self.nodes), len(self.bounds) + 1)
+        for shard in shards:
+            total.add(shard)
+        return total
+
+    def retire(self, into: "WorkflowMetrics | None") -> "WorkflowMetrics":
+        """
+        Fold the counters of a collected workflow into `into`, or into one shard.
+
+        Called with the registry lock held, once no thread can add a shard.
+        """
+        total = self._sum(self._shards)
+        if into is None:
+            self._shards = [total]
+            self._local = threading.local()
+            return self
+        into._shards[0].add(total)
+        return into
+
+
+class MetricsRegistry:
+    """
+    Metrics of every workflow run with this registry, across runs.
+
+    Usage:
+        registry = MetricsRegistry()
+        await workflow.execute_async(ctx, metrics=registry)
+        registry.snapshot()["workflows"][workflow.name]["nodes"]
+        registry.write_prometheus("/var/lib/node_exporter/workflows.prom")
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        if not buckets or min(buckets) <= 0:
+            raise ValueError("buckets must be positive numbers of seconds")
+
+        self.buckets = tuple(sorted(set(buckets)))
+        self._bounds = tuple(round(bound * 1e9) for bound in self.buckets)
+        self._lock = threading.Lock()
+        self._workflows: weakref.WeakKeyDictionary["Workflow", WorkflowMetrics] = (
+            weakref.WeakKeyDictionary()
+        )
+        # Metrics of live workflows, and of collected ones not yet retired
+        self._series: dict[WorkflowMetrics, None] = {}
+        # Totals of collected workflows by (name, nodes, types, kinds)
+        self._retired: dict[tuple, WorkflowMetrics] = {}
+        # Filled by finalizers, which may run inside a locked section
+        self._collected: deque[WorkflowMetrics] = deque()
+
+    def workflow(self, workflow: "Workflow") -> WorkflowMetrics:
+        """The metrics of `workflow`, created on its first run."""
+        metrics = self._workflows.get(workflow)
+        if metrics is None:
+            with self._lock:
+                metrics = self._workflows.get(workflow)
+                if metrics is None:
+                    self._retire_collected()
+                    metrics = WorkflowMetrics(workflow, self._bounds, self._lock)
+                    self._workflows[workflow] = metrics
+                    self._series[metrics] = None
+                    weakref.finalize(workflow, self._collected.append, metrics)
+        return metrics
+
+    def _retire_collected(self) -> None:
+        """Fold metrics of collected workflows into `_retired`. Lock held."""
+        while self._collected:
+            metrics = self._collected.popleft()
+            if metrics not in self._series:
+                continue  # Dropped by `clear`
+            del self._series[metrics]
+            key = (metrics.name, metrics.nodes, metrics.types, metrics.kinds)
+            self._retired[key] = metrics.retire(self._retired.get(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._workflows = weakref.WeakKeyDictionary()
+            self._series = {}
+            self._retired = {}
+            self._collected.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Current totals, summed over threads and over workflows sharing a name.
+
+        Returns:
+            {"workflows": {name: {"runs": {...}, "nodes": {node: {...}}}},
+            "types": {node type: {...}}}. Histograms are dicts of
+            cumulative `buckets` by upper bound (seconds), `count` and `sum`
+            (seconds). Condition nodes add `branches` ({"true", "false"}),
+            for loops `iterations`.
+        """
+        with self._lock:
+            self._retire_collected()
+            series = [*self._retired.values(), *self._series]
+
+        workflows: dict[str, dict[str, Any]] = {}
+        types: dict[str, dict[str, Any]] = {}
+        width = len(self._bounds) + 1
+        for metrics in series:
+            total = metrics.totals()
+            started, finished, failed, run_ns = total.runs
+            entry = workflows.setdefault(
+                metrics.name,
+                {
+                    "runs": {
+                        "started": 0,
+                        "finished": 0,
+                        "failed": 0,
+                        "in_flight": 0,
+                        "duration": self._histogram(),
+                    },
+                    "nodes": {},
+                },
+            )
+            runs = entry["runs"]
+            runs["started"] += started
+            runs["finished"] += finished
+            runs["failed"] += failed
+            runs["in_flight"] += started - finished
+            self._add(runs["duration"], total.run_buckets, run_ns)
+
+            for node_id, (name, type) in enumerate(zip(metrics.nodes, metrics.types)):
+                row = total.buckets[node_id * width : (node_id + 1) * width]
+                for stats in (
+                    entry["nodes"].setdefault(name, {"type": type, **self._node_stats()}),
+                    types.setdefault(type, self._node_stats()),
+                ):
+                    stats["count"] += total.counts[node_id]
+                    stats["errors"] += total.errors[node_id]
+                    self._add(stats["duration"], row, total.durations[node_id])
+
+                kind = metrics.kinds[node_id]
+                node_entry = entry["nodes"][name]
+                if kind == _CONDITION:
+                    branches = node_entry.setdefault("branches", {"true": 0, "false": 0})
+                    branches["true"] += total.branches[node_id * 2]
+                    branches["false"] += total.branches[node_id * 2 + 1]
+                elif kind in (_LOOP, _PARALLEL_LOOP):
+                    node_entry["iterations"] = (
+                        node_entry.get("iterations", 0) + total.iterations[node_id]
+                    )
+
+        return {"workflows": workflows, "types": types}
+
+    def _node_stats(self) -> dict[str, Any]:
+        return {"count": 0, "errors": 0, "duration": self._histogram()}
+
+    def _histogram(self) -> Histogram:
+        return {"buckets": dict.fromkeys((*self.buckets, float("inf")), 0), "count": 0, "sum": 0.0}
+
+    @staticmethod
+    def _add(histogram: Histogram, row: list[int], nanoseconds: int) -> None:
+        cumulative = 0
+        buckets = histogram["buckets"]
+        for bound, count in zip(buckets, row):
+            cumulative += count
+            buckets[bound] += cumulative
+        histogram["count"] += cumulative
+        histogram["sum"] += nanoseconds / 1e9
+
+    def to_prometheus(self) -> str:
+        """The snapshot in Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        out = _Exposition()
+
+        runs = [(workflow, entry["runs"]) for workflow, entry in snapshot["workflows"].items()]
+        out.family("workflow_runs_total", "counter", "Runs started.")
+        for workflow, stats in runs:
+            out.sample("workflow_runs_total", {"workflow": workflow}, stats["started"])
+        out.family("workflow_run_errors_total", "counter", "Runs that raised.")
+        for workflow, stats in runs:
+            out.sample("workflow_run_errors_total", {"workflow": workflow}, stats["failed"])
+        out.family("workflow_runs_in_flight", "gauge", "Runs started and not finished.")
+        for workflow, stats in runs:
+            out.sample("workflow_runs_in_flight", {"workflow": workflow}, stats["in_flight"])
+        out.family("workflow_run_duration_seconds", "histogram", "Run latency.")
+        for workflow, stats in runs:
+            out.histogram("workflow_run_duration_seconds", {"workflow": workflow}, stats["duration"])
+
+        nodes = [
+            ({"workflow": workflow, "node": node, "type": stats["type"]}, stats)
+            for workflow, entry in snapshot["workflows"].items()
+            for node, stats in entry["nodes"].items()
+        ]
+        out.family("workflow_node_executions_total", "counter", "Node executions, failed ones included.")
+        for labels, stats in nodes:
+            out.sample("workflow_node_executions_total", labels, stats["count"])
+        out.family("workflow_node_errors_total", "counter", "Node executions that raised.")
+        for labels, stats in nodes:
+            out.sample("workflow_node_errors_total", labels, stats["errors"])
+        out.family("workflow_node_duration_seconds", "histogram", "Node latency.")
+        for labels, stats in nodes:
+            out.histogram("workflow_node_duration_seconds", labels, stats["duration"])
+        out.family("workflow_condition_branches_total", "counter", "Branches taken by conditions.")
+        for labels, stats in nodes:
+            for branch, count in stats.get("branches", {}).items():
+                out.sample("workflow_condition_branches_total", {**labels, "branch": branch}, count)
+        out.family("workflow_loop_iterations_total", "counter", "Items looped over by for loops.")
+        for labels, stats in nodes:
+            if "iterations" in stats:
+                out.sample("workflow_loop_iterations_total", labels, stats["iterations"])
+
+        types = snapshot["types"].items()
+        out.family("workflow_node_type_executions_total", "counter", "Node executions by node type.")
+        for type, stats in types:
+            out.sample("workflow_node_type_executions_total", {"type": type}, stats["count"])
+        out.family("workflow_node_type_duration_seconds", "histogram", "Node latency by node type.")
+        for type, stats in types:
+            out.histogram("workflow_node_type_duration_seconds", {"type": type}, stats["duration"])
+        return out.text()
+
+    def write_prometheus(self, path: str) -> None:
+        """Write `to_prometheus` to `path` atomically, e.g. for a textfile collector."""
+        text = self.to_prometheus()
+        directory = os.path.dirname(path) or "."
+        fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                file.write(text)
+            os.replace(temp, path)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+
+class _Exposition:
+    """Lines of a Prometheus text exposition."""
+
+    def __init__(self):
+        self._lines: list[str] = []
+
+    def family(self, name: str, type: str, help: str) -> None:
+        self._lines.append(f"# HELP {name} {help}")
+        self._lines.append(f"# TYPE {name} {type}")
+
+    def sample(self, name: str, labels: dict[str, str], value: float) -> None:
+        pairs = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+        self._lines.append(f"{name}{{{pairs}}} {value}")
+
+    def histogram(self, name: str, labels: dict[str, str], histogram: Histogram) -> None:
+        for bound, count in histogram["buckets"].items():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            self.sample(f"{name}_bucket", {**labels, "le": le}, count)
+        self.sample(f"{name}_sum", labels, histogram["sum"])
+        self.sample(f"{name}_count", labels, histogram["count"])
+
+    def text(self) -> str:
+        return "\n".join(self._lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Process-wide registry updated by Workflow.execute_async unless told otherwise
+default_registry = MetricsRegistry()
@@ -0,0 +1,302 @@
+"""
+Build-time optimization of a linked workflow graph.
+
+Three passes, each keeping the final state of every run identical to the
+unoptimized graph. Fusion runs a chain in fewer scheduler steps, so nodes of
+concurrent branches that write keys the other branch reads may interleave
+differently, as they may with another `max_concurrency`.
+
+- Folding: while the single start node is a set node assigning a literal,
+  its assignment moves into a patch applied to the initial state and its
+  successor becomes the start node.
+- Pruning: an `if` whose variables are all folded literals that no other
+  node writes always takes the same branch. Its predecessors are connected
+  to that branch directly, and nodes no longer reachable are removed.
+- Fusion: linear chains, where each node has a single connection to a node
+  with no other predecessor, run as one FusedNode, i.e. one scheduler step.
+  Nodes with a deadline keep their own step.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from nodes.assignment import SetNode
+from nodes.base import BaseNode
+from nodes.collection import CollectionNode
+from nodes.condition import ConditionNode
+from nodes.connection import NodeConnection
+from nodes.fused import FusedNode
+from nodes.http import HttpNode
+from nodes.loop import EndLoopNode, ForLoopNode
+from utils.logic import logic_vars
+from workflows.context import ExecutionContext
+from workflows.graph import GraphIndex
+from workflows.path import FieldPath
+
+# Nodes that may be fused with their successor, and may end a chain
+_FUSABLE = (SetNode, CollectionNode, HttpNode)
+_CHAIN_TAILS = (*_FUSABLE, ConditionNode)
+
+# Result of a condition that cannot be evaluated at build time
+_UNKNOWN = object()
+
+
+@dataclass
+class OptimizationReport:
+    """
+    What `optimize` changed, by node name.
+
+    Attributes:
+        folded: Set nodes turned into the initial-state patch, in order.
+        pruned: Conditions replaced by the branch they always take.
+        removed: Nodes no longer reachable after pruning.
+        fused: Names of the nodes of each fused chain.
+    """
+
+    folded: list[str] = field(default_factory=list)
+    pruned: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    fused: list[list[str]] = field(default_factory=list)
+
+
+@dataclass
+class OptimizedGraph:
+    """
+    Attributes:
+        nodes: Remaining nodes, linked; fused chains replace their nodes.
+        start_nodes: Entry points of the optimized graph.
+        initial_patch: (path, value) assignments applied, in order, to the
+            initial state of every run.
+        report: What the passes changed.
+    """
+
+    nodes: list[BaseNode]
+    start_nodes: list[BaseNode]
+    initial_patch: list[tuple[FieldPath, Any]]
+    report: OptimizationReport
+
+    def connections(self) -> list[NodeConnection]:
+        return [conn for node in self.nodes for conn in node.connections]
+
+
+def optimize(nodes: Iterable[BaseNode]) -> OptimizedGraph:
+    """
+    Fold, prune and fuse a linked graph. The nodes are relinked in place.
+
+    Args:
+        nodes: The nodes of a built workflow.
+
+    Returns:
+        The optimized graph; build its GraphIndex with its explicit start nodes.
+    """
+    nodes = list(nodes)
+    graph = OptimizedGraph(nodes, GraphIndex(nodes).start_nodes(), [], OptimizationReport())
+    known = _fold(graph)
+    _prune(graph, known)
+    _fuse(graph)
+    return graph
+
+
+def _fold(graph: OptimizedGraph) -> dict[str, Any]:
+    """Fold the literal prefix; returns top-level state keys with a known value."""
+    index = GraphIndex(graph.nodes, graph.start_nodes)
+    folded: set[BaseNode] = set()
+    known: dict[str, Any] = {}
+
+    # With several start nodes, another one could read a key before it is set
+    while len(graph.start_nodes) == 1:
+        node = graph.start_nodes[0]
+        if not _is_literal_assignment(node) or len(node.connections) > 1:
+            break
+
+        if node.connections:
+            target = node.connections[0].to
+            # The target must not wait for any other predecessor
+            if isinstance(target, EndLoopNode) or index.forward_in_degree[index.ids[target]] != 1:
+                break
+            graph.start_nodes = [target]
+        else:
+            graph.start_nodes = []
+
+        path = node.variable_path
+        graph.initial_patch.append((path, node.value))
+        graph.report.folded.append(node.name)
+        folded.add(node)
+
+        key = path.set_keys[0]
+        if len(path.set_keys) == 1:
+            known[key] = node.value
+        else:
+            # Writes below a key leave the rest of it to the initial state
+            known.pop(key, None)
+
+    graph.nodes = [node for node in graph.nodes if node not in folded]
+    return known
+
+
+def _is_literal_assignment(node: BaseNode) -> bool:
+    return (
+        isinstance(node, SetNode)
+        and node.value_path is None
+        and node.variable_path is not None
+        and node.variable_path.settable
+        and bool(node.variable_path.set_keys)
+    )
+
+
+def _writes(node: BaseNode) -> set[str] | None:
+    """Top-level state keys a node may write, or None if not known statically."""
+    if isinstance(node, SetNode):
+        paths = [node.variable_path]
+    elif isinstance(node, CollectionNode):
+        paths = [node.output_path]
+    elif isinstance(node, HttpNode):
+        paths = [node.output_path] if node.output else []
+    elif isinstance(node, ForLoopNode):
+        paths = [path for path in (node.iterator_path, node.index_path) if path is not None]
+    elif isinstance(node, (ConditionNode, EndLoopNode)):
+        paths = []
+    else:
+        return None
+
+    keys = set()
+    for path in paths:
+        if path is None:
+            return None
+        if path.set_keys:
+            keys.add(path.set_keys[0])
+    return keys
+
+
+def _constant(node: ConditionNode, known: dict[str, Any], fixed: set[str]) -> Any:
+    """The condition's result if it only reads fixed keys, else _UNKNOWN."""
+    variables = logic_vars(node.condition)
+    if variables is None:
+        return _UNKNOWN
+    if any(variable.split(".")[0] not in fixed for variable in variables):
+        return _UNKNOWN
+
+    try:
+        return bool(node.evaluator(ExecutionContext(state=dict(known)).data_view()))
+    except Exception:
+        return _UNKNOWN
+
+
+def _prune(graph: OptimizedGraph, known: dict[str, Any]) -> None:
+    nodes = graph.nodes
+    writes = [_writes(node) for node in nodes]
+    fixed: set[str] = set()
+    # With a node writing unknown keys, only conditions without variables are constant
+    if None not in writes:
+        # Keys read through the data view resolve to node_context first
+        fixed = set(known).difference(*writes, (node.name for node in nodes))
+
+    index = GraphIndex(nodes, graph.start_nodes)
+    back_targets = {target for _, target in index.back_edges}
+    in_loop = set().union(*(loop.body for loop in index.loops.values()))
+
+    pruned: set[BaseNode] = set()
+    for node_id, node in enumerate(index.nodes):
+        if not isinstance(node, ConditionNode) or node_id in back_targets:
+            continue
+        if not index.reachable[node_id]:
+            continue
+        matched = _constant(node, known, fixed)
+        if matched is _UNKNOWN:
+            continue
+
+        taken = node.true_node if matched else node.false_node
+        # A loop body that stops early has no end_loop to continue from
+        if taken is None and (
+            node_id in in_loop
+            or any(isinstance(index.nodes[pred], ForLoopNode) for pred in index.predecessors[node_id])
+        ):
+            continue
+        if node in graph.start_nodes and taken is not None:
+            taken_id = index.ids[taken]
+            if any(
+                conn.to is taken and not index.is_back_edge(index.ids[pred], taken_id)
+                for pred in graph.nodes
+                if pred is not node and pred not in pruned
+                for conn in pred.connections
+            ):
+                continue  # Taken would stop waiting for its other predecessors
+
+        _bypass(graph, node, taken)
+        pruned.add(node)
+        graph.report.pruned.append(node.name)
+
+    if not pruned:
+        return
+    reachable = GraphIndex(
+        [node for node in nodes if node not in pruned], graph.start_nodes, closed=False
+    )
+    graph.nodes = []
+    for node_id, node in enumerate(reachable.nodes):
+        if reachable.reachable[node_id]:
+            graph.nodes.append(node)
+        else:
+            graph.report.removed.append(node.name)
+
+
+def _bypass(graph: OptimizedGraph, node: BaseNode, taken: BaseNode | None) -> None:
+    """Connect every predecessor of `node` to `taken` instead."""
+    for pred in graph.nodes:
+        if any(conn.to is node for conn in pred.connections):
+            pred.link(
+                [
+                    NodeConnection(taken, conn.label) if conn.to is node else conn
+                    for conn in pred.connections
+                    if conn.to is not node or taken is not None
+                ]
+            )
+
+    if node in graph.start_nodes:
+        graph.start_nodes = [
+            start
+            for start in (taken if start is node else start for start in graph.start_nodes)
+            if start is not None
+        ]
+
+
+def _fuse(graph: OptimizedGraph) -> None:
+    predecessors: dict[BaseNode, int] = {}
+    for node in graph.nodes:
+        for conn in node.connections:
+            predecessors[conn.to] = predecessors.get(conn.to, 0) + 1
+    starts = set(graph.start_nodes)
+
+    def successor(node: BaseNode) -> BaseNode | None:
+        """The next node of the chain `node` belongs to, if any."""
+        if not isinstance(node, _FUSABLE) or len(node.connections) != 1 or node.deadline:
+            return None
+        target = node.connections[0].to
+        if target is node or target in starts or predecessors.get(target) != 1:
+            return None
+        if target.deadline:
+            return None
+        return target if isinstance(target, _CHAIN_TAILS) else None
+
+    successors = {node: successor(node) for node in graph.nodes}
+    continued = {target for target in successors.values() if target is not None}
+
+    fused: dict[BaseNode, FusedNode] = {}  # First node of each chain -> its FusedNode
+    members: set[BaseNode] = set()
+    for node in graph.nodes:
+        if node in continued or successors[node] is None:
+            continue
+        chain = [node]
+        while (target := successors.get(chain[-1])) is not None:
+            chain.append(target)
+        fused[node] = FusedNode(chain)
+        members.update(chain)
+        graph.report.fused.append([member.name for member in chain])
+
+    if not fused:
+        return
+    graph.nodes = [fused.get(node, node) for node in graph.nodes if node in fused or node not in members]
+    graph.start_nodes = [fused.get(node, node) for node in graph.start_nodes]
+    for node in graph.nodes:
+        if any(conn.to in fused for conn in node.connections):
+            node.link([NodeConnection(fused.get(conn.to, conn.to), conn.label) for conn in node.connections])
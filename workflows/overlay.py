@@ -0,0 +1,193 @@
+from collections.abc import Iterator, Mapping, MutableMapping
+from enum import StrEnum
+from typing import Any
+
+from workflows.exception import MergeConflictException
+
+# Marks a key absent from a mapping
+_MISSING = object()
+
+
+class MergePolicy(StrEnum):
+    """How `Overlay.merge` resolves a key changed in both the parent and the fork."""
+
+    CHILD_WINS = "child_wins"  # The fork's value replaces the parent's
+    PARENT_WINS = "parent_wins"  # The parent's concurrent change is kept
+    ERROR = "error"  # Nothing is merged, MergeConflictException is raised
+
+
+class Overlay(MutableMapping):
+    """
+    Copy-on-write view of a parent mapping.
+
+    Reads fall through to the parent; writes and deletions land in a small
+    delta. Nested dicts are forked lazily the first time they are read, so
+    writes below the top level are captured too while the rest of the parent
+    is shared, never copied. Values other than mappings are shared with the
+    parent and must not be mutated in place.
+
+    For each key it writes, deletes or forks, the overlay remembers the
+    parent value at that moment. A key is in conflict when the parent no
+    longer holds that value at merge time, i.e. both sides changed it.
+    """
+
+    __slots__ = ("parent", "delta", "deleted", "base")
+
+    def __init__(self, parent: Mapping):
+        self.parent = parent
+        self.delta: dict[Any, Any] = {}
+        self.deleted: set = set()
+        self.base: dict[Any, Any] = {}
+
+    def __getitem__(self, key: Any) -> Any:
+        delta = self.delta
+        if key in delta:
+            return delta[key]
+        if key in self.deleted:
+            raise KeyError(key)
+
+        value = self.parent[key]
+        if isinstance(value, (dict, Overlay)):
+            # Fork nested mappings so writes into them stay in this overlay
+            self.base.setdefault(key, value)
+            value = delta[key] = Overlay(value)
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if key not in self.base:
+            self.base[key] = self.parent.get(key, _MISSING)
+        self.deleted.discard(key)
+        self.delta[key] = value
+
+    def __delitem__(self, key: Any) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if key not in self.base:
+            self.base[key] = self.parent.get(key, _MISSING)
+        self.delta.pop(key, None)
+        self.deleted.add(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.delta or (key not in self.deleted and key in self.parent)
+
+    def __iter__(self) -> Iterator:
+        yield from self.delta
+        for key in self.parent:
+            if key not in self.delta and key not in self.deleted:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        # Without deletions, no need to count every key of the parent
+        if self.delta:
+            return True
+        if not self.deleted:
+            return bool(self.parent)
+        return any(True for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Overlay({self.to_dict()!r})"
+
+    @property
+    def changed(self) -> bool:
+        """True when this overlay, or a nested one, holds writes or deletions."""
+        return bool(self.deleted) or any(
+            not isinstance(value, Overlay) or value.changed for value in self.delta.values()
+        )
+
+    def changes(self) -> dict:
+        """Top-level keys written in this overlay (or below them), with plain values."""
+        return {
+            key: materialize(value)
+            for key, value in self.delta.items()
+            if not isinstance(value, Overlay) or value.changed
+        }
+
+    def to_dict(self) -> dict:
+        """A plain dict with the overlay's current contents; untouched values are shared."""
+        return {key: materialize(self[key]) for key in self}
+
+    def conflicts(self, prefix: str = "") -> Iterator[str]:
+        """Dotted paths of keys changed both here and in the parent since the fork."""
+        for key, base in self.base.items():
+            value = self.delta.get(key, _MISSING)
+            current = self.parent.get(key, _MISSING)
+            if isinstance(value, Overlay) and value.parent is base:
+                if current is base:
+                    yield from value.conflicts(f"{prefix}{key}.")
+                    continue
+                if not value.changed:
+                    continue
+            if current is not base:
+                yield f"{prefix}{key}"
+
+    def merge(self, policy: MergePolicy | str = MergePolicy.CHILD_WINS) -> None:
+        """
+        Write this overlay's changes into its parent.
+
+        Cost is proportional to the number of keys the overlay touched, not
+        to the size of the parent.
+
+        Args:
+            policy: How to resolve keys also changed in the parent since the fork.
+
+        Raises:
+            MergeConflictException: With `MergePolicy.ERROR`, if any key conflicts.
+                The parent is left unchanged.
+        """
+        policy = MergePolicy(policy)
+        if policy is MergePolicy.ERROR:
+            conflicts = list(self.conflicts())
+            if conflicts:
+                raise MergeConflictException(conflicts)
+        self._apply(policy)
+
+    def _apply(self, policy: MergePolicy) -> None:
+        parent = self.parent
+        for key, base in self.base.items():
+            current = parent.get(key, _MISSING)
+            value = self.delta.get(key, _MISSING)
+
+            if isinstance(value, Overlay) and value.parent is base:
+                if current is base:
+                    # Same nested mapping on both sides: merge below this key
+                    value._apply(policy)
+                    continue
+                if not value.changed:
+                    continue
+
+            if current is not base and policy is MergePolicy.PARENT_WINS:
+                continue
+            if key in self.deleted:
+                if current is not _MISSING:
+                    del parent[key]
+            else:
+                parent[key] = materialize(value)
+
+
+# Values that are, or may hold, an overlay
+_CONTAINER_TYPES = frozenset({dict, list, Overlay})
+
+
+def materialize(value: Any) -> Any:
+    """
+    Replace overlays in a value written by a fork with plain dicts.
+
+    Containers are only rebuilt when they hold an overlay, e.g. a forked
+    nested dict read from the state and stored under another key.
+    """
+    if isinstance(value, Overlay):
+        return value.to_dict()
+    if type(value) is dict:
+        if _CONTAINER_TYPES.isdisjoint(map(type, value.values())):
+            return value
+        items = {key: materialize(item) for key, item in value.items()}
+        return value if all(items[key] is item for key, item in value.items()) else items
+    if type(value) is list:
+        if _CONTAINER_TYPES.isdisjoint(map(type, value)):
+            return value
+        items = [materialize(item) for item in value]
+        return value if all(new is old for new, old in zip(items, value)) else items
+    return value
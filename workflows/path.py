@@ -0,0 +1,160 @@
+from enum import IntEnum
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from workflows.context import ExecutionContext
+
+# Paths only known at runtime are compiled on first use and kept in an LRU
+PATH_CACHE_SIZE = 4096
+
+_SEQUENCE_TYPES = (list, tuple)
+
+
+class PathSource(IntEnum):
+    """Where the first segment of a field path points to."""
+
+    STATE = 0  # "state.<path>"
+    CONFIG = 1  # "config.<path>"
+    DYNAMIC = 2  # "<node_name>.<path>" or a bare state key, decided per call
+
+
+def _compile_keys(keys: list[str]) -> tuple[tuple[str, int | None], ...]:
+    """Pair every key with its integer form, used when indexing sequences."""
+    compiled = []
+    for key in keys:
+        try:
+            index = int(key)
+        except ValueError:
+            index = None
+        compiled.append((key, index))
+    return tuple(compiled)
+
+
+def _walk(data: Any, keys: tuple[tuple[str, int | None], ...], default: Any) -> Any:
+    """Navigate nested dict/list structure using pre-compiled keys."""
+    try:
+        for key, index in keys:
+            if index is not None and type(data) in _SEQUENCE_TYPES:
+                # Lists reject string keys, index them directly
+                data = data[index]
+                continue
+            try:
+                data = data[key]
+            except TypeError:
+                # Handle list index access
+                if index is None:
+                    return default
+                data = data[index]
+        return data
+    except (KeyError, TypeError, ValueError, IndexError):
+        return default
+
+
+class FieldPath:
+    """
+    A field path parsed once and reusable across `ExecutionContext.get`/`set` calls.
+
+    Splitting the path, classifying its source and resolving list indices
+    happens here instead of on every access. Behaviour matches the string
+    path handling of ExecutionContext, including the fallback that treats
+    the whole path as a state lookup.
+    """
+
+    __slots__ = ("path", "source", "head", "keys", "all_keys", "set_keys", "settable")
+
+    def __init__(self, path: str):
+        self.path = path
+
+        parts = path.split(".") if path else []
+        self.head = parts[0] if parts else ""
+        if self.head == "state":
+            self.source = PathSource.STATE
+        elif self.head == "config":
+            self.source = PathSource.CONFIG
+        else:
+            self.source = PathSource.DYNAMIC
+
+        self.keys = _compile_keys(parts[1:])
+        self.all_keys = _compile_keys(parts)
+
+        # set() only writes to state: "state." is optional and config is immutable
+        set_parts = parts[1:] if self.head == "state" else parts
+        self.set_keys = tuple(set_parts)
+        self.settable = not set_parts or set_parts[0] != "config"
+
+    def get(self, ctx: "ExecutionContext", default: Any = None) -> Any:
+        """
+        Extract the value at this path from the context.
+
+        Args:
+            ctx: The execution context to read from.
+            default: Value to return if the path is not found.
+
+        Returns:
+            The value at the path, or default if not found.
+        """
+        if not self.path:
+            return default
+
+        if self.source is PathSource.STATE:
+            return _walk(ctx.state, self.keys, default) if self.keys else ctx.state
+
+        if self.source is PathSource.CONFIG:
+            return _walk(ctx.config, self.keys, default) if self.keys else ctx.config
+
+        # Check if it's a node name in node_context
+        node_data = ctx.node_context.get(self.head)
+        if node_data is not None or self.head in ctx.node_context:
+            return _walk(node_data, self.keys, default) if self.keys else node_data
+
+        # Fallback: treat entire path as state lookup for backward compatibility
+        result = _walk(ctx.state, self.all_keys, None)
+        if result is not None:
+            return result
+
+        return default
+
+    def set(self, ctx: "ExecutionContext", value: Any) -> None:
+        """
+        Set the value at this path in the context state.
+
+        Args:
+            ctx: The execution context to write to.
+            value: The value to set.
+
+        Raises:
+            ValueError: If the path points into config (immutable).
+        """
+        if not self.set_keys:
+            return
+
+        if not self.settable:
+            raise ValueError("Cannot modify config - it is immutable")
+
+        data = ctx.state
+        for key in self.set_keys[:-1]:
+            if key not in data:
+                data[key] = {}
+            data = data[key]
+        data[self.set_keys[-1]] = value
+        if ctx.changes is not None:
+            ctx.changes.state.add(self.set_keys[0])
+
+    def __repr__(self) -> str:
+        return f"FieldPath({self.path!r})"
+
+
+@lru_cache(maxsize=PATH_CACHE_SIZE)
+def compile_path(path: str) -> FieldPath:
+    """Get the compiled FieldPath for a path string, cached with LRU eviction."""
+    return FieldPath(path)
+
+
+def static_path(path: Any) -> FieldPath | None:
+    """
+    Compile a path known at build time, bypassing the runtime LRU cache.
+
+    Non-string values are literals rather than paths and yield None.
+    """
+    return FieldPath(path) if isinstance(path, str) else None
@@ -0,0 +1,171 @@
+import asyncio
+import os
+import pickle
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+
+from workflows.base import RawWorkflow, RunResult, Workflow
+from workflows.builder import WorkflowBuilder
+from workflows.context import ExecutionContext
+
+# Built once per worker process by `_init_worker`
+_worker_workflow: Workflow | None = None
+
+# (index, state, node_context, error) as sent back from a worker
+ChunkResult = tuple[int, dict, dict, Exception | None]
+
+
+def _init_worker(raw_workflow: RawWorkflow) -> None:
+    global _worker_workflow
+    _worker_workflow = WorkflowBuilder(raw_workflow).build()
+
+
+def _picklable_error(error: Exception) -> Exception:
+    try:
+        pickle.dumps(error)
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+    return error
+
+
+def _run_chunk(
+    start: int, states: list[dict], config: dict, concurrency: int, kwargs: dict
+) -> list[ChunkResult]:
+    async def run() -> list[ChunkResult]:
+        results: list[ChunkResult] = []
+        async for result in _worker_workflow.execute_many(
+            states, concurrency=concurrency, config=config, **kwargs
+        ):
+            error = _picklable_error(result.error) if result.error else None
+            results.append(
+                (start + result.index, result.ctx.state, result.ctx.node_context, error)
+            )
+        return results
+
+    return asyncio.run(run())
+
+
+class ProcessPoolRunner:
+    """
+    Execute batches of runs of one workflow across several processes.
+
+    Every worker process builds the workflow once from its raw definition, then
+    receives initial states in chunks and runs each chunk with
+    `Workflow.execute_many`. Only states and results cross process
+    boundaries, so CPU-bound workloads scale with the number of workers.
+
+    Usage:
+        with ProcessPoolRunner(raw_workflow, workers=4, chunk_size=256) as runner:
+            for result in runner.map(states):
+                ...
+    """
+
+    def __init__(
+        self,
+        raw_workflow: RawWorkflow,
+        workers: int | None = None,
+        chunk_size: int = 256,
+        concurrency: int = 100,
+        config: dict | None = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            raw_workflow: Workflow definition, built once per worker process.
+            workers: Number of processes. Defaults to the CPU count.
+            chunk_size: Number of states sent to a worker at a time.
+            concurrency: In-flight runs per worker, see `execute_many`.
+            config: Config shared by every run.
+            **kwargs: Forwarded to `execute_async` in the workers.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        # Validate in the parent so definition errors surface immediately
+        WorkflowBuilder(raw_workflow).build()
+
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.config = config or {}
+        self.kwargs = kwargs
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(raw_workflow,),
+        )
+
+    def map(self, states: Iterable[dict], ordered: bool = True) -> Iterator[RunResult]:
+        """
+        Execute the workflow once per state.
+
+        States are read lazily and at most two chunks per worker are queued at
+        any time, so large or unbounded inputs are streamed.
+
+        Args:
+            states: Initial states, one per run.
+            ordered: Yield results in input order. When False, results are
+                yielded chunk by chunk as workers finish.
+
+        Yields:
+            A RunResult per run; failed runs carry their error.
+        """
+        chunks = self._chunks(states)
+        pending: deque[Future] = deque()
+
+        def submit() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            start, items = chunk
+            pending.append(
+                self._executor.submit(
+                    _run_chunk, start, items, self.config, self.concurrency, self.kwargs
+                )
+            )
+            return True
+
+        try:
+            while len(pending) < self.workers * 2 and submit():
+                pass
+
+            while pending:
+                if ordered:
+                    done = [pending.popleft()]
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    done = [future for future in pending if future in finished]
+                    for future in done:
+                        pending.remove(future)
+
+                for future in done:
+                    results = future.result()
+                    if ordered:
+                        results.sort(key=lambda result: result[0])
+                    for index, state, node_context, error in results:
+                        ctx = ExecutionContext(
+                            state=state, config=self.config, node_context=node_context
+                        )
+                        yield RunResult(index, ctx, error)
+                    submit()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _chunks(self, states: Iterable[dict]) -> Iterator[tuple[int, list[dict]]]:
+        iterator = iter(states)
+        start = 0
+        while chunk := list(islice(iterator, self.chunk_size)):
+            yield start, chunk
+            start += len(chunk)
+
+    def close(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
+
+    def __enter__(self) -> "ProcessPoolRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
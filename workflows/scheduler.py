@@ -0,0 +1,420 @@
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Iterable
+from contextlib import nullcontext
+from enum import StrEnum
+from time import monotonic, perf_counter_ns
+from typing import TYPE_CHECKING, TypeVar
+
+from nodes.base import BaseNode
+from workflows.exception import DeadlineExceededException
+
+if TYPE_CHECKING:
+    from workflows.base import Workflow
+    from workflows.checkpoint import Checkpointer
+    from workflows.context import ExecutionContext
+    from workflows.graph import GraphIndex
+    from workflows.incremental import StepRecorder
+    from workflows.metrics import WorkflowMetrics
+    from workflows.tracing import Tracer
+
+T = TypeVar("T")
+
+# Set to True in the node_context of nodes cut off by a deadline in a partial run
+TIMED_OUT_KEY = "timed_out"
+
+
+class ExecutionMode(StrEnum):
+    """Scheduling strategies supported by `Workflow.execute_async`."""
+
+    DATAFLOW = "dataflow"  # Each node starts as soon as its predecessors finish
+    LEVEL = "level"  # Legacy lock-step levels, kept for compatibility
+
+
+class LevelScheduler:
+    """
+    Legacy scheduler: runs the whole frontier, then collects its successors.
+
+    A slow node delays every node of the next level, and a node reached from
+    several parents runs once per parent. Deadlines work as in DataflowScheduler.
+    """
+
+    def __init__(
+        self,
+        workflow: "Workflow",
+        tracer: "Tracer | None" = None,
+        deadline: float | None = None,
+        partial: bool = False,
+        metrics: "WorkflowMetrics | None" = None,
+    ):
+        self.workflow = workflow
+        self.tracer = tracer
+        self.deadline = deadline
+        self.partial = partial
+        self.metrics = metrics
+
+    async def run(self, ctx: "ExecutionContext") -> None:
+        level_tasks: dict[asyncio.Future, BaseNode] = {}
+        timeout = asyncio.timeout(self.deadline) if self.deadline is not None else nullcontext()
+        try:
+            async with timeout:
+                await self._run(ctx, level_tasks)
+        except TimeoutError:
+            if self.deadline is None or not timeout.expired():
+                raise
+            # Nodes of the level in flight that were cancelled with its gather
+            cut = [node for task, node in level_tasks.items() if task.cancelled()]
+            _cut_off(ctx, cut, self.partial)
+
+    async def _run(
+        self, ctx: "ExecutionContext", level_tasks: dict[asyncio.Future, BaseNode]
+    ) -> None:
+        tracer = self.tracer
+        metrics = self.metrics
+        shard = metrics.shard() if metrics is not None else None
+        index = self.workflow.index
+        deadlines = index.deadlines
+        nodes_to_exe = self.workflow.get_start_nodes()
+        coroutine_list = []
+        level = 0
+
+        while nodes_to_exe:
+            for node in nodes_to_exe:
+                if tracer is None:
+                    coroutine = node.execute_async(ctx)
+                else:
+                    coroutine = _traced_execute(tracer, node, ctx, level)
+                if metrics is not None:
+                    coroutine = metrics.measure(shard, index.ids[node], coroutine)
+                if deadlines and (node_id := index.ids.get(node)) in deadlines:
+                    coroutine = _within_deadline(
+                        coroutine, deadlines[node_id], node, ctx, self.partial
+                    )
+                coroutine_list.append(coroutine)
+
+            tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutine_list]
+            level_tasks.clear()
+            level_tasks.update(zip(tasks, nodes_to_exe))
+            try:
+                results = await asyncio.gather(*tasks)
+            except BaseException:
+                # A failed node must not leave the rest of its level running
+                for task in tasks:
+                    task.cancel()
+                raise
+
+            next_nodes = []
+            for node, result in zip(nodes_to_exe, results):
+                if result is _TIMED_OUT:
+                    continue  # Cut off: routes nowhere
+                targets = await node.next_nodes(ctx)
+                if tracer is not None:
+                    tracer.on_next_nodes(ctx, node, targets, level, perf_counter_ns())
+                if metrics is not None and metrics.kinds[node_id := index.ids[node]]:
+                    metrics.route(shard, node_id, node, targets, ctx)
+                next_nodes.extend(targets)
+
+            nodes_to_exe = next_nodes
+            coroutine_list = []
+            level += 1
+
+
+class DataflowScheduler:
+    """
+    Event-driven scheduler with a ready queue.
+
+    A node becomes ready once every forward predecessor has settled: it either
+    routed to the node or finished without routing to it. Joins therefore run
+    once, after all of their branches, and branches skipped by a condition
+    propagate a "dead" signal so downstream joins are not blocked. Back edges
+    (loops) re-schedule their header directly and re-arm the loop body.
+
+    With a checkpointer, the frontier and context are checkpointed between
+    steps once one is due, nodes in flight included; a resumed run starts
+    from the saved frontier and runs those nodes again.
+    With a recorder, node steps run through it instead of directly. With
+    metrics, every step is counted and timed (see workflows.metrics).
+
+    A node step outliving its node's `deadline`, or any step still running
+    when the run's `deadline` expires, is cancelled and the run raises
+    DeadlineExceededException. With `partial`, the cut-off nodes are marked
+    with TIMED_OUT_KEY in node_context instead: a node past its own deadline
+    routes nowhere and the rest of the run goes on, while the run deadline
+    ends the run.
+    """
+
+    def __init__(
+        self,
+        index: "GraphIndex",
+        max_concurrency: int | None = None,
+        tracer: "Tracer | None" = None,
+        checkpointer: "Checkpointer | None" = None,
+        recorder: "StepRecorder | None" = None,
+        deadline: float | None = None,
+        partial: bool = False,
+        metrics: "WorkflowMetrics | None" = None,
+    ):
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+
+        self.index = index
+        self.max_concurrency = max_concurrency
+        self.tracer = tracer
+        self.checkpointer = checkpointer
+        self.recorder = recorder
+        self.deadline = deadline
+        self.partial = partial
+        self.metrics = metrics
+
+    async def run(self, ctx: "ExecutionContext") -> None:
+        checkpointer = self.checkpointer
+        if checkpointer is None:
+            await self._run(ctx, None)
+            return
+
+        try:
+            await self._run(ctx, checkpointer)
+        except BaseException:
+            checkpointer.close(ctx, completed=False)
+            raise
+        checkpointer.close(ctx, completed=True)
+
+    async def _run(self, ctx: "ExecutionContext", checkpointer: "Checkpointer | None") -> None:
+        index = self.index
+        nodes, ids, forward = index.nodes, index.ids, index.forward
+        pending = list(index.forward_in_degree)
+        live = bytearray(len(nodes))
+        ready: deque[int] = deque(index.start)
+        running: dict[asyncio.Task, int] = {}
+        # Loop-leaving edges already counted by their target (see GraphIndex.loop_exits)
+        settled: set[tuple[int, int]] = set()
+        exit_targets = index.exit_targets
+        # Frontier entries changed since the last checkpoint
+        dirty: set[int] | None = None
+        rearmed: set[int] | None = None
+        if checkpointer is not None:
+            checkpointer.attach(ctx, index, ready, pending, live, settled, running)
+            dirty, rearmed = checkpointer.dirty, checkpointer.rearmed
+
+        tracer = self.tracer
+        recorder = self.recorder
+        metrics = self.metrics
+        if recorder is not None:
+            levels = None
+
+            def step(node_id: int):
+                return recorder.step(nodes[node_id], ctx)
+
+        elif tracer is None:
+            levels = None
+
+            if metrics is not None:
+                # Counted and timed in one coroutine per node
+                step = metrics.metered(None, nodes, ctx)
+            else:
+
+                def step(node_id: int):
+                    return self._step(nodes[node_id], ctx)
+
+        else:
+            # Scheduling depth of each node, reported to the tracer
+            levels = [0] * len(nodes)
+
+            def step(node_id: int):
+                return self._traced_step(tracer, nodes[node_id], ctx, levels[node_id])
+
+            if metrics is not None:
+                step = metrics.metered(step, nodes, ctx)
+
+        deadlines = index.deadlines
+        if deadlines:
+            untimed = step
+
+            async def step(node_id: int):
+                seconds = deadlines.get(node_id)
+                if seconds is None:
+                    return await untimed(node_id)
+                next_nodes = await _within_deadline(
+                    untimed(node_id), seconds, nodes[node_id], ctx, self.partial
+                )
+                return [] if next_nodes is _TIMED_OUT else next_nodes
+
+        def settle(target: int, is_live: bool) -> None:
+            if is_live:
+                live[target] = 1
+            skipped = [target]
+            while skipped:
+                target = skipped.pop()
+                pending[target] -= 1
+                if dirty is not None:
+                    dirty.add(target)
+                if pending[target] > 0:
+                    continue
+                if live[target]:
+                    live[target] = 0
+                    ready.append(target)
+                    continue
+                # Nothing routed here: the whole downstream branch is skipped,
+                # except across loop exits, counted when the loop exits
+                exits = exit_targets[target]
+                skipped.extend(t for t in reversed(forward[target]) if t not in exits)
+                # A skipped loop never runs: settle its exits here, not through
+                # exit_loop, so the closures hold no reference cycle
+                for edge in index.loop_exits.get(target, ()):
+                    if edge not in settled:
+                        settled.add(edge)
+                        skipped.append(edge[1])
+
+        def exit_loop(header: int) -> None:
+            """Settle the edges leaving a finished or skipped loop that were never taken."""
+            for edge in index.loop_exits.get(header, ()):
+                if edge not in settled:
+                    settled.add(edge)
+                    settle(edge[1], False)
+
+        def stalled_loops() -> bool:
+            """
+            Exit loops left by a break: nothing runs, yet some of their edges
+            were never settled. True if that made nodes ready.
+            """
+            for header, edges in index.loop_exits.items():
+                if not settled.issuperset(edges):
+                    exit_loop(header)
+                    if ready:
+                        return True
+            return False
+
+        def route(node_id: int, next_nodes: list[BaseNode]) -> None:
+            # Targets outside the index (e.g. the end of a loop body) are exits
+            targets = [ids[node] for node in next_nodes if node in ids]
+            routed = set(targets)
+            reentrant = node_id in index.loops
+            if levels is not None:
+                level = levels[node_id] + 1
+                for target in routed:
+                    levels[target] = max(levels[target], level) if live[target] else level
+
+            for target in dict.fromkeys(targets):
+                if (node_id, target) in index.back_edges:
+                    # Re-arm the loop body for the next iteration
+                    for body_id, degree in index.loop_in_degree[target]:
+                        pending[body_id] = degree
+                        live[body_id] = 0
+                    settled.difference_update(index.exit_resets[target])
+                    if rearmed is not None:
+                        rearmed.add(target)
+                    ready.append(target)
+                elif not index.reachable[target]:
+                    # Routed outside the static graph, run it unconditionally
+                    ready.append(target)
+
+            exits = exit_targets[node_id]
+            for target in forward[node_id]:
+                if exits and target in exits:
+                    # Leaves a loop: counted once, when taken or when the loop exits
+                    if target in routed and (node_id, target) not in settled:
+                        settled.add((node_id, target))
+                        settle(target, True)
+                elif target in routed:
+                    settle(target, True)
+                elif not reentrant:
+                    settle(target, False)
+                # A loop header may still route to an untaken branch later
+
+            if reentrant and routed.isdisjoint(index.loops[node_id].body):
+                exit_loop(node_id)
+
+        node_id = -1
+        timeout = asyncio.timeout(self.deadline) if self.deadline is not None else nullcontext()
+        try:
+            async with timeout:
+                while ready or running or (index.loop_exits and stalled_loops()):
+                    if checkpointer is not None and monotonic() >= checkpointer.due:
+                        # Settled: nodes still in flight are recorded to run again
+                        checkpointer.checkpoint(ctx)
+
+                    if len(ready) == 1 and not running:
+                        # Linear stretch of the graph: run inline, no task needed
+                        node_id = ready.popleft()
+                        route(node_id, await step(node_id))
+                        continue
+
+                    while ready and (
+                        self.max_concurrency is None or len(running) < self.max_concurrency
+                    ):
+                        node_id = ready.popleft()
+                        running[asyncio.ensure_future(step(node_id))] = node_id
+
+                    done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    # Route in start order so runs are deterministic
+                    for task in [task for task in running if task in done]:
+                        node_id = running.pop(task)
+                        route(node_id, task.result())
+        except TimeoutError:
+            if self.deadline is None or not timeout.expired():
+                raise
+            # Tasks in flight, or else the node that was running inline
+            cut = list(running.values()) if running else [node_id]
+            for task in running:
+                task.cancel()
+            # Let cancelled steps unwind before the partial context is returned
+            await asyncio.gather(*running, return_exceptions=True)
+            running.clear()
+            _cut_off(ctx, [nodes[i] for i in cut], self.partial)
+        finally:
+            for task in running:
+                task.cancel()
+
+    @staticmethod
+    async def _step(node: BaseNode, ctx: "ExecutionContext") -> list[BaseNode]:
+        await node.execute_async(ctx)
+        return await node.next_nodes(ctx)
+
+    @staticmethod
+    async def _traced_step(
+        tracer: "Tracer", node: BaseNode, ctx: "ExecutionContext", level: int
+    ) -> list[BaseNode]:
+        await _traced_execute(tracer, node, ctx, level)
+        next_nodes = await node.next_nodes(ctx)
+        tracer.on_next_nodes(ctx, node, next_nodes, level, perf_counter_ns())
+        return next_nodes
+
+
+# Result of a step cut off by its node's deadline in a partial run
+_TIMED_OUT = object()
+
+
+async def _within_deadline(
+    step: Awaitable[T], seconds: float, node: BaseNode, ctx: "ExecutionContext", partial: bool
+) -> T | object:
+    """Await a node's step, cancelling it after `seconds`; _TIMED_OUT if cut off."""
+    timeout = asyncio.timeout(seconds)
+    try:
+        async with timeout:
+            return await step
+    except TimeoutError:
+        if not timeout.expired():
+            raise  # Raised by the node itself
+    _cut_off(ctx, [node], partial)
+    return _TIMED_OUT
+
+
+def _cut_off(ctx: "ExecutionContext", nodes: Iterable[BaseNode], partial: bool) -> None:
+    """Mark nodes cancelled by a deadline, or raise if the run is not partial."""
+    nodes = list(nodes)
+    if not partial:
+        raise DeadlineExceededException([node.name for node in nodes])
+    for node in nodes:
+        ctx.update_node_context(node.name, TIMED_OUT_KEY, True)
+
+
+async def _traced_execute(
+    tracer: "Tracer", node: BaseNode, ctx: "ExecutionContext", level: int
+) -> None:
+    tracer.on_node_start(ctx, node, level, perf_counter_ns())
+    try:
+        await node.execute_async(ctx)
+    except BaseException as error:
+        tracer.on_node_end(ctx, node, level, perf_counter_ns(), error)
+        raise
+    tracer.on_node_end(ctx, node, level, perf_counter_ns(), None)
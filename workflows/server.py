@@ -0,0 +1,384 @@
+import asyncio
+import json
+import time
+from collections import deque
+from http import HTTPStatus
+from typing import Any
+from urllib.parse import unquote
+
+from nodes.exceptions import NodeValidationException
+from workflows.base import RawWorkflow, RunResult, Workflow
+from workflows.builder import WorkflowBuilder
+
+# Requests larger than this are rejected with 413
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Latency samples kept per workflow for the percentiles of /stats
+LATENCY_WINDOW = 10_000
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+class HTTPError(Exception):
+    """An error answered to the client with `status` and a JSON message."""
+
+    def __init__(self, status: HTTPStatus, message: str, **details: Any):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+class WorkflowRegistry:
+    """
+    Built workflows served by name.
+
+    Registering a name again replaces its workflow; runs already in flight
+    finish on the workflow they started with.
+    """
+
+    def __init__(self):
+        self._workflows: dict[str, Workflow] = {}
+
+    def register(self, raw_workflow: RawWorkflow, name: str | None = None) -> Workflow:
+        """Build a definition and serve it as `name` (default: its own name)."""
+        workflow = WorkflowBuilder(raw_workflow).build()
+        self._workflows[name or workflow.name] = workflow
+        return workflow
+
+    def unregister(self, name: str) -> None:
+        del self._workflows[name]
+
+    def get(self, name: str) -> Workflow | None:
+        return self._workflows.get(name)
+
+    def names(self) -> list[str]:
+        return list(self._workflows)
+
+    def __len__(self) -> int:
+        return len(self._workflows)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._workflows
+
+
+class LatencyStats:
+    """Request count and a sliding window of latencies for percentiles."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.requests = 0
+        self.failed = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.requests += 1
+        self.failed += not ok
+        self._latencies.append(latency)
+
+    def to_dict(self) -> dict[str, Any]:
+        latencies = sorted(self._latencies)
+        percentiles = {}
+        if latencies:
+            for percentile in LATENCY_PERCENTILES:
+                # Nearest-rank percentile
+                rank = max(0, -(-percentile * len(latencies) // 100) - 1)
+                percentiles[f"p{percentile}"] = round(latencies[rank] * 1000, 3)
+            percentiles["max"] = round(latencies[-1] * 1000, 3)
+        return {"requests": self.requests, "failed": self.failed, "latency_ms": percentiles}
+
+
+class WorkflowServer:
+    """
+    Long-lived HTTP/1.1 server executing registered workflows.
+
+    Workflows stay built between requests. Execute requests that arrive
+    within `batch_window` seconds for the same workflow and config run as one
+    `Workflow.execute_many` batch. At most `max_in_flight` executions are
+    admitted at once; further ones are answered with 503 right away.
+
+    Endpoints (JSON bodies):
+        GET    /workflows                  Names of the registered workflows
+        PUT    /workflows/<name>           Register (or replace) a definition
+        DELETE /workflows/<name>           Unregister a workflow
+        POST   /workflows/<name>/execute   Run with {"state": ..., "config": ...}
+        GET    /stats                      Counters and latency percentiles
+
+    Usage:
+        server = WorkflowServer(registry, max_in_flight=1000)
+        await server.start("127.0.0.1", 8080)  # or start_unix("/tmp/workflows.sock")
+        await server.serve_forever()
+    """
+
+    def __init__(
+        self,
+        registry: WorkflowRegistry | None = None,
+        max_in_flight: int = 1000,
+        batch_window: float = 0.0,
+        max_batch_size: int = 256,
+        **kwargs,
+    ):
+        """
+        Args:
+            registry: Workflows to serve. A new empty registry by default.
+            max_in_flight: Maximum number of executions admitted at once.
+            batch_window: Seconds to wait for more requests before running a
+                batch. With 0, requests read in the same event loop iteration
+                are batched.
+            max_batch_size: A batch runs as soon as it holds this many requests.
+            **kwargs: Forwarded to `execute_async` (e.g. mode, max_concurrency).
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be a positive integer")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be a positive integer")
+
+        self.registry = registry or WorkflowRegistry()
+        self.max_in_flight = max_in_flight
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.kwargs = kwargs
+
+        self.in_flight = 0
+        self.rejected = 0
+        self.batches = 0
+        self.batched_runs = 0
+        self.total = LatencyStats()
+        self.per_workflow: dict[str, LatencyStats] = {}
+
+        # (workflow, config key) -> requests waiting for the batch to start
+        self._pending: dict[tuple[Workflow, str], list] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._connections: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.Server | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def start_unix(self, path: str) -> asyncio.Server:
+        self._server = await asyncio.start_unix_server(self._handle, path)
+        return self._server
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would hold wait_closed forever
+            for writer in self._connections:
+                writer.close()
+            await self._server.wait_closed()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "mean_batch_size": self.batched_runs / self.batches if self.batches else 0.0,
+            **self.total.to_dict(),
+            "workflows": {name: stats.to_dict() for name, stats in self.per_workflow.items()},
+            # Memoized pure node results of the registered workflows
+            "memo": {name: self.registry.get(name).memo.stats() for name in self.registry.names()},
+        }
+
+    async def execute(self, name: str, state: dict, config: dict) -> RunResult:
+        """
+        Run a registered workflow through the micro-batcher.
+
+        Raises:
+            HTTPError: 404 for an unknown workflow, 503 when `max_in_flight`
+                executions are already running.
+        """
+        workflow = self.registry.get(name)
+        if workflow is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown workflow: {name}")
+        if self.in_flight >= self.max_in_flight:
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Too many executions in flight")
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        result = None
+        try:
+            result = await self._submit(workflow, state, config)
+            return result
+        finally:
+            self.in_flight -= 1
+            latency = time.perf_counter() - start
+            ok = result is not None and result.ok
+            self.total.record(latency, ok)
+            self.per_workflow.setdefault(name, LatencyStats()).record(latency, ok)
+
+    def _submit(self, workflow: Workflow, state: dict, config: dict) -> asyncio.Future:
+        key = (workflow, json.dumps(config, sort_keys=True, default=repr))
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop = asyncio.get_running_loop()
+            if self.batch_window > 0:
+                loop.call_later(self.batch_window, self._flush, key)
+            else:
+                loop.call_soon(self._flush, key)
+
+        batch.append((state, config, future))
+        if len(batch) >= self.max_batch_size:
+            self._flush(key)
+        return future
+
+    def _flush(self, key: tuple[Workflow, str]) -> None:
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run_batch(key[0], batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, workflow: Workflow, batch: list) -> None:
+        self.batches += 1
+        self.batched_runs += len(batch)
+        try:
+            async for result in workflow.execute_many(
+                (state for state, _, _ in batch),
+                concurrency=len(batch),
+                config=batch[0][1],
+                copy_states=False,
+                **self.kwargs,
+            ):
+                future = batch[result.index][2]
+                if not future.done():
+                    future.set_result(result)
+        except BaseException as error:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(error, Exception):
+                raise
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                keep_alive = True
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                    headers = await self._read_headers(reader)
+                    keep_alive = version == "HTTP/1.1" and (
+                        headers.get("connection", "").lower() != "close"
+                    )
+                    body = await self._read_body(reader, headers)
+                    status, payload = await self._dispatch(method, target, body)
+                except HTTPError as error:
+                    status = error.status
+                    payload = {"error": str(error), **error.details}
+                    if status == HTTPStatus.REQUEST_ENTITY_TOO_LARGE:
+                        # The body was not read: the connection cannot be reused
+                        keep_alive = False
+                except ValueError:
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": "Malformed request"}
+                    keep_alive = False
+
+                self._write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, headers: dict[str, str]) -> bytes:
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        return await reader.readexactly(length) if length else b""
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter, status: HTTPStatus, payload: Any, keep_alive: bool
+    ) -> None:
+        body = json.dumps(payload, default=repr).encode()
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+
+    async def _dispatch(self, method: str, target: str, body: bytes) -> tuple[HTTPStatus, Any]:
+        parts = [unquote(part) for part in target.split("?", 1)[0].strip("/").split("/")]
+
+        if parts == ["stats"] and method == "GET":
+            return HTTPStatus.OK, self.stats()
+
+        if parts == ["workflows"] and method == "GET":
+            return HTTPStatus.OK, {"workflows": self.registry.names()}
+
+        if len(parts) == 2 and parts[0] == "workflows":
+            name = parts[1]
+            if method == "PUT":
+                return self._register(name, _json_body(body))
+            if method == "DELETE":
+                if name not in self.registry:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown workflow: {name}")
+                self.registry.unregister(name)
+                return HTTPStatus.OK, {"unregistered": name}
+
+        if len(parts) == 3 and parts[0] == "workflows" and parts[2] == "execute":
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST to execute")
+            request = _json_body(body) if body else {}
+            if not isinstance(request, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "An execute request must be an object")
+            state, config = request.get("state", {}), request.get("config", {})
+            if not isinstance(state, dict) or not isinstance(config, dict):
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "state and config must be objects")
+
+            result = await self.execute(parts[1], state, config)
+            payload = {"state": result.ctx.state, "node_context": result.ctx.node_context}
+            if not result.ok:
+                payload["error"] = f"{type(result.error).__name__}: {result.error}"
+                return HTTPStatus.INTERNAL_SERVER_ERROR, payload
+            return HTTPStatus.OK, payload
+
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {method} {target}")
+
+    def _register(self, name: str, raw_workflow: Any) -> tuple[HTTPStatus, Any]:
+        if not isinstance(raw_workflow, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "A workflow definition must be an object")
+        try:
+            workflow = self.registry.register(raw_workflow, name)
+        except NodeValidationException as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid {error.type}: {error.message}")
+        except Exception as error:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid workflow: {error}")
+        return HTTPStatus.OK, {"registered": name, "nodes": len(workflow.nodes)}
+
+
+def _json_body(body: bytes) -> Any:
+    try:
+        return json.loads(body)
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Request body is not valid JSON") from None
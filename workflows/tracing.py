@@ -0,0 +1,166 @@
+import json
+import os
+from typing import TYPE_CHECKING, Any
+
+from nodes.base import BaseNode
+
+if TYPE_CHECKING:
+    from workflows.context import ExecutionContext
+
+
+class Tracer:
+    """
+    Hooks called by the schedulers around every node of a run.
+
+    Subclass and override the callbacks you need; the defaults do nothing.
+    Timestamps are `time.perf_counter_ns()` values (monotonic nanoseconds).
+    `level` is the node's scheduler level: the iteration of the level
+    scheduler, or in dataflow mode the number of scheduling steps since the
+    run started (one more than the predecessor that made the node ready).
+
+    When no tracer is passed to `Workflow.execute_async`, the schedulers take
+    an untraced path and none of this runs.
+    """
+
+    def on_node_start(
+        self, ctx: "ExecutionContext", node: BaseNode, level: int, timestamp: int
+    ) -> None:
+        """Before `node.execute_async`."""
+
+    def on_node_end(
+        self,
+        ctx: "ExecutionContext",
+        node: BaseNode,
+        level: int,
+        timestamp: int,
+        error: BaseException | None,
+    ) -> None:
+        """After `node.execute_async` returned or raised `error`."""
+
+    def on_next_nodes(
+        self,
+        ctx: "ExecutionContext",
+        node: BaseNode,
+        next_nodes: list[BaseNode],
+        level: int,
+        timestamp: int,
+    ) -> None:
+        """After `node.next_nodes` chose where the run continues."""
+
+    def on_run_end(
+        self, ctx: "ExecutionContext", timestamp: int, error: BaseException | None
+    ) -> None:
+        """After the run finished or failed with `error`."""
+
+
+class ChromeTraceRecorder(Tracer):
+    """
+    Record runs as Chrome trace events, viewable in chrome://tracing or Perfetto.
+
+    Every node visit becomes a complete ("X") event spanning `execute_async`
+    and `next_nodes`, on the first lane (`tid`) free at its start, so
+    concurrent nodes are drawn side by side. Routing decisions are recorded
+    as the `next` argument of the event.
+
+    Usage:
+        recorder = ChromeTraceRecorder()
+        await workflow.execute_async(ctx, tracer=recorder)
+        recorder.write("trace.json")
+    """
+
+    def __init__(self):
+        self.events: list[dict[str, Any]] = []
+        self._pid = os.getpid()
+        # (context, node) -> (start timestamp, lane, execute end timestamp, error)
+        self._open: dict[tuple[int, BaseNode], list] = {}
+        self._lanes: list[bool] = []  # True while a lane is in use
+        self._origin: int | None = None
+
+    def _us(self, timestamp: int) -> float:
+        return (timestamp - self._origin) / 1000
+
+    def on_node_start(self, ctx, node, level, timestamp):
+        if self._origin is None:
+            self._origin = timestamp
+        lane = next((i for i, busy in enumerate(self._lanes) if not busy), len(self._lanes))
+        if lane == len(self._lanes):
+            self._lanes.append(True)
+        else:
+            self._lanes[lane] = True
+        self._open[(id(ctx), node)] = [timestamp, lane, None, None]
+
+    def on_node_end(self, ctx, node, level, timestamp, error):
+        span = self._open.get((id(ctx), node))
+        if span is None:
+            return
+        span[2], span[3] = timestamp, error
+        if error is not None:
+            # next_nodes is not called for a failed node: close the span now
+            self._close(ctx, node, level, timestamp, None)
+
+    def on_next_nodes(self, ctx, node, next_nodes, level, timestamp):
+        self._close(ctx, node, level, timestamp, next_nodes)
+
+    def _close(self, ctx, node, level, timestamp, next_nodes) -> None:
+        span = self._open.pop((id(ctx), node), None)
+        if span is None:
+            return
+        start, lane, executed, error = span
+        self._lanes[lane] = False
+
+        args: dict[str, Any] = {"level": level}
+        if executed is not None:
+            args["execute_us"] = (executed - start) / 1000
+        if next_nodes is not None:
+            args["next"] = [next_node.name for next_node in next_nodes]
+        if error is not None:
+            args["error"] = f"{type(error).__name__}: {error}"
+
+        self.events.append(
+            {
+                "name": node.name,
+                "cat": node.type,
+                "ph": "X",
+                "ts": self._us(start),
+                "dur": (timestamp - start) / 1000,
+                "pid": self._pid,
+                "tid": lane,
+                "args": args,
+            }
+        )
+
+    def on_run_end(self, ctx, timestamp, error):
+        if self._origin is None:
+            self._origin = timestamp
+        args = {"error": f"{type(error).__name__}: {error}"} if error is not None else {}
+        self.events.append(
+            {
+                "name": "run_end",
+                "ph": "i",
+                "s": "p",
+                "ts": self._us(timestamp),
+                "pid": self._pid,
+                "tid": 0,
+                "args": args,
+            }
+        )
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Per-node visit count and total/max time in milliseconds, slowest first."""
+        totals: dict[str, dict[str, float]] = {}
+        for event in self.events:
+            if event["ph"] != "X":
+                continue
+            stats = totals.setdefault(event["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["count"] += 1
+            stats["total_ms"] += event["dur"] / 1000
+            stats["max_ms"] = max(stats["max_ms"], event["dur"] / 1000)
+        return dict(sorted(totals.items(), key=lambda item: item[1]["total_ms"], reverse=True))
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"traceEvents": self.events, "displayTimeUnit": "ms"}
+
+    def write(self, path: str) -> None:
+        """Write the trace as Chrome trace-event JSON."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)